@@ -0,0 +1,128 @@
+"""
+Compare chrome-headless-shell against chrome's --headless=new.
+
+Each mode runs with the default options and with the low memory preset.
+Unlike bench_startup.py this launches real browsers, resolved through
+Selenium Manager, so it needs network access the first time. Selenium Manager
+cannot install chrome-headless-shell, so the shell modes run the one given
+with --shell. Every sample creates a driver, loads a small page and records
+the startup time and the memory of the driver's process tree (linux only,
+read from /proc).
+
+    python benchmarks/bench_headless.py --shell ./chrome-headless-shell \
+        --iterations 10 --output headless.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from selenium import __version__ as selenium_version
+
+from setup_selenium import HEADLESS_SHELL, Browser, SetupSelenium
+from setup_selenium.proc import session_memory
+
+# name: (headless, low memory preset)
+MODES: dict[str, tuple[bool | str, bool]] = {
+    "new": (True, False),
+    "shell": (HEADLESS_SHELL, False),
+    "new_low_memory": (True, True),
+    "shell_low_memory": (HEADLESS_SHELL, True),
+}
+MiB = 1024 * 1024
+PAGE = "data:text/html,<h1>bench</h1><p>" + "lorem ipsum " * 200 + "</p>"
+
+
+def sample(
+    headless: bool | str, low_memory: bool, shell: str | None = None
+) -> dict[str, float]:
+    options = SetupSelenium.options_template(Browser.CHROME, low_memory=low_memory)
+    binary = shell if headless == HEADLESS_SHELL else None
+    start = time.perf_counter()
+    driver = SetupSelenium.create_driver(
+        Browser.CHROME, headless=headless, options=options, binary=binary
+    )
+    startup = time.perf_counter() - start
+    try:
+        start = time.perf_counter()
+        driver.get(PAGE)
+        first_page = time.perf_counter() - start
+        memory = session_memory(driver)
+    finally:
+        driver.quit()
+    return {
+        "startup": startup,
+        "first_page": first_page,
+        "processes": memory.processes,
+        "rss": memory.rss,
+        "pss": memory.pss,
+    }
+
+
+def summarize(samples: list[dict[str, float]]) -> dict[str, dict[str, float]]:
+    return {
+        name: {
+            "min": min(s[name] for s in samples),
+            "median": statistics.median(s[name] for s in samples),
+            "max": max(s[name] for s in samples),
+        }
+        for name in samples[0]
+    }
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--output", help="write results as json to this file")
+    parser.add_argument("--shell", help="chrome-headless-shell for the shell modes")
+    args = parser.parse_args(argv)
+    if not os.path.isdir("/proc"):
+        parser.error("memory is read from /proc, which this platform lacks")
+    modes = args.modes.split(",")
+    if not args.shell and any(MODES[mode][0] == HEADLESS_SHELL for mode in modes):
+        parser.error("the shell modes need --shell")
+
+    results = {}
+    for mode in modes:
+        headless, low_memory = MODES[mode]
+        # resolve and warm up outside of the measurement
+        sample(headless, low_memory, args.shell)
+        samples = [
+            sample(headless, low_memory, args.shell) for _ in range(args.iterations)
+        ]
+        results[mode] = summarize(samples)
+        stats = results[mode]
+        print(
+            f"{mode:<17} startup={stats['startup']['median'] * 1000:8.1f}ms "
+            f"first_page={stats['first_page']['median'] * 1000:7.1f}ms "
+            f"rss={stats['rss']['median'] / MiB:7.1f}MiB "
+            f"pss={stats['pss']['median'] / MiB:7.1f}MiB "
+            f"processes={stats['processes']['median']:.0f}",
+            file=sys.stderr,
+        )
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "selenium": selenium_version,
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measure the time it takes to import setup_selenium.
+
+Every sample imports the package in a fresh interpreter, so nothing is cached
+in sys.modules. Pass --importtime to print the slowest modules reported by
+`python -X importtime`.
+
+    python benchmarks/bench_import.py --iterations 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+STATEMENT = "import setup_selenium"
+
+
+def sample() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", STATEMENT], check=True)  # noqa: S603
+    return time.perf_counter() - start
+
+
+def baseline() -> float:
+    """Startup time of a bare interpreter, subtracted from every sample"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)  # noqa: S603
+    return time.perf_counter() - start
+
+
+def importtime(top: int) -> None:
+    out = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", STATEMENT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    for cumulative, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:10.1f} ms  {name}")
+
+
+def loaded_modules() -> list[str]:
+    script = (
+        f"import sys\n{STATEMENT}\n"
+        "print('\\n'.join(m for m in sys.modules if m.startswith('selenium.webdriver.')))"
+    )
+    out = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    return out.stdout.split()
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--importtime", type=int, default=0, metavar="TOP")
+    args = parser.parse_args(argv)
+
+    sample()  # warm the filesystem cache
+    bare = statistics.median(baseline() for _ in range(args.iterations))
+    samples = [sample() - bare for _ in range(args.iterations)]
+    modules = loaded_modules()
+    print(f"import setup_selenium: median {statistics.median(samples) * 1000:.1f} ms")
+    print(f"                       min    {min(samples) * 1000:.1f} ms")
+    print(f"selenium.webdriver modules loaded: {len(modules)}")
+    if args.importtime:
+        importtime(args.importtime)
+    return {"samples": samples, "modules": modules}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Compare resetting a session with restarting the browser.
+
+Like bench_headless.py this launches real browsers, resolved through Selenium
+Manager, so it needs network access the first time. Every sample dirties the
+browser on a local page (a cookie, local and session storage, an IndexedDB
+database, a cache entry and a second window), then either resets the session
+with `reset_session` or quits and creates a new driver, and times that.
+
+    python benchmarks/bench_reset.py --browsers chrome,firefox --iterations 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from selenium import __version__ as selenium_version
+
+from setup_selenium import Browser, SetupSelenium
+from setup_selenium.reset import reset_session
+
+PAGE = b"""<!doctype html><title>dirty</title><script>
+document.cookie = "session=1; max-age=3600";
+localStorage.setItem("key", "value");
+sessionStorage.setItem("key", "value");
+indexedDB.open("bench", 1);
+caches.open("bench").then((cache) => cache.put("/", new Response("cached")));
+</script>"""
+CHECK_PAGE = b"<!doctype html><title>check</title>"
+
+# what a clean browser reports; all zeros once the reset worked
+CHECK_SCRIPT = """
+const done = arguments[arguments.length - 1];
+Promise.all([
+  indexedDB.databases().then((dbs) => dbs.length),
+  caches.keys().then((keys) => keys.length),
+]).then(([dbs, caches]) => done(
+  document.cookie.length + localStorage.length + sessionStorage.length + dbs + caches
+));
+"""
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def do_GET(self) -> None:
+        body = CHECK_PAGE if self.path == "/check" else PAGE
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def dirty(driver: Any, url: str) -> None:  # noqa: ANN401
+    driver.get(url)
+    driver.switch_to.new_window("tab")
+    driver.get(url)
+    driver.switch_to.window(driver.window_handles[0])
+
+
+def leftovers(driver: Any, url: str) -> int:  # noqa: ANN401
+    driver.get(url + "check")
+    return driver.execute_async_script(CHECK_SCRIPT)
+
+
+def run(browser: Browser, url: str, iterations: int) -> dict[str, Any]:
+    driver = SetupSelenium.create_driver(browser, headless=True)
+    resets, restarts, dirty_after = [], [], 0
+    try:
+        for _ in range(iterations):
+            dirty(driver, url)
+            start = time.perf_counter()
+            reset_session(driver)
+            resets.append(time.perf_counter() - start)
+            dirty_after += leftovers(driver, url) > 0 or len(driver.window_handles) > 1
+
+            dirty(driver, url)
+            start = time.perf_counter()
+            driver.quit()
+            driver = SetupSelenium.create_driver(browser, headless=True)
+            driver.get("about:blank")
+            restarts.append(time.perf_counter() - start)
+    finally:
+        driver.quit()
+    return {
+        "reset": {"median": statistics.median(resets), "max": max(resets)},
+        "restart": {"median": statistics.median(restarts), "max": max(restarts)},
+        "speedup": statistics.median(restarts) / statistics.median(resets),
+        "dirty_after_reset": dirty_after,
+    }
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--browsers", default="chrome")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--output", help="write results as json to this file")
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    results = {}
+    try:
+        for name in args.browsers.split(","):
+            browser = Browser[name.upper()]
+            results[name] = stats = run(browser, url, args.iterations)
+            print(
+                f"{name:<8} reset={stats['reset']['median'] * 1000:7.1f}ms "
+                f"restart={stats['restart']['median'] * 1000:8.1f}ms "
+                f"speedup={stats['speedup']:5.1f}x "
+                f"dirty_after_reset={stats['dirty_after_reset']}",
+                file=sys.stderr,
+            )
+    finally:
+        server.shutdown()
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "selenium": selenium_version,
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
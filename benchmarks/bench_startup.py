@@ -0,0 +1,226 @@
+"""
+Offline benchmarks for driver installation and startup.
+
+Selenium Manager is replaced by a fake binary and every driver by a stub
+WebDriver server (see stubs.py), so no network access or browser is needed.
+What is measured is the overhead of this package and selenium itself.
+
+    python benchmarks/bench_startup.py --concurrency 1,4,16 --output results.json
+    python benchmarks/bench_startup.py --baseline results.json
+
+Results are written as json so runs can be compared across releases.
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from selenium import __version__ as selenium_version
+from selenium.webdriver.firefox.firefox_profile import FirefoxProfile
+from stubs import StubDriverServer, write_fake_selenium_manager
+
+from setup_selenium import Browser, RemoteConfig, SetupSelenium
+from setup_selenium.cache import driver_cache, resolution_memo
+from setup_selenium.firefox import cached_profile
+from setup_selenium.service import shared_services
+
+Benchmark = Callable[[], Any]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    return {
+        "min": min(samples),
+        "mean": statistics.fmean(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "max": max(samples),
+    }
+
+
+def cleanup(result: Any) -> None:  # noqa: ANN401
+    """Quit whatever driver a benchmark produced"""
+    driver = getattr(result, "driver", result)
+    if hasattr(driver, "quit"):
+        driver.quit()
+
+
+def run(name: str, bench: Benchmark, iterations: int, concurrency: int) -> dict:
+    def timed_call(_: int) -> float:
+        start = time.perf_counter()
+        result = bench()
+        elapsed = time.perf_counter() - start
+        cleanup(result)
+        return elapsed
+
+    # warm up imports and caches outside of the measurement
+    timed_call(0)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(timed_call, range(iterations)))
+    wall = time.perf_counter() - start
+    return {
+        "name": name,
+        "concurrency": concurrency,
+        "iterations": iterations,
+        "wall": wall,
+        "throughput": iterations / wall,
+        "latency": summarize(samples),
+    }
+
+
+def remote_commands(url: str, keep_alive: bool) -> Benchmark:
+    """20 command round-trips on one remote driver"""
+    driver = SetupSelenium.remote(
+        Browser.CHROME, RemoteConfig(url, keep_alive=keep_alive)
+    )
+    atexit.register(driver.quit)
+    return lambda: [driver.title for _ in range(20)]
+
+
+def firefox_profile(cached: bool) -> Benchmark:
+    """Serialize a 4 MiB firefox profile with the default preferences"""
+    profile = FirefoxProfile()
+    with open(os.path.join(profile.path, "places.sqlite"), "wb") as f:
+        # half incompressible, like a real profile's databases and caches
+        f.write(os.urandom(2 * 1024 * 1024) + bytes(2 * 1024 * 1024))
+    for name, value in SetupSelenium.firefox_options().preferences.items():
+        profile.set_preference(name, value)
+    if cached:
+        profile = cached_profile(profile)
+    return lambda: profile.encoded
+
+
+def benchmarks(driver_path: str, binary: str, remote_url: str) -> dict[str, Benchmark]:
+    def create(browser: Browser, shared_service: bool = False) -> Benchmark:
+        return lambda: SetupSelenium.create_driver(
+            browser,
+            headless=True,
+            driver_path=driver_path,
+            binary=binary,
+            shared_service=shared_service,
+        )
+
+    return {
+        "install_driver_cold": lambda: SetupSelenium.install_driver(
+            Browser.CHROME, use_cache=False
+        ),
+        "install_driver_warm": lambda: SetupSelenium.install_driver(Browser.CHROME),
+        "chrome_options": SetupSelenium.chrome_options,
+        "edge_options": SetupSelenium.edge_options,
+        "firefox_options": SetupSelenium.firefox_options,
+        "firefox_profile_encoded": firefox_profile(cached=False),
+        "firefox_profile_encoded_cached": firefox_profile(cached=True),
+        "create_driver_chrome": create(Browser.CHROME),
+        "create_driver_edge": create(Browser.EDGE),
+        "create_driver_firefox": create(Browser.FIREFOX),
+        "create_driver_chrome_shared": create(Browser.CHROME, shared_service=True),
+        "create_driver_firefox_shared": create(Browser.FIREFOX, shared_service=True),
+        "setup_selenium_chrome": lambda: SetupSelenium(Browser.CHROME, headless=True),
+        "create_driver_remote": lambda: SetupSelenium.create_driver(
+            Browser.CHROME, headless=True, remote=remote_url
+        ),
+        "remote_commands_keep_alive": remote_commands(remote_url, keep_alive=True),
+        "remote_commands_no_keep_alive": remote_commands(remote_url, keep_alive=False),
+    }
+
+
+def compare(results: list[dict], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["name"], r["concurrency"]): r for r in json.load(f)["results"]}
+    print(f"{'benchmark':<32}{'conc':>5}{'p50 ms':>10}{'base ms':>10}{'change':>9}")
+    for r in results:
+        old = baseline.get((r["name"], r["concurrency"]))
+        new_p50 = r["latency"]["p50"] * 1000
+        if old is None:
+            print(f"{r['name']:<32}{r['concurrency']:>5}{new_p50:>10.2f}")
+            continue
+        old_p50 = old["latency"]["p50"] * 1000
+        change = (new_p50 - old_p50) / old_p50 * 100 if old_p50 else 0.0
+        print(
+            f"{r['name']:<32}{r['concurrency']:>5}{new_p50:>10.2f}"
+            f"{old_p50:>10.2f}{change:>8.1f}%"
+        )
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument(
+        "--sm-delay",
+        type=float,
+        default=0.0,
+        help="seconds the fake selenium-manager sleeps per call",
+    )
+    parser.add_argument("--only", default="", help="comma separated benchmark names")
+    parser.add_argument("--output", help="write results as json to this file")
+    parser.add_argument("--baseline", help="json results to compare against")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="setup_selenium_bench_")
+    os.environ["SE_MANAGER_PATH"] = write_fake_selenium_manager(
+        workdir, delay=args.sm_delay
+    )
+    driver_cache.cache_dir = os.path.join(workdir, "cache")
+    # keep shared services around between the sequential samples
+    shared_services.linger = 5.0
+    resolution_memo.clear()
+    driver_path, binary = SetupSelenium.install_driver(Browser.CHROME)
+
+    grid = StubDriverServer()
+    threading.Thread(target=grid.serve_forever, daemon=True).start()
+
+    selected = benchmarks(driver_path, binary, grid.url)
+    if args.only:
+        names = args.only.split(",")
+        selected = {k: v for k, v in selected.items() if k in names}
+
+    results = []
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        for name, bench in selected.items():
+            result = run(name, bench, args.iterations, concurrency)
+            results.append(result)
+            lat = result["latency"]
+            print(
+                f"{name:<32} c={concurrency:<3} p50={lat['p50'] * 1000:8.2f}ms "
+                f"p95={lat['p95'] * 1000:8.2f}ms {result['throughput']:8.1f}/s",
+                file=sys.stderr,
+            )
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "selenium": selenium_version,
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        compare(results, args.baseline)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Offline stand-ins for Selenium Manager and the webdriver binaries.
+
+`stub_driver` doubles as the entry point of the generated driver executables:
+it speaks just enough of the W3C WebDriver protocol over HTTP for selenium to
+create and quit sessions without a browser.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import stat
+import sys
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+BROWSER_VERSION = "145.0.7632.46"
+GECKO_VERSION = "0.36.0"
+
+
+def _write_script(path: str, body: str) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"#!{sys.executable}\n{body}")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+
+def write_fake_selenium_manager(directory: str, delay: float = 0.0) -> str:
+    """
+    Write an executable that answers like `selenium-manager --output json`.
+
+    It resolves every browser to the stub driver and a dummy browser binary
+    in `directory`, after sleeping `delay` seconds to mimic the real binary.
+    """
+    driver = write_stub_driver(directory)
+    browser = os.path.join(directory, "browser")
+    with open(browser, "w", encoding="utf-8"):
+        pass
+    body = f"""
+import json, time
+time.sleep({delay!r})
+result = {{"code": 0, "message": "", "driver_path": {driver!r}, "browser_path": {browser!r}}}
+print(json.dumps({{"logs": [], "result": result}}))
+"""
+    return _write_script(os.path.join(directory, "selenium-manager"), body)
+
+
+def write_stub_driver(directory: str) -> str:
+    """Write an executable serving `stub_driver` on the port it is given"""
+    path = os.path.join(directory, "stubdriver")
+    if os.path.exists(path):
+        return path
+    here = os.path.dirname(os.path.abspath(__file__))
+    body = f"""
+import sys
+sys.path.insert(0, {here!r})
+from stubs import main
+main(sys.argv[1:])
+"""
+    return _write_script(path, body)
+
+
+def capabilities_for(browser_name: str) -> dict[str, Any]:
+    """Capabilities as returned by the real drivers, trimmed to what we read"""
+    caps: dict[str, Any] = {
+        "browserName": browser_name,
+        "browserVersion": BROWSER_VERSION,
+    }
+    if browser_name == "firefox":
+        caps["moz:geckodriverVersion"] = GECKO_VERSION
+    elif browser_name == "MicrosoftEdge":
+        caps["msedge"] = {"msedgedriverVersion": f"{BROWSER_VERSION} (stub)"}
+    else:
+        caps["chrome"] = {"chromedriverVersion": f"{BROWSER_VERSION} (stub)"}
+    return caps
+
+
+class StubDriverHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep their connections alive
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: StubDriverServer
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def _reply(self, value: Any, status: int = 200) -> None:  # noqa: ANN401
+        body = json.dumps({"value": value}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def do_GET(self) -> None:
+        if self.path == "/status":
+            self._reply({"ready": True, "message": "stub ready"})
+        elif self.path == "/shutdown":
+            self._reply(None)
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif self.path.endswith("/title"):
+            self._reply("")
+        elif self.path.endswith("/window/handles"):
+            self._reply(["main"])
+        else:
+            self._reply(None)
+
+    def do_POST(self) -> None:
+        body = self._body()
+        if self.path == "/session":
+            always = body.get("capabilities", {}).get("alwaysMatch", {})
+            session_id = uuid.uuid4().hex
+            self.server.commands.setdefault("sessions", 0)
+            self.server.commands["sessions"] += 1
+            caps = capabilities_for(always.get("browserName", "chrome"))
+            self._reply({"sessionId": session_id, "capabilities": caps})
+        elif self.path.endswith("/execute/sync") or self.path.endswith(
+            "/execute/async"
+        ):
+            self._reply(None)
+        else:
+            self._reply(None)
+
+    def do_DELETE(self) -> None:
+        self._reply(None)
+
+
+class StubDriverServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0) -> None:
+        super().__init__(("127.0.0.1", port), StubDriverHandler)
+        self.commands: dict[str, int] = {}
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=0)
+    args, _ = parser.parse_known_args(argv)
+    server = StubDriverServer(args.port)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1 +1,12 @@
-from .setup_selenium import Browser, SetupSelenium, set_logger
+from .batch import BatchResult, DriverSpec, create_drivers
+from .har import HarBuilder, write_har
+from .lean import LeanConfig
+from .logs import LogDrainer
+from .monitor import ResourceMonitor, set_resource_hook
+from .options import OptionsTemplate
+from .pool import DriverPool
+from .profiles import ProfileTemplate
+from .remote import RemoteConfig
+from .setup_selenium import HEADLESS_SHELL, Browser, SetupSelenium, set_logger
+from .timing import StartupTimings, set_timing_hook
+from .vitals import VitalsCollector, set_vitals_hook
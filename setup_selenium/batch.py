@@ -0,0 +1,182 @@
+"""Create several webdrivers at once"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from . import setup_selenium as _setup
+from .options import fresh_options
+from .setup_selenium import HEADLESS_SHELL, Browser, SetupSelenium
+from .teardown import DEFAULT_QUIT_TIMEOUT, shutdown_all
+from .versions import preflight
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .lean import LeanConfig
+    from .options import OptionsTemplate
+    from .profiles import ProfileTemplate
+    from .remote import RemoteConfig
+    from .setup_selenium import T_DrvOpts, T_WebDriver
+
+__all__ = ["BatchResult", "DriverSpec", "create_drivers"]
+
+
+@dataclass(frozen=True)
+class DriverSpec:
+    """Everything needed to install and launch one driver"""
+
+    browser: Browser = Browser.CHROME
+    headless: bool | str = False
+    enable_log_performance: bool = False
+    enable_log_console: bool = False
+    enable_log_driver: bool = False
+    log_dir: str = "./logs"
+    driver_path: str | None = None
+    driver_version: str | None = None
+    browser_version: str | None = None
+    browser_path: str | None = None
+    options: T_DrvOpts | OptionsTemplate | None = None
+    shared_service: bool = False
+    remote: str | RemoteConfig | None = None
+    log_drain_interval: float | None = None
+    collect_vitals: bool = False
+    lean: LeanConfig | None = None
+    monitor_interval: float | None = None
+    profile_template: ProfileTemplate | None = None
+
+    def install_key(self) -> tuple[str, str | None, str | None, str | None, bool]:
+        """Specs sharing this key share a single `install_driver` call"""
+        return (
+            Browser[self.browser.upper()].lower(),
+            self.driver_version or None,
+            self.browser_version,
+            self.browser_path,
+            self.headless == HEADLESS_SHELL,
+        )
+
+
+@dataclass
+class BatchResult:
+    """Drivers in the order of their specs; `None` where launching failed"""
+
+    drivers: list[T_WebDriver | None] = field(default_factory=list)
+    errors: dict[int, BaseException] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        """True when every driver launched"""
+        return not self.errors
+
+    def quit(self, timeout: float = DEFAULT_QUIT_TIMEOUT) -> None:
+        """Quit every driver that was launched, in parallel and within `timeout`"""
+        shutdown_all(self.drivers, timeout)
+
+
+def create_drivers(
+    specs: Iterable[DriverSpec],
+    max_workers: int | None = None,
+    raise_on_error: bool = False,
+) -> BatchResult:
+    """
+    Install and launch the drivers for `specs` in parallel.
+
+    Identical driver resolutions are done once, then every driver is launched
+    on a pool of at most `max_workers` threads. Failures are collected in
+    `BatchResult.errors` by spec index. With `raise_on_error` the drivers
+    that did launch are quit and the first failure is raised instead.
+    """
+    specs = list(specs)
+    result = BatchResult(drivers=[None] * len(specs))
+    if not specs:
+        return result
+
+    pending: dict[tuple, list[int]] = {}
+    for index, spec in enumerate(specs):
+        if spec.driver_path or spec.remote:
+            continue
+        try:
+            key = spec.install_key()
+        except KeyError as exc:
+            result.errors[index] = exc
+            continue
+        pending.setdefault(key, []).append(index)
+
+    workers = max_workers or len(specs)
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="create_drivers"
+    ) as pool:
+
+        def launch(index: int, driver_path: str | None, binary: str | None) -> None:
+            spec = specs[index]
+            launching[index] = pool.submit(
+                SetupSelenium.create_driver,
+                browser=spec.browser,
+                headless=spec.headless,
+                enable_log_performance=spec.enable_log_performance,
+                enable_log_console=spec.enable_log_console,
+                enable_log_driver=spec.enable_log_driver,
+                log_dir=spec.log_dir,
+                binary=binary,
+                driver_path=driver_path,
+                options=fresh_options(spec.options),
+                shared_service=spec.shared_service,
+                remote=spec.remote,
+                log_drain_interval=spec.log_drain_interval,
+                collect_vitals=spec.collect_vitals,
+                lean=spec.lean,
+                monitor_interval=spec.monitor_interval,
+                profile_template=spec.profile_template,
+            )
+
+        launching: dict[int, Future[T_WebDriver]] = {}
+        resolving = {
+            pool.submit(
+                SetupSelenium.install_driver,
+                browser=key[0],
+                driver_version=key[1],
+                browser_version=key[2],
+                browser_path=key[3],
+                headless_shell=key[4],
+            ): key
+            for key in pending
+        }
+
+        for index, spec in enumerate(specs):
+            if spec.driver_path or spec.remote:
+                launch(index, spec.driver_path, None)
+
+        # launch each group as soon as its own resolution is done
+        for future in as_completed(resolving):
+            key = resolving[future]
+            indexes = pending[key]
+            try:
+                driver_path, binary = future.result()
+                preflight(
+                    key[0],
+                    (driver_path, binary),
+                    driver_version=key[1],
+                    headless_shell=key[4],
+                )
+            except Exception as exc:  # noqa: BLE001
+                for index in indexes:
+                    result.errors[index] = exc
+                continue
+            for index in indexes:
+                launch(index, driver_path, binary)
+
+        for index, future in launching.items():
+            try:
+                result.drivers[index] = future.result()
+            except Exception as exc:  # noqa: BLE001
+                result.errors[index] = exc
+
+    for index, exc in sorted(result.errors.items()):
+        _setup.logger.error(f"failed to create driver for spec {index}: {exc!r}")
+
+    if raise_on_error and result.errors:
+        result.quit()
+        raise result.errors[min(result.errors)]
+    return result
@@ -0,0 +1,330 @@
+"""Caching of Selenium Manager driver resolutions"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os as os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import TYPE_CHECKING
+
+from selenium import __version__
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+__all__ = [
+    "DriverCache",
+    "FileLock",
+    "ResolutionMemo",
+    "driver_cache",
+    "resolution_memo",
+]
+
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "setup_selenium")
+# Selenium Manager itself considers resolved driver versions stale after an hour
+DEFAULT_TTL = 3600.0
+DEFAULT_MEMO_SIZE = 32
+# browser downloads can take a while on a slow connection
+DEFAULT_LOCK_TIMEOUT = 600.0
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on a file, shared between processes and threads.
+
+    Every acquisition opens its own handle so threads of the same process
+    exclude each other as well.
+    """
+
+    def __init__(
+        self, path: str, timeout: float = DEFAULT_LOCK_TIMEOUT, poll: float = 0.05
+    ) -> None:
+        self.path = path
+        self.timeout = timeout
+        self.poll = poll
+        self._fd: int | None = None
+
+    def _try_lock(self, fd: int) -> bool:
+        try:
+            if sys.platform == "win32":
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+
+    def acquire(self) -> None:
+        """Block until the lock is held or `timeout` seconds have passed"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        while not self._try_lock(fd):
+            if time.monotonic() > deadline:
+                os.close(fd)
+                msg = f"Timed out waiting for lock: {self.path}"
+                raise TimeoutError(msg)
+            time.sleep(self.poll)
+        self._fd = fd
+
+    def release(self) -> None:
+        """Release the lock if held"""
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if sys.platform == "win32":
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def __enter__(self) -> Self:
+        self.acquire()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.release()
+
+
+class DriverCache:
+    """
+    On-disk cache of `install_driver` resolutions.
+
+    Each resolution is stored in its own json file named after the hash of the
+    resolution key. Entries expire after `ttl` seconds and are discarded as soon
+    as either of the cached paths no longer exists.
+
+    Resolutions are serialized across processes with a lock file, so only one
+    process runs Selenium Manager while the others wait and read its result.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        ttl: float | None = None,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+    ) -> None:
+        cache_dir = cache_dir or os.getenv("SETUP_SELENIUM_CACHE_DIR")
+        self.cache_dir = os.path.abspath(
+            os.path.expanduser(cache_dir or DEFAULT_CACHE_DIR)
+        )
+        if ttl is None:
+            ttl = float(os.getenv("SETUP_SELENIUM_CACHE_TTL", DEFAULT_TTL))
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+
+    @staticmethod
+    def make_key(
+        browser: str,
+        driver_version: str | None = None,
+        browser_version: str | None = None,
+        browser_path: str | None = None,
+        install_browser: bool = False,
+    ) -> str:
+        """Build the cache key for a resolution request"""
+        parts = {
+            "browser": browser,
+            "driver_version": driver_version,
+            "browser_version": browser_version,
+            "browser_path": browser_path,
+            "install_browser": install_browser,
+            "selenium": __version__,
+        }
+        blob = json.dumps(parts, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        """Location of the entry for `key`"""
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> tuple[str, str] | None:
+        """Return the cached paths for `key` if the entry is still valid"""
+        path = self.entry_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            created = float(entry["created"])
+            driver_path = entry["driver_path"]
+            browser_path = entry["browser_path"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        if self.ttl >= 0 and time.time() - created > self.ttl:
+            self.invalidate(key)
+            return None
+        if not (os.path.isfile(driver_path) and os.path.isfile(browser_path)):
+            self.invalidate(key)
+            return None
+        return driver_path, browser_path
+
+    def replaced(self, key: str) -> bool:
+        """
+        Whether a binary of the entry for `key` changed after it was written.
+
+        Updates replace the files (or at least their metadata), which the
+        change time tells even when the installer keeps the modification time.
+        """
+        try:
+            with open(self.entry_path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+            created = float(entry["created"])
+            paths = (entry["driver_path"], entry["browser_path"])
+            return any(os.stat(path).st_ctime > created for path in paths)
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    def set(self, key: str, driver_path: str, browser_path: str) -> None:
+        """Store the paths for `key`"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = {
+            "created": time.time(),
+            "driver_path": driver_path,
+            "browser_path": browser_path,
+        }
+        path = self.entry_path(key)
+        # write then rename so readers never see a partially written entry
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+
+    @property
+    def lock_path(self) -> str:
+        """Lock file guarding Selenium Manager runs"""
+        return os.path.join(self.cache_dir, "selenium-manager.lock")
+
+    def get_or_resolve(
+        self, key: str, resolve: Callable[[], tuple[str, str]]
+    ) -> tuple[str, str]:
+        """
+        Return the cached paths for `key` or resolve and publish them.
+
+        Selenium Manager shares its download tree between all keys, so a single
+        lock serializes every resolution instead of one lock per key.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        with FileLock(self.lock_path, timeout=self.lock_timeout):
+            # another process may have published while we waited
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            paths = resolve()
+            self.set(key, *paths)
+        return paths
+
+    def invalidate(self, key: str) -> None:
+        """Remove a single entry"""
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.entry_path(key))
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                self.invalidate(name[: -len(".json")])
+
+
+driver_cache = DriverCache()
+
+
+class ResolutionMemo:
+    """
+    Thread-safe, single-flight, in-process memo of `install_driver` resolutions.
+
+    Concurrent callers asking for the same key wait on the one call already in
+    flight and share its result (or its exception). Resolved paths are kept in a
+    bounded LRU and re-checked for existence and age on every hit.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE, ttl: float = DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._results: OrderedDict[str, tuple[float, tuple[str, str]]] = OrderedDict()
+        self._inflight: dict[str, Future[tuple[str, str]]] = {}
+
+    def _lookup(self, key: str) -> tuple[str, str] | None:
+        """Return a still valid result for `key`; caller must hold the lock"""
+        if key not in self._results:
+            return None
+        created, paths = self._results[key]
+        expired = self.ttl >= 0 and time.monotonic() - created > self.ttl
+        if expired or not all(os.path.isfile(p) for p in paths):
+            del self._results[key]
+            return None
+        self._results.move_to_end(key)
+        return paths
+
+    def get_or_call(
+        self, key: str, func: Callable[[], tuple[str, str]]
+    ) -> tuple[str, str]:
+        """Return the memoized result for `key`, calling `func` at most once"""
+        with self._lock:
+            paths = self._lookup(key)
+            if paths is not None:
+                return paths
+            future = self._inflight.get(key)
+            leader = future is None
+            if future is None:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            paths = func()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+
+        with self._lock:
+            del self._inflight[key]
+            self._results[key] = (time.monotonic(), paths)
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        future.set_result(paths)
+        return paths
+
+    def invalidate(self, key: str) -> None:
+        """Forget a single result"""
+        with self._lock:
+            self._results.pop(key, None)
+
+    def clear(self) -> None:
+        """Forget every result"""
+        with self._lock:
+            self._results.clear()
+
+
+resolution_memo = ResolutionMemo(ttl=driver_cache.ttl)
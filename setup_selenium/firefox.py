@@ -0,0 +1,104 @@
+"""Firefox profiles serialized once per process and content"""
+
+from __future__ import annotations
+
+import hashlib
+import os as os
+import threading
+from collections import OrderedDict
+
+from selenium.webdriver.firefox.firefox_profile import FirefoxProfile
+
+__all__ = ["CachedFirefoxProfile", "cached_profile", "encoded_profiles"]
+
+# encoded profiles easily take megabytes
+DEFAULT_CACHE_SIZE = 8
+
+
+def profile_digest(path: str) -> str:
+    """Hash of the names and contents of every file below `path`"""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            filename = os.path.join(root, name)
+            digest.update(os.path.relpath(filename, path).encode("utf-8") + b"\0")
+            with open(filename, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class EncodedProfiles:
+    """Bounded LRU of zipped, base64 encoded profiles by content digest"""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._encoded: OrderedDict[str, str] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        """The encoded profile for `key`, if cached"""
+        with self._lock:
+            encoded = self._encoded.get(key)
+            if encoded is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._encoded.move_to_end(key)
+            return encoded
+
+    def put(self, key: str, encoded: str) -> None:
+        """Cache `encoded` for `key`, evicting the least recently used"""
+        with self._lock:
+            self._encoded[key] = encoded
+            self._encoded.move_to_end(key)
+            while len(self._encoded) > self.maxsize:
+                self._encoded.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every encoded profile"""
+        with self._lock:
+            self._encoded.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._encoded)
+
+
+encoded_profiles = EncodedProfiles()
+
+
+class CachedFirefoxProfile(FirefoxProfile):
+    """
+    A FirefoxProfile zipped and base64 encoded once per content.
+
+    Selenium encodes the profile of the options for every new session. The
+    digest of the profile's files (after writing its preferences to user.js)
+    is far cheaper than compressing them, so identical profiles, as used by a
+    whole test run, share one encoding in `encoded_profiles`.
+    """
+
+    @property
+    def encoded(self) -> str:
+        """Zipped, base64 encoded profile directory, from the cache if possible"""
+        if self._desired_preferences:
+            self.update_preferences()
+        key = profile_digest(self.path)
+        encoded = encoded_profiles.get(key)
+        if encoded is None:
+            encoded = super().encoded
+            encoded_profiles.put(key, encoded)
+        return encoded
+
+
+def cached_profile(profile: FirefoxProfile) -> CachedFirefoxProfile:
+    """`profile` with a cached encoding, sharing its directory and preferences"""
+    if isinstance(profile, CachedFirefoxProfile):
+        return profile
+    cached = CachedFirefoxProfile.__new__(CachedFirefoxProfile)
+    cached.__dict__.update(profile.__dict__)
+    return cached
@@ -0,0 +1,378 @@
+"""HAR export and page summaries from the chromium performance log"""
+
+from __future__ import annotations
+
+import bisect
+import gzip
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, ClassVar
+from urllib.parse import parse_qsl, urlsplit
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+
+__all__ = ["HarBuilder", "PageSummary", "write_har"]
+
+HAR_VERSION = "1.2"
+DEFAULT_SLOWEST = 5
+# requests reach the network after dns lookup, connecting or sending
+_FIRST_NETWORK_ACTIVITY = ("dnsStart", "connectStart", "sendStart")
+
+
+@dataclass
+class PageSummary:
+    """
+    Network totals of one page.
+
+    `bytes` is what went over the wire, `blocked` the milliseconds requests
+    spent queued or stalled before any network activity, and `duration` the
+    milliseconds from the first request to the last byte.
+    """
+
+    id: str
+    url: str
+    requests: int = 0
+    failed: int = 0
+    bytes: int = 0
+    blocked: float = 0.0
+    duration: float = 0.0
+    slowest: list[tuple[str, float]] = field(default_factory=list)
+
+    def add(self, entry: Mapping[str, Any], offset: float, keep: int) -> None:
+        """Count a finished HAR entry that ended `offset` ms after the page began"""
+        self.requests += 1
+        self.failed += "_error" in entry
+        self.bytes += max(entry["response"]["_transferSize"], 0)
+        self.blocked += max(entry["timings"]["blocked"], 0)
+        self.duration = max(self.duration, offset)
+        if keep <= 0:
+            return
+        url, time = entry["request"]["url"], entry["time"]
+        # slowest first; the list never grows beyond `keep`
+        index = bisect.bisect_right([-t for _, t in self.slowest], -time)
+        if index < keep:
+            self.slowest.insert(index, (url, time))
+            del self.slowest[keep:]
+
+
+@dataclass
+class _Request:
+    request_id: str
+    page: _Page
+    started: float
+    wall_time: float
+    params: dict[str, Any]
+    response: dict[str, Any] | None = None
+    received: int = 0
+
+
+@dataclass
+class _Page:
+    started: float
+    har: dict[str, Any]
+    summary: PageSummary
+
+
+def _iso(wall_time: float) -> str:
+    return datetime.fromtimestamp(wall_time, tz=timezone.utc).isoformat()
+
+
+def _headers(headers: Mapping[str, Any] | None) -> list[dict[str, str]]:
+    return [{"name": k, "value": str(v)} for k, v in (headers or {}).items()]
+
+
+def _ms(value: float) -> float:
+    return round(value, 3)
+
+
+def _timings(
+    started: float, finished: float, timing: Mapping[str, float] | None
+) -> dict[str, float]:
+    """HAR timings in ms from the devtools ResourceTiming of a response"""
+    total = max((finished - started) * 1000, 0.0)
+    if not timing:
+        # served from a cache, a data url or failed before reaching the network
+        timings = {"blocked": -1, "dns": -1, "connect": -1, "ssl": -1}
+        return {**timings, "send": 0, "wait": 0, "receive": _ms(total)}
+
+    def span(start: str, end: str) -> float:
+        begin, until = timing.get(start, -1), timing.get(end, -1)
+        return _ms(until - begin) if begin >= 0 and until >= 0 else -1
+
+    # ResourceTiming offsets are relative to requestTime, in ms
+    queued = (timing["requestTime"] - started) * 1000
+    first = next(
+        (timing[k] for k in _FIRST_NETWORK_ACTIVITY if timing.get(k, -1) >= 0), 0.0
+    )
+    headers_end = timing.get("receiveHeadersEnd", 0.0)
+    send_end = timing.get("sendEnd", 0.0)
+    return {
+        "blocked": _ms(max(queued + first, 0.0)),
+        "dns": span("dnsStart", "dnsEnd"),
+        "connect": span("connectStart", "connectEnd"),
+        "ssl": span("sslStart", "sslEnd"),
+        "send": _ms(max(send_end - timing.get("sendStart", 0.0), 0.0)),
+        "wait": _ms(max(headers_end - send_end, 0.0)),
+        "receive": _ms(
+            max((finished - timing["requestTime"]) * 1000 - headers_end, 0.0)
+        ),
+    }
+
+
+class HarBuilder:
+    """
+    Turns performance log entries into HAR entries in a single pass.
+
+    `feed` takes the entries of `get_log("performance")` (or `read_log`) one
+    at a time and returns the HAR entries of the requests they finished.
+    Only requests still in flight are kept in memory. A top level document
+    request starts a new page; `summaries` holds the totals of every page.
+    """
+
+    def __init__(self, slowest: int = DEFAULT_SLOWEST) -> None:
+        self.slowest = slowest
+        self.summaries: list[PageSummary] = []
+        self.pages: list[dict[str, Any]] = []
+        self._requests: dict[str, _Request] = {}
+        self._loaders: dict[str, _Page] = {}
+        self._page: _Page | None = None
+        self._main_frame: str | None = None
+
+    @property
+    def pending(self) -> int:
+        """Requests that started but did not finish (yet)"""
+        return len(self._requests)
+
+    def feed(self, log_entry: Mapping[str, Any]) -> list[dict[str, Any]]:
+        """Process one performance log entry; returns the HAR entries it finished"""
+        message = log_entry["message"]
+        if isinstance(message, str):
+            # most of the log is not about the network, skip it unparsed
+            if '"Network.' not in message and '"Page.' not in message:
+                return []
+            message = json.loads(message)
+        event = message.get("message", message)
+        method, params = event.get("method", ""), event.get("params", {})
+        handler = self._handlers.get(method)
+        if handler is None:
+            return []
+        return handler(self, params) or []
+
+    def feed_all(self, log: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+        """Process several log entries; returns the HAR entries they finished"""
+        finished = []
+        for log_entry in log:
+            finished.extend(self.feed(log_entry))
+        return finished
+
+    def _new_page(self, params: Mapping[str, Any]) -> _Page:
+        page_id = f"page_{len(self.pages) + 1}"
+        url = params.get("documentURL") or params["request"]["url"]
+        har = {
+            "startedDateTime": _iso(params.get("wallTime", 0.0)),
+            "id": page_id,
+            "title": url,
+            "pageTimings": {"onContentLoad": -1, "onLoad": -1},
+        }
+        page = _Page(params["timestamp"], har, PageSummary(page_id, url))
+        self.pages.append(har)
+        self.summaries.append(page.summary)
+        self._page = page
+        return page
+
+    def _page_for(self, params: Mapping[str, Any]) -> _Page:
+        loader = params.get("loaderId", "")
+        is_document = params.get("type") == "Document" and params["requestId"] == loader
+        frame = params.get("frameId")
+        if is_document and self._main_frame in (None, frame):
+            self._main_frame = frame
+            page = self._new_page(params)
+        else:
+            page = self._loaders.get(loader) or self._page or self._new_page(params)
+        self._loaders[loader] = page
+        return page
+
+    def _request_will_be_sent(
+        self, params: dict[str, Any]
+    ) -> list[dict[str, Any]] | None:
+        finished = None
+        redirect = params.get("redirectResponse")
+        previous = self._requests.pop(params["requestId"], None)
+        if previous is not None and redirect is not None:
+            previous.response = redirect
+            finished = [
+                self._finish(
+                    previous,
+                    params["timestamp"],
+                    redirect.get("encodedDataLength", 0),
+                    redirect_url=params["request"]["url"],
+                )
+            ]
+        # redirects stay on the page of the request they came from
+        page = previous.page if previous is not None else self._page_for(params)
+        self._requests[params["requestId"]] = _Request(
+            params["requestId"],
+            page,
+            params["timestamp"],
+            params.get("wallTime", 0.0),
+            params,
+        )
+        return finished
+
+    def _response_received(self, params: dict[str, Any]) -> None:
+        request = self._requests.get(params["requestId"])
+        if request is not None:
+            request.response = params["response"]
+
+    def _data_received(self, params: dict[str, Any]) -> None:
+        request = self._requests.get(params["requestId"])
+        if request is not None:
+            request.received += params.get("dataLength", 0)
+
+    def _loading_finished(self, params: dict[str, Any]) -> list[dict[str, Any]] | None:
+        request = self._requests.pop(params["requestId"], None)
+        if request is None:
+            return None
+        transferred = params.get("encodedDataLength", -1)
+        return [self._finish(request, params["timestamp"], transferred)]
+
+    def _loading_failed(self, params: dict[str, Any]) -> list[dict[str, Any]] | None:
+        request = self._requests.pop(params["requestId"], None)
+        if request is None:
+            return None
+        error = params.get("errorText") or "failed"
+        if params.get("canceled"):
+            error = "canceled"
+        return [self._finish(request, params["timestamp"], 0, error=error)]
+
+    def _page_timing(self, name: str, params: dict[str, Any]) -> None:
+        if self._page is not None:
+            offset = (params["timestamp"] - self._page.started) * 1000
+            self._page.har["pageTimings"][name] = _ms(offset)
+
+    def _dom_content_event_fired(self, params: dict[str, Any]) -> None:
+        self._page_timing("onContentLoad", params)
+
+    def _load_event_fired(self, params: dict[str, Any]) -> None:
+        self._page_timing("onLoad", params)
+
+    def _finish(
+        self,
+        request: _Request,
+        finished: float,
+        transferred: int,
+        redirect_url: str = "",
+        error: str | None = None,
+    ) -> dict[str, Any]:
+        sent = request.params["request"]
+        response = request.response or {}
+        protocol = response.get("protocol", "")
+        headers_size = response.get("encodedDataLength", -1)
+        if response.get("fromDiskCache") or response.get("fromServiceWorker"):
+            transferred = 0
+        timings = _timings(request.started, finished, response.get("timing"))
+        post_data = sent.get("postData")
+        har_request: dict[str, Any] = {
+            "method": sent.get("method", "GET"),
+            "url": sent["url"],
+            "httpVersion": protocol,
+            "cookies": [],
+            "headers": _headers(sent.get("headers")),
+            "queryString": [
+                {"name": k, "value": v}
+                for k, v in parse_qsl(urlsplit(sent["url"]).query)
+            ],
+            "headersSize": -1,
+            "bodySize": len(post_data.encode("utf-8")) if post_data else 0,
+        }
+        if post_data:
+            har_request["postData"] = {
+                "mimeType": (sent.get("headers") or {}).get("Content-Type", ""),
+                "text": post_data,
+            }
+        entry: dict[str, Any] = {
+            "pageref": request.page.summary.id,
+            "startedDateTime": _iso(request.wall_time),
+            "time": _ms(sum(max(v, 0) for k, v in timings.items() if k != "ssl")),
+            "request": har_request,
+            "response": {
+                "status": response.get("status", 0),
+                "statusText": response.get("statusText", ""),
+                "httpVersion": protocol,
+                "cookies": [],
+                "headers": _headers(response.get("headers")),
+                "content": {
+                    "size": request.received,
+                    "mimeType": response.get("mimeType", "x-unknown"),
+                },
+                "redirectURL": redirect_url,
+                "headersSize": -1,
+                "bodySize": (
+                    max(transferred - headers_size, 0)
+                    if transferred >= 0 and headers_size >= 0
+                    else -1
+                ),
+                "_transferSize": transferred,
+            },
+            "cache": {},
+            "timings": timings,
+            "_resourceType": request.params.get("type", "Other"),
+        }
+        if response.get("remoteIPAddress"):
+            entry["serverIPAddress"] = response["remoteIPAddress"]
+        if error is not None:
+            entry["_error"] = error
+        offset = (finished - request.page.started) * 1000
+        request.page.summary.add(entry, _ms(offset), self.slowest)
+        return entry
+
+    _handlers: ClassVar[dict[str, Callable[..., list[dict[str, Any]] | None]]] = {
+        "Network.requestWillBeSent": _request_will_be_sent,
+        "Network.responseReceived": _response_received,
+        "Network.dataReceived": _data_received,
+        "Network.loadingFinished": _loading_finished,
+        "Network.loadingFailed": _loading_failed,
+        "Page.domContentEventFired": _dom_content_event_fired,
+        "Page.loadEventFired": _load_event_fired,
+    }
+
+
+def _creator() -> dict[str, str]:
+    from importlib import metadata  # noqa: PLC0415
+
+    try:
+        version = metadata.version("setup-selenium-testing")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return {"name": "setup-selenium-testing", "version": version}
+
+
+def write_har(
+    log: Iterable[Mapping[str, Any]], path: str, slowest: int = DEFAULT_SLOWEST
+) -> list[PageSummary]:
+    """
+    Write the requests of a performance log to a HAR file at `path`.
+
+    Entries are written as their requests finish, so the log is never held in
+    memory as a whole; a path ending in ".gz" is gzip compressed. Returns the
+    summary of every page.
+    """
+    builder = HarBuilder(slowest=slowest)
+    opener: Any = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        header = {"version": HAR_VERSION, "creator": _creator()}
+        # leave the log object open so entries can be appended one by one
+        f.write(json.dumps({"log": header}, separators=(",", ":"))[:-2])
+        f.write(',"entries":[')
+        separator = ""
+        for log_entry in log:
+            for entry in builder.feed(log_entry):
+                f.write(separator)
+                f.write(json.dumps(entry, separators=(",", ":")))
+                separator = ","
+        f.write('],"pages":')
+        f.write(json.dumps(builder.pages, separators=(",", ":")))
+        f.write("}}")
+    return builder.summaries
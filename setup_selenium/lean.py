@@ -0,0 +1,315 @@
+"""Lean mode: block requests the tests do not need"""
+
+from __future__ import annotations
+
+import base64
+import collections
+import json
+import re
+import socketserver
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from .har import HarBuilder
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+
+    from selenium.webdriver.firefox.options import Options as FirefoxOptions
+    from typing_extensions import Self
+
+    from .setup_selenium import T_WebDriver
+
+__all__ = [
+    "DEFAULT_LEAN",
+    "LeanConfig",
+    "LeanMode",
+    "LeanReport",
+    "transfer_sizes",
+]
+
+_EXTENSIONS = {
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "media": ("mp4", "webm", "m4s", "m4v", "m3u8", "mpd", "mov", "mp3", "m4a", "ogg"),
+    "stylesheet": ("css",),
+}
+# by extension, with or without a query string
+RESOURCE_TYPE_PATTERNS = {
+    resource_type: tuple(p for ext in exts for p in (f"*.{ext}", f"*.{ext}?*"))
+    for resource_type, exts in _EXTENSIONS.items()
+}
+
+TRACKER_PATTERNS = (
+    "*google-analytics.com/*",
+    "*googletagmanager.com/*",
+    "*googlesyndication.com/*",
+    "*googleadservices.com/*",
+    "*doubleclick.net/*",
+    "*facebook.net/*",
+    "*connect.facebook.com/*",
+    "*hotjar.com/*",
+    "*cdn.segment.com/*",
+    "*api.segment.io/*",
+    "*mixpanel.com/*",
+    "*nr-data.net/*",
+    "*js-agent.newrelic.com/*",
+    "*fullstory.com/*",
+    "*clarity.ms/*",
+    "*fonts.googleapis.com/*",
+    "*fonts.gstatic.com/*",
+)
+
+
+def _regex(pattern: str) -> str:
+    """A regex matching urls like devtools matches `pattern`: `*` is the only wildcard"""
+    return "^" + "[\\s\\S]*".join(re.escape(part) for part in pattern.split("*")) + "$"
+
+
+@dataclass(frozen=True)
+class LeanConfig:
+    """
+    What lean mode blocks.
+
+    `url_patterns` use `*` as wildcard and match the whole url, e.g.
+    "*doubleclick.net/*". `resource_types` are any of "font", "image",
+    "media" and "stylesheet", blocked by their file extension.
+
+    With `count` chromium counts the blocked requests from the performance
+    log, which needs a `LogDrainer` (`log_drain_interval=`) to keep it from
+    piling up in chromedriver. Firefox always counts through its proxy.
+    """
+
+    url_patterns: tuple[str, ...] = ()
+    resource_types: tuple[str, ...] = ()
+    count: bool = False
+
+    def __post_init__(self) -> None:
+        unknown = set(self.resource_types) - set(RESOURCE_TYPE_PATTERNS)
+        if unknown:
+            msg = f"Unknown resource types: {', '.join(sorted(unknown))}"
+            raise ValueError(msg)
+        object.__setattr__(self, "url_patterns", tuple(self.url_patterns))
+        object.__setattr__(self, "resource_types", tuple(self.resource_types))
+
+    @property
+    def patterns(self) -> tuple[str, ...]:
+        """Every url pattern blocked, including those of the resource types"""
+        patterns = list(self.url_patterns)
+        for resource_type in self.resource_types:
+            patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+        return tuple(dict.fromkeys(patterns))
+
+    def rule_for(self, url: str) -> str:
+        """The first pattern blocking `url`, or an empty string"""
+        return next(
+            (p for p in self.patterns if re.match(_regex(p), url, re.DOTALL)),
+            "",
+        )
+
+    def pac_script(self, proxy: str) -> str:
+        """A proxy auto-config script sending blocked urls to `proxy`"""
+        # not shExpMatch: it treats "?" as a wildcard where devtools does not
+        regexes = [_regex(p) for p in self.patterns]
+        return (
+            "function FindProxyForURL(url, host) {\n"
+            f"  var patterns = {json.dumps(regexes)};\n"
+            "  for (var i = 0; i < patterns.length; i++) {\n"
+            f'    if (new RegExp(patterns[i]).test(url)) return "PROXY {proxy}";\n'
+            "  }\n"
+            '  return "DIRECT";\n'
+            "}\n"
+        )
+
+
+DEFAULT_LEAN = LeanConfig(url_patterns=TRACKER_PATTERNS, resource_types=("media",))
+
+
+@dataclass
+class LeanReport:
+    """
+    Requests lean mode blocked.
+
+    `bytes` is what the blocked urls transferred in a baseline run;
+    `unknown_size` counts blocked requests the baseline did not have.
+    """
+
+    requests: int = 0
+    bytes: int = 0
+    unknown_size: int = 0
+    by_rule: dict[str, int] = field(default_factory=dict)
+
+
+def transfer_sizes(log: Iterable[Mapping[str, Any]]) -> dict[str, int]:
+    """Bytes transferred per url in a performance log, e.g. of an unblocked run"""
+    sizes: dict[str, int] = {}
+    for entry in HarBuilder(slowest=0).feed_all(log):
+        size = entry["response"]["_transferSize"]
+        if size > 0:
+            sizes[entry["request"]["url"]] = size
+    return sizes
+
+
+class _BlockingHandler(socketserver.StreamRequestHandler):
+    server: _BlockingProxy
+
+    def handle(self) -> None:
+        request_line = self.rfile.readline(8192).decode("latin-1").split()
+        if len(request_line) >= 2:  # noqa: PLR2004
+            method, target = request_line[:2]
+            # the path of a tunneled request is encrypted; the host is all we get
+            url = (
+                f"https://{target.rsplit(':', 1)[0]}/"
+                if method == "CONNECT"
+                else target
+            )
+            self.server.on_blocked(url)
+        self.wfile.write(
+            b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+        )
+
+
+class _BlockingProxy(socketserver.ThreadingTCPServer):
+    """A proxy refusing, and counting, every request sent to it"""
+
+    daemon_threads = True
+
+    def __init__(self, on_blocked: Callable[[str], None]) -> None:
+        super().__init__(("127.0.0.1", 0), _BlockingHandler)
+        self.on_blocked = on_blocked
+
+    @property
+    def address(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host!s}:{port}"
+
+
+class LeanMode:
+    """
+    Blocks the requests of a `LeanConfig` in one browser and counts them.
+
+    Chromium blocks through devtools `Network.setBlockedURLs`; with
+    `LeanConfig.count` the blocked requests are counted from the performance
+    log entries the driver's `LogDrainer` hands over. Firefox gets a proxy
+    auto-config sending blocked urls to a local proxy which refuses and counts
+    them; call `firefox_preferences` before the browser starts.
+
+    The auto-config sends every other url direct, replacing whatever proxy
+    firefox would use otherwise, the system proxy included. `check_proxy`
+    refuses options which set a proxy of their own rather than silently
+    dropping it.
+    """
+
+    def __init__(self, config: LeanConfig, browser: str) -> None:
+        self.config = config
+        self.browser = browser.lower()
+        self.driver: T_WebDriver | None = None
+        self.blocked: collections.Counter[str] = collections.Counter()
+        self._lock = threading.Lock()
+        self._urls: dict[str, str] = {}
+        self._proxy: _BlockingProxy | None = None
+
+    @property
+    def chromium(self) -> bool:
+        """Whether blocking happens through devtools"""
+        return self.browser != "firefox"
+
+    def _on_blocked(self, url: str) -> None:
+        with self._lock:
+            self.blocked[url] += 1
+
+    @staticmethod
+    def check_proxy(options: FirefoxOptions) -> None:
+        """Raise `ValueError` if `options` set a proxy lean mode would replace"""
+        proxy_type = options.preferences.get("network.proxy.type", 0)
+        if options.proxy is not None or proxy_type != 0:
+            msg = "lean mode replaces the firefox proxy; options must not set one"
+            raise ValueError(msg)
+
+    def firefox_preferences(self) -> dict[str, Any]:
+        """Preferences routing blocked urls to the counting proxy"""
+        if self._proxy is None:
+            self._proxy = _BlockingProxy(self._on_blocked)
+            threading.Thread(
+                target=self._proxy.serve_forever,
+                kwargs={"poll_interval": 0.2},
+                name="lean-proxy",
+                daemon=True,
+            ).start()
+        pac = self.config.pac_script(self._proxy.address).encode("utf-8")
+        return {
+            "network.proxy.type": 2,
+            "network.proxy.autoconfig_url": "data:application/x-ns-proxy-autoconfig;"
+            f"base64,{base64.b64encode(pac).decode('ascii')}",
+            # match patterns against the full url of https requests too
+            "network.proxy.autoconfig_url.include_path": True,
+        }
+
+    def feed(self, log_entry: Mapping[str, Any]) -> None:
+        """Count the requests devtools blocked, from one performance log entry"""
+        message = log_entry["message"]
+        if '"Network.requestWillBeSent"' in message:
+            params = json.loads(message)["message"]["params"]
+            self._urls[params["requestId"]] = params["request"]["url"]
+        elif '"Network.loading' in message:
+            params = json.loads(message)["message"]["params"]
+            url = self._urls.pop(params["requestId"], None)
+            if params.get("blockedReason") == "inspector" and url is not None:
+                self._on_blocked(url)
+
+    def _on_logs(self, log_type: str, entries: list[dict[str, Any]]) -> None:
+        if log_type == "performance":
+            for entry in entries:
+                self.feed(entry)
+
+    def attach(self, driver: T_WebDriver) -> Self:
+        """Start blocking in `driver`, and stop the proxy when it quits"""
+        self.driver = driver
+        if self.chromium:
+            cdp = driver.execute_cdp_cmd  # type: ignore[union-attr]
+            cdp("Network.enable", {})
+            cdp("Network.setBlockedURLs", {"urls": list(self.config.patterns)})
+            drainer = getattr(driver, "log_drainer", None)
+            if self.config.count and drainer is not None:
+                # the drainer takes the entries; have it hand them over
+                drainer.listeners.append(self._on_logs)
+        quit_driver = driver.quit
+
+        def quit() -> None:  # noqa: A001
+            try:
+                quit_driver()
+            finally:
+                self.stop()
+
+        driver.quit = quit  # type: ignore[method-assign]
+        driver.lean = self  # type: ignore[union-attr]
+        return self
+
+    def stop(self) -> None:
+        """Stop the counting proxy"""
+        proxy, self._proxy = self._proxy, None
+        if proxy is not None:
+            proxy.shutdown()
+            proxy.server_close()
+
+    def report(self, baseline: Mapping[str, int] | None = None) -> LeanReport:
+        """
+        What was blocked so far.
+
+        `baseline` maps urls to the bytes they transfer when not blocked; see
+        `transfer_sizes`.
+        """
+        baseline = baseline or {}
+        report = LeanReport()
+        with self._lock:
+            blocked = dict(self.blocked)
+        for url, count in blocked.items():
+            report.requests += count
+            rule = self.config.rule_for(url)
+            report.by_rule[rule] = report.by_rule.get(rule, 0) + count
+            if url in baseline:
+                report.bytes += baseline[url] * count
+            else:
+                report.unknown_size += count
+        return report
@@ -0,0 +1,169 @@
+"""Streaming of browser logs to compressed jsonl files"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os as os
+import threading
+from typing import TYPE_CHECKING, Any, Callable
+
+from . import setup_selenium as _setup
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from types import TracebackType
+
+    from selenium.webdriver.chromium.webdriver import ChromiumDriver
+    from typing_extensions import Self
+
+__all__ = ["LogDrainer", "read_log"]
+
+DEFAULT_INTERVAL = 1.0
+
+LogListener = Callable[[str, "list[dict[str, Any]]"], None]
+
+
+class LogDrainer:
+    """
+    Moves the buffered browser logs of a driver into gzip compressed jsonl files.
+
+    Chromium drivers keep every log entry in memory until `get_log` is called.
+    The drainer calls it every `interval` seconds from a background thread and
+    appends the entries, one json object per line, to
+    `<log_dir>/<name>.<log type>.jsonl.gz`. Every batch is flushed, so the
+    files can be followed with `zcat` while the session runs. `listeners` are
+    called with the log type and entries of every batch as well.
+    """
+
+    def __init__(
+        self,
+        driver: ChromiumDriver,
+        log_dir: str = "./logs",
+        log_types: Iterable[str] = ("performance", "browser"),
+        interval: float = DEFAULT_INTERVAL,
+        name: str | None = None,
+    ) -> None:
+        if interval <= 0:
+            msg = f"interval must be positive, got {interval}"
+            raise ValueError(msg)
+        self.driver = driver
+        self.log_dir = os.path.abspath(os.path.expanduser(log_dir))
+        self.log_types = tuple(log_types)
+        self.interval = interval
+        self.name = name or f"session-{driver.session_id}"
+        self.paths = {
+            log_type: os.path.join(self.log_dir, f"{self.name}.{log_type}.jsonl.gz")
+            for log_type in self.log_types
+        }
+        self.counts = dict.fromkeys(self.log_types, 0)
+        self.listeners: list[LogListener] = []
+        self._files: dict[str, gzip.GzipFile] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _file(self, log_type: str) -> gzip.GzipFile:
+        if log_type not in self._files:
+            os.makedirs(self.log_dir, exist_ok=True)
+            # appending adds a gzip member, which readers handle transparently
+            self._files[log_type] = gzip.GzipFile(self.paths[log_type], "ab")
+        return self._files[log_type]
+
+    def drain(self) -> int:
+        """Move the entries buffered right now; returns how many were moved"""
+        moved = 0
+        with self._lock:
+            for log_type in self.log_types:
+                entries = self.driver.get_log(log_type)
+                if not entries:
+                    continue
+                lines = "".join(
+                    json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries
+                )
+                f = self._file(log_type)
+                f.write(lines.encode("utf-8"))
+                # a sync flush makes everything written so far readable
+                f.flush()
+                self.counts[log_type] += len(entries)
+                moved += len(entries)
+                for listener in self.listeners:
+                    try:
+                        listener(log_type, entries)
+                    except Exception:  # noqa: BLE001
+                        _setup.logger.warning("log listener failed", exc_info=True)
+        return moved
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.drain()
+            except Exception:  # noqa: BLE001
+                _setup.logger.warning(
+                    f"log drainer {self.name} stopped; the session is gone",
+                    exc_info=True,
+                )
+                return
+
+    def start(self) -> Self:
+        """Start draining in the background"""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"log-drainer-{self.name}", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, drain: bool = True) -> None:
+        """Stop draining; with `drain` whatever is still buffered is moved first"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        if drain:
+            try:
+                self.drain()
+            except Exception:  # noqa: BLE001
+                _setup.logger.warning(f"log drainer {self.name} failed a last drain")
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+
+    def attach(self) -> Self:
+        """Start draining and stop (after a last drain) when the driver quits"""
+        quit_driver = self.driver.quit
+
+        def quit() -> None:  # noqa: A001
+            self.stop()
+            quit_driver()
+
+        self.driver.quit = quit  # type: ignore[method-assign]
+        self.driver.log_drainer = self  # type: ignore[attr-defined]
+        return self.start()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+
+def read_log(path: str) -> Iterator[dict]:
+    """
+    Entries of a drained log file, one at a time.
+
+    A file still being written ends in an incomplete gzip member; reading
+    stops quietly at the last complete entry.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if line.endswith("\n"):
+                    yield json.loads(line)
+        except (EOFError, gzip.BadGzipFile):
+            return
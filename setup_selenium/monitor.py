@@ -0,0 +1,279 @@
+"""Cpu, memory, thread and file descriptor usage of driver and browser processes"""
+
+from __future__ import annotations
+
+import functools
+import os as os
+import statistics
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Callable
+
+from . import setup_selenium as _setup
+from .proc import PROC, driver_pid, process_tree
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+    from .setup_selenium import T_WebDriver
+
+__all__ = [
+    "ResourceMonitor",
+    "ResourceSample",
+    "ResourceSummary",
+    "set_resource_hook",
+]
+
+DEFAULT_INTERVAL = 1.0
+MiB = 1024 * 1024
+
+ResourceHook = Callable[["ResourceSummary"], None]
+
+_hook: ResourceHook | None = None
+
+
+def set_resource_hook(hook: ResourceHook | None) -> None:
+    """Set a callback receiving the summary of every monitor that stops"""
+    if hook is not None and not callable(hook):
+        msg = "hook must be callable"
+        raise TypeError(msg)
+
+    global _hook  # noqa: PLW0603
+    _hook = hook
+
+
+@functools.cache
+def _sysconf(name: str) -> int:
+    return os.sysconf(name)
+
+
+def _read(pid: int) -> tuple[int, int, int, int] | None:
+    """Cpu ticks, threads, rss bytes and open fds of `pid`; `None` once gone"""
+    base = os.path.join(PROC, str(pid))
+    try:
+        with open(os.path.join(base, "stat"), encoding="utf-8") as f:
+            # fields after the parenthesized command name, starting at state
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(os.path.join(base, "statm"), encoding="utf-8") as f:
+            resident = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    try:
+        fds = len(os.listdir(os.path.join(base, "fd")))
+    except OSError:
+        # processes of other users do not show their fds
+        fds = 0
+    ticks = int(fields[11]) + int(fields[12])
+    return ticks, int(fields[17]), resident * _sysconf("SC_PAGE_SIZE"), fds
+
+
+@dataclass(frozen=True)
+class ResourceSample:
+    """
+    Usage of a whole process tree at one point in time.
+
+    `time` is in seconds since monitoring started and `cpu` in percent of one
+    core since the previous sample (0 for the first one), so a tree keeping two
+    cores busy is at 200.
+    """
+
+    time: float
+    processes: int
+    cpu: float
+    rss: int
+    threads: int
+    fds: int
+
+
+_METRICS = ("processes", "cpu", "rss", "threads", "fds")
+
+
+@dataclass
+class ResourceSummary:
+    """Peak and mean of every metric, and the samples they came from"""
+
+    name: str
+    samples: list[ResourceSample] = field(default_factory=list)
+
+    @property
+    def peak(self) -> dict[str, float]:
+        """Highest value of every metric"""
+        if not self.samples:
+            return {}
+        return {m: max(getattr(s, m) for s in self.samples) for m in _METRICS}
+
+    @property
+    def mean(self) -> dict[str, float]:
+        """Mean of every metric over the samples"""
+        if not self.samples:
+            return {}
+        return {
+            m: statistics.fmean(getattr(s, m) for s in self.samples) for m in _METRICS
+        }
+
+    @property
+    def rss_growth(self) -> int:
+        """Rss at the last sample minus rss at the first; a hint of leaks"""
+        if not self.samples:
+            return 0
+        return self.samples[-1].rss - self.samples[0].rss
+
+    def as_dict(self, timeline: bool = True) -> dict[str, object]:
+        """Plain dict suitable for json or metrics backends"""
+        result: dict[str, object] = {
+            "name": self.name,
+            "duration": self.samples[-1].time if self.samples else 0.0,
+            "peak": self.peak,
+            "mean": self.mean,
+            "rss_growth": self.rss_growth,
+        }
+        if timeline:
+            result["timeline"] = [asdict(s) for s in self.samples]
+        return result
+
+    def describe(self) -> str:
+        """One line for the log"""
+        if not self.samples:
+            return f"{self.name}: no resource samples"
+        peak, mean = self.peak, self.mean
+        return (
+            f"{self.name}: {len(self.samples)} samples over "
+            f"{self.samples[-1].time:.1f}s, "
+            f"cpu peak {peak['cpu']:.0f}% mean {mean['cpu']:.0f}%, "
+            f"rss peak {peak['rss'] / MiB:.0f}MiB mean {mean['rss'] / MiB:.0f}MiB "
+            f"growth {self.rss_growth / MiB:+.0f}MiB, "
+            f"processes peak {peak['processes']:.0f}, "
+            f"threads peak {peak['threads']:.0f}, fds peak {peak['fds']:.0f}"
+        )
+
+
+class ResourceMonitor:
+    """
+    Samples the driver service of a driver and every process below it.
+
+    Every `interval` seconds a background thread reads cpu time, rss, threads
+    and open file descriptors of the tree from /proc (linux only). When
+    stopped, the summary is logged, then handed to `callback` or else the hook
+    of `set_resource_hook`. Drivers sharing a service share the tree.
+    """
+
+    def __init__(
+        self,
+        driver: T_WebDriver,
+        interval: float = DEFAULT_INTERVAL,
+        callback: ResourceHook | None = None,
+        name: str | None = None,
+    ) -> None:
+        if interval <= 0:
+            msg = f"interval must be positive, got {interval}"
+            raise ValueError(msg)
+        self.driver = driver
+        self.pid = driver_pid(driver)
+        self.interval = interval
+        self.callback = callback
+        self.name = name or f"session-{getattr(driver, 'session_id', self.pid)}"
+        self.summary = ResourceSummary(self.name)
+        self._ticks: dict[int, int] = {}
+        self._last: float | None = None
+        self._started = 0.0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sample(self) -> ResourceSample | None:
+        """Take one sample now; `None` once the driver process is gone"""
+        with self._lock:
+            now = time.monotonic()
+            if self._last is None:
+                self._started = self._last = now
+            readings = {}
+            for pid in process_tree(self.pid):
+                reading = _read(pid)
+                if reading is not None:
+                    readings[pid] = reading
+            if self.pid not in readings:
+                return None
+            # only processes seen last time have a cpu time to compare with
+            ticks = sum(
+                r[0] - self._ticks[pid]
+                for pid, r in readings.items()
+                if pid in self._ticks
+            )
+            elapsed = now - self._last
+            cpu = ticks / _sysconf("SC_CLK_TCK") / elapsed * 100 if elapsed else 0.0
+            self._ticks = {pid: r[0] for pid, r in readings.items()}
+            self._last = now
+            sample = ResourceSample(
+                time=now - self._started,
+                processes=len(readings),
+                cpu=cpu,
+                rss=sum(r[2] for r in readings.values()),
+                threads=sum(r[1] for r in readings.values()),
+                fds=sum(r[3] for r in readings.values()),
+            )
+            self.summary.samples.append(sample)
+            return sample
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                if self.sample() is None:
+                    return
+            except Exception:  # noqa: BLE001
+                _setup.logger.warning(
+                    f"resource monitor {self.name} stopped", exc_info=True
+                )
+                return
+
+    def start(self) -> Self:
+        """Start sampling in the background"""
+        if self._thread is None:
+            self.sample()
+            self._thread = threading.Thread(
+                target=self._run, name=f"resource-monitor-{self.name}", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> ResourceSummary:
+        """Take a last sample, stop sampling and report the summary"""
+        if self._stopped.is_set():
+            return self.summary
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sample()
+        _setup.logger.info(self.summary.describe())
+        callback = self.callback or _hook
+        if callback is not None:
+            try:
+                callback(self.summary)
+            except Exception:  # noqa: BLE001
+                _setup.logger.warning("resource hook failed", exc_info=True)
+        return self.summary
+
+    def attach(self) -> Self:
+        """Start sampling and stop, before the processes exit, when the driver quits"""
+        quit_driver = self.driver.quit
+
+        def quit() -> None:  # noqa: A001
+            self.stop()
+            quit_driver()
+
+        self.driver.quit = quit  # type: ignore[method-assign]
+        self.driver.resources = self  # type: ignore[union-attr]
+        return self.start()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop()
@@ -0,0 +1,365 @@
+"""Precomputed, immutable default options per browser"""
+
+from __future__ import annotations
+
+import copy
+import importlib
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from .setup_selenium import T_DrvOpts
+
+__all__ = [
+    "CHROME_TEMPLATE",
+    "EDGE_TEMPLATE",
+    "FIREFOX_TEMPLATE",
+    "LowMemory",
+    "OptionsTemplate",
+    "fresh_options",
+    "low_memory_template",
+    "merge_feature_flags",
+    "template_for",
+]
+
+_IMMUTABLE = (str, int, float, bool, type(None))
+
+# chromium only honors the last of each of these, so their values are merged
+_FEATURE_FLAGS = ("--enable-features", "--disable-features")
+
+_OPTIONS_CLASSES = {
+    "chrome": "selenium.webdriver.chrome.options",
+    "edge": "selenium.webdriver.edge.options",
+    "firefox": "selenium.webdriver.firefox.options",
+}
+
+
+def _freeze(value: Any) -> Any:  # noqa: ANN401
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:  # noqa: ANN401
+    if isinstance(value, MappingProxyType):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    if isinstance(value, _IMMUTABLE):
+        return value
+    return copy.deepcopy(value)
+
+
+def merge_feature_flags(arguments: Iterable[str]) -> list[str]:
+    """
+    Combine repeated --enable-features/--disable-features into one flag each.
+
+    The merged flag takes the place of the first one, keeping the order of the
+    features and dropping duplicates.
+    """
+    merged: list[str] = []
+    features: dict[str, dict[str, None]] = {}
+    for arg in arguments:
+        name, sep, value = arg.partition("=")
+        if not sep or name not in _FEATURE_FLAGS:
+            merged.append(arg)
+            continue
+        if name not in features:
+            features[name] = {}
+            merged.append(name)
+        features[name].update(dict.fromkeys(f for f in value.split(",") if f))
+    return [
+        f"{arg}={','.join(features[arg])}" if arg in features else arg for arg in merged
+    ]
+
+
+def _frozen_mapping(mapping: Mapping[str, Any] | None) -> MappingProxyType:
+    return _freeze(dict(mapping or {}))
+
+
+def _merge(base: Mapping[str, Any], extra: Mapping[str, Any] | None) -> dict:
+    merged = _thaw(base)
+    merged.update(copy.deepcopy(dict(extra or {})))
+    return merged
+
+
+@dataclass(frozen=True)
+class OptionsTemplate:
+    """
+    Frozen description of the options for one browser.
+
+    `build` turns the template into a new selenium options object without
+    re-validating every flag, so a template can be shared by any number of
+    sessions. Use `derive` for a customized variant.
+    """
+
+    browser: str
+    arguments: tuple[str, ...] = ()
+    experimental_options: Mapping[str, Any] = field(default_factory=dict, hash=False)
+    preferences: Mapping[str, Any] = field(default_factory=dict, hash=False)
+    capabilities: Mapping[str, Any] = field(default_factory=dict, hash=False)
+
+    def __post_init__(self) -> None:
+        browser = self.browser.lower()
+        if browser not in _OPTIONS_CLASSES:
+            msg = f"Unknown browser: {self.browser}"
+            raise ValueError(msg)
+        if self.experimental_options and browser == "firefox":
+            msg = "firefox does not support experimental options"
+            raise ValueError(msg)
+        if self.preferences and browser != "firefox":
+            msg = f"{browser} does not support preferences"
+            raise ValueError(msg)
+        object.__setattr__(self, "browser", browser)
+        object.__setattr__(
+            self, "arguments", tuple(merge_feature_flags(self.arguments))
+        )
+        for name in ("experimental_options", "preferences", "capabilities"):
+            object.__setattr__(self, name, _frozen_mapping(getattr(self, name)))
+
+    def build(self) -> T_DrvOpts:
+        """A new, independent options object for this template"""
+        module = importlib.import_module(_OPTIONS_CLASSES[self.browser])
+        options = module.Options()
+        for name, value in self.capabilities.items():
+            options.set_capability(name, _thaw(value))
+        for name, value in self.preferences.items():
+            options.set_preference(name, _thaw(value))
+        options.arguments.extend(self.arguments)
+        for name, value in self.experimental_options.items():
+            options.add_experimental_option(name, _thaw(value))
+        return options
+
+    def derive(
+        self,
+        arguments: Iterable[str] = (),
+        remove_arguments: Iterable[str] = (),
+        experimental_options: Mapping[str, Any] | None = None,
+        preferences: Mapping[str, Any] | None = None,
+        capabilities: Mapping[str, Any] | None = None,
+    ) -> OptionsTemplate:
+        """
+        A new template with changes applied on top of this one.
+
+        `remove_arguments` drops exact flags as well as valued ones, so
+        "--disable-features" also removes "--disable-features=Foo". Mappings
+        are merged one level deep, replacing existing keys. Features enabled
+        or disabled by `arguments` join those of the existing flags.
+        """
+        removed = tuple(remove_arguments)
+        kept = tuple(
+            arg
+            for arg in self.arguments
+            if not any(arg == r or arg.startswith(f"{r}=") for r in removed)
+        )
+        added = tuple(arg for arg in arguments if arg not in kept)
+        # arguments are merged into the single feature flags by __post_init__
+        return replace(
+            self,
+            arguments=kept + added,
+            experimental_options=_merge(
+                self.experimental_options, experimental_options
+            ),
+            preferences=_merge(self.preferences, preferences),
+            capabilities=_merge(self.capabilities, capabilities),
+        )
+
+
+def fresh_options(options: OptionsTemplate | T_DrvOpts | None) -> Any:  # noqa: ANN401
+    """Options for one more session: build templates, copy everything else"""
+    if options is None:
+        return None
+    if isinstance(options, OptionsTemplate):
+        return options.build()
+    # create_driver mutates the options it's given
+    return copy.deepcopy(options)
+
+
+################################################################################
+# the ultimate list of flags (created by the chromium dev group)
+# https://peter.sh/experiments/chromium-command-line-switches/
+
+# The list of options set below mostly came from this StackOverflow post
+# https://stackoverflow.com/q/48450594/2532408
+CHROMIUM_ARGUMENTS = (
+    # "--disable-features=ImprovedCookieControls,LazyFrameLoading,GlobalMediaControls,DestroyProfileOnBrowserClose,MediaRouter,DialMediaRouteProvider,AcceptCHFrame,AutoExpandDetailsElement,CertificateTransparencyComponentUpdater,AvoidUnnecessaryBeforeUnloadCheckSync",  # noqa: ERA001
+    "--disable-back-forward-cache",
+    "--disable-background-timer-throttling",
+    "--disable-breakpad",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-ipc-flooding-protection",
+    "--enable-features=NetworkService,NetworkServiceInProcess",
+    "--enable-logging",
+    "--export-tagged-pdf",
+    "--force-color-profile=srgb",
+    "--metrics-recording-only",
+    "--mute-audio",
+    # "--remote-debugging-pipe",  # noqa: ERA001
+    # fixes MUI fade issue
+    "--disable-renderer-backgrounding",
+    # fixes actionchains in headless
+    "--disable-backgrounding-occluded-windows",
+    "--disable-extensions",
+    "--allow-running-insecure-content",
+    "--ignore-certificate-errors",
+    "--disable-single-click-autofill",
+    "--disable-autofill-keyboard-accessory-view[8]",
+    "--disable-full-form-autofill-ios",
+    "--disable-infobars",
+    # chromedriver and edgedriver crash without these two in linux
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+)
+# do not prompt about HTTP connections being insecure
+HTTPS_FIRST_ARGUMENT = "--disable-features=HttpsFirstBalancedModeAutoEnable"
+CHROMIUM_EXPERIMENTAL_OPTIONS = {"prefs": {"autofill.profile_enabled": False}}
+
+CHROME_TEMPLATE = OptionsTemplate(
+    browser="chrome",
+    arguments=(
+        *CHROMIUM_ARGUMENTS,
+        # it's possible we no longer need to do these
+        "--disable-gpu",  # https://stackoverflow.com/q/51959986/2532408
+        HTTPS_FIRST_ARGUMENT,
+    ),
+    experimental_options=CHROMIUM_EXPERIMENTAL_OPTIONS,
+)
+
+EDGE_TEMPLATE = OptionsTemplate(
+    browser="edge",
+    arguments=(*CHROMIUM_ARGUMENTS, HTTPS_FIRST_ARGUMENT),
+    experimental_options=CHROMIUM_EXPERIMENTAL_OPTIONS,
+)
+
+FIREFOX_TEMPLATE = OptionsTemplate(
+    browser="firefox",
+    capabilities={"unhandledPromptBehavior": "ignore"},
+    preferences={
+        # profile settings
+        "app.update.auto": False,
+        "app.update.enabled": False,
+        "network.prefetch-next": False,
+        "network.dns.disablePrefetch": True,
+        "extensions.formautofill.addresses.capture.enabled": False,
+        # By default, headless Firefox runs as though no pointers capabilities
+        # are available.
+        # https://github.com/microsoft/playwright/issues/7769#issuecomment-966098074
+        #
+        # This impacts React Spectrum which uses an '(any-pointer: fine)'
+        # media query to determine font size. It also causes certain chart
+        # elements to always be visible that should only be visible on
+        # hover.
+        #
+        # Available values for pointer capabilities:
+        # NO_POINTER             0x00
+        # COARSE_POINTER         0x01
+        # FINE_POINTER           0x02
+        # HOVER_CAPABLE_POINTER  0x04
+        #
+        # Setting to 0x02 | 0x04 says the system supports a mouse
+        "ui.primaryPointerCapabilities": 0x02 | 0x04,
+        "ui.allPointerCapabilities": 0x02 | 0x04,
+    },
+)
+
+_TEMPLATES = {t.browser: t for t in (CHROME_TEMPLATE, EDGE_TEMPLATE, FIREFOX_TEMPLATE)}
+
+
+def template_for(browser: str) -> OptionsTemplate:
+    """The default template of `browser`"""
+    try:
+        return _TEMPLATES[browser.lower()]
+    except KeyError:
+        msg = f"Unknown browser: {browser}"
+        raise ValueError(msg) from None
+
+
+################################################################################
+# Chromium trading stability and isolation for a smaller footprint
+LOW_MEMORY_FEATURES = (
+    # isolated origins share the processes of their site
+    "IsolateOrigins",
+    "Translate",
+    "OptimizationHints",
+    "MediaRouter",
+    "DialMediaRouteProvider",
+    "AutofillServerCommunication",
+    "CertificateTransparencyComponentUpdater",
+    "InterestFeedContentSuggestions",
+)
+# no requests nobody asked for, and the memory of what would handle them
+BACKGROUND_NETWORKING_ARGUMENTS = (
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-domain-reliability",
+    "--disable-client-side-phishing-detection",
+    "--disable-sync",
+    "--no-default-browser-check",
+    "--no-first-run",
+)
+MiB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class LowMemory:
+    """
+    Opt-in chromium settings for packing many browsers on one machine.
+
+    `renderer_process_limit` caps the renderer processes, so tabs and frames
+    of different sites share them. Turning off `site_isolation` is what allows
+    that sharing for cross-site frames; only do so for trusted pages. Caches
+    go to `cache_dir` (e.g. a tmpfs) when given, capped at the given sizes.
+    """
+
+    renderer_process_limit: int | None = 2
+    site_isolation: bool = False
+    cache_dir: str | None = None
+    disk_cache_size: int = 32 * MiB
+    media_cache_size: int = 1 * MiB
+    background_networking: bool = False
+
+    def __post_init__(self) -> None:
+        limit = self.renderer_process_limit
+        if limit is not None and limit < 1:
+            msg = "renderer_process_limit must be at least 1"
+            raise ValueError(msg)
+        if self.disk_cache_size < 0 or self.media_cache_size < 0:
+            msg = "cache sizes must not be negative"
+            raise ValueError(msg)
+
+    def arguments(self) -> tuple[str, ...]:
+        """Chromium flags of these settings"""
+        args = [
+            f"--disk-cache-size={self.disk_cache_size}",
+            f"--media-cache-size={self.media_cache_size}",
+        ]
+        if self.renderer_process_limit is not None:
+            args.append(f"--renderer-process-limit={self.renderer_process_limit}")
+        if self.cache_dir:
+            args.append(f"--disk-cache-dir={self.cache_dir}")
+        features = LOW_MEMORY_FEATURES
+        if self.site_isolation:
+            features = tuple(f for f in features if f != "IsolateOrigins")
+        else:
+            args.extend(("--process-per-site", "--disable-site-isolation-trials"))
+        if not self.background_networking:
+            args.extend(BACKGROUND_NETWORKING_ARGUMENTS)
+        args.append(f"--disable-features={','.join(features)}")
+        return tuple(args)
+
+
+def low_memory_template(
+    browser: str, preset: LowMemory | None = None
+) -> OptionsTemplate:
+    """The default template of a chromium `browser` with a `LowMemory` preset"""
+    template = template_for(browser)
+    if template.browser == "firefox":
+        msg = "the low memory preset is only available for chrome and edge"
+        raise ValueError(msg)
+    return template.derive(arguments=(preset or LowMemory()).arguments())
@@ -0,0 +1,288 @@
+"""Pool of pre-launched webdrivers"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from . import setup_selenium as _setup
+from .options import fresh_options
+from .reset import reset_session
+from .setup_selenium import HEADLESS_SHELL, Browser, SetupSelenium
+from .teardown import DEFAULT_QUIT_TIMEOUT, shutdown
+from .versions import preflight
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+    from .setup_selenium import T_WebDriver
+
+__all__ = ["DriverPool"]
+
+
+class DriverPool:
+    """
+    Keeps warm webdrivers ready to be leased.
+
+    Drivers are launched in the background with `SetupSelenium.create_driver`.
+    The pool tries to keep `min_size` drivers idle and never has more than
+    `max_size` drivers launched (idle or leased). Returned drivers are reset in
+    the background, by `reset` or else `reset.reset_session`, and go back to
+    the pool; idle drivers above `min_size` are quit once they have been idle
+    for `idle_timeout` seconds. Drivers are quit within `quit_timeout`
+    seconds, after which their processes are killed.
+
+    Any extra keyword arguments are passed on to `SetupSelenium.create_driver`.
+    """
+
+    def __init__(
+        self,
+        browser: Browser = Browser.CHROME,
+        min_size: int = 1,
+        max_size: int = 4,
+        idle_timeout: float = 300.0,
+        reset: Callable[[T_WebDriver], None] | None = None,
+        quit_timeout: float = DEFAULT_QUIT_TIMEOUT,
+        driver_version: str | None = None,
+        browser_version: str | None = None,
+        browser_path: str | None = None,
+        **driver_kwargs: Any,
+    ) -> None:
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            msg = f"invalid pool size: min_size={min_size}, max_size={max_size}"
+            raise ValueError(msg)
+        self.browser = browser
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.reset = reset or reset_session
+        self.quit_timeout = quit_timeout
+        self.driver_version = driver_version
+        self.browser_version = browser_version
+        self.browser_path = browser_path
+        self.driver_kwargs = driver_kwargs
+
+        self._cond = threading.Condition()
+        self._idle: deque[tuple[float, T_WebDriver]] = deque()
+        self._leased: set[int] = set()
+        self._pending = 0
+        self._waiting = 0
+        self._error: BaseException | None = None
+        self._closed = False
+        self._paths: tuple[str, str] | None = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_size, thread_name_prefix="driverpool"
+        )
+        self._maintainer = threading.Thread(
+            target=self._maintain, name="driverpool-maintainer", daemon=True
+        )
+        self._maintainer.start()
+
+    ############################################################################
+    @property
+    def size(self) -> int:
+        """Number of drivers launched, being launched or being reset"""
+        with self._cond:
+            return self._total()
+
+    @property
+    def idle(self) -> int:
+        """Number of drivers ready to be leased"""
+        with self._cond:
+            return len(self._idle)
+
+    def _total(self) -> int:
+        return len(self._idle) + len(self._leased) + self._pending
+
+    def _create(self) -> T_WebDriver:
+        kwargs = dict(self.driver_kwargs)
+        if kwargs.get("options") is not None:
+            kwargs["options"] = fresh_options(kwargs["options"])
+        # remote drivers are installed by the remote end
+        if kwargs.get("remote") is None:
+            if self._paths is None:
+                headless_shell = kwargs.get("headless") == HEADLESS_SHELL
+                paths = SetupSelenium.install_driver(
+                    browser=self.browser,
+                    driver_version=self.driver_version,
+                    browser_version=self.browser_version,
+                    browser_path=self.browser_path,
+                    headless_shell=headless_shell,
+                )
+                if not kwargs.get("driver_path"):
+                    preflight(
+                        self.browser,
+                        paths,
+                        driver_version=self.driver_version,
+                        headless_shell=headless_shell,
+                    )
+                self._paths = paths
+            driver_path, binary = self._paths
+            kwargs.setdefault("driver_path", driver_path)
+            kwargs.setdefault("binary", binary)
+        return SetupSelenium.create_driver(browser=self.browser, **kwargs)
+
+    def _spawn(self) -> None:
+        """Launch a driver in the background; caller must hold the lock"""
+        self._pending += 1
+        self._executor.submit(self._launch)
+
+    def _launch(self) -> None:
+        try:
+            driver = self._create()
+        except Exception as exc:  # noqa: BLE001
+            _setup.logger.exception("driver pool failed to launch a driver")
+            with self._cond:
+                self._pending -= 1
+                self._error = exc
+                self._cond.notify_all()
+            return
+        self._add_idle(driver)
+
+    def _recycle(self, driver: T_WebDriver) -> None:
+        try:
+            self.reset(driver)
+        except Exception:  # noqa: BLE001
+            _setup.logger.warning("driver pool failed to reset a driver; replacing it")
+            self._quit(driver)
+            with self._cond:
+                self._pending -= 1
+                self._refill()
+                self._cond.notify_all()
+            return
+        self._add_idle(driver)
+
+    def _add_idle(self, driver: T_WebDriver) -> None:
+        with self._cond:
+            self._pending -= 1
+            closed = self._closed
+            if not closed:
+                self._error = None
+                self._idle.append((time.monotonic(), driver))
+                self._cond.notify_all()
+        if closed:
+            self._quit(driver)
+
+    def _quit(self, driver: T_WebDriver) -> None:
+        if not shutdown(driver, self.quit_timeout):
+            _setup.logger.warning("driver pool failed to quit a driver")
+
+    def _refill(self) -> None:
+        """Top the idle drivers up to `min_size`; caller must hold the lock"""
+        # after a failed launch wait for the next acquire to try again
+        while (
+            not self._closed
+            and self._error is None
+            and len(self._idle) + self._pending < self.min_size
+            and self._total() < self.max_size
+        ):
+            self._spawn()
+
+    def _maintain(self) -> None:
+        interval = max(min(self.idle_timeout / 2, 1.0), 0.01)
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                self._refill()
+                now = time.monotonic()
+                while (
+                    self._idle
+                    and len(self._idle) > self.min_size
+                    and now - self._idle[0][0] > self.idle_timeout
+                ):
+                    _, driver = self._idle.popleft()
+                    self._executor.submit(self._quit, driver)
+                self._cond.wait(interval)
+
+    ############################################################################
+    def acquire(self, timeout: float | None = None) -> T_WebDriver:
+        """Lease a driver, launching one if the pool is empty but not full"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    msg = "driver pool is closed"
+                    raise RuntimeError(msg)
+                if self._idle:
+                    # most recently used first so the rest can age out
+                    _, driver = self._idle.pop()
+                    self._leased.add(id(driver))
+                    self._refill()
+                    return driver
+                if self._error is not None and self._pending == 0:
+                    error, self._error = self._error, None
+                    raise error
+                if self._pending <= self._waiting and self._total() < self.max_size:
+                    self._spawn()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    msg = "timed out waiting for a driver from the pool"
+                    raise TimeoutError(msg)
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def release(self, driver: T_WebDriver, discard: bool = False) -> None:
+        """Return a leased driver; it is reset in the background before reuse"""
+        with self._cond:
+            if id(driver) not in self._leased:
+                msg = "driver was not leased from this pool"
+                raise ValueError(msg)
+            self._leased.discard(id(driver))
+            closed = self._closed
+            if not closed and discard:
+                self._executor.submit(self._quit, driver)
+                self._refill()
+                self._cond.notify_all()
+            elif not closed:
+                self._pending += 1
+                self._executor.submit(self._recycle, driver)
+        if closed:
+            self._quit(driver)
+
+    @contextlib.contextmanager
+    def lease(self, timeout: float | None = None) -> Iterator[T_WebDriver]:
+        """Lease a driver for the duration of the block"""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except BaseException:
+            # state of the driver is unknown, don't hand it out again
+            self.release(driver, discard=True)
+            raise
+        self.release(driver)
+
+    def close(self) -> None:
+        """Quit every idle driver; leased drivers are quit when released"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            idle = [driver for _, driver in self._idle]
+            self._idle.clear()
+            self._cond.notify_all()
+        for driver in idle:
+            self._executor.submit(self._quit, driver)
+        self._maintainer.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
@@ -0,0 +1,150 @@
+"""Memory of driver and browser processes, read from /proc (linux only)"""
+
+from __future__ import annotations
+
+import os as os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .setup_selenium import T_WebDriver
+
+__all__ = [
+    "TreeMemory",
+    "driver_pid",
+    "process_tree",
+    "session_memory",
+    "start_time",
+    "tree_memory",
+]
+
+PROC = "/proc"
+
+
+def require_proc() -> None:
+    """Raise `RuntimeError` on platforms without /proc"""
+    if not os.path.isdir(PROC):
+        msg = f"reading processes needs {PROC}, which this platform lacks"
+        raise RuntimeError(msg)
+
+
+def _stat(pid: int) -> list[str] | None:
+    """Fields of /proc/<pid>/stat from the state on; `None` once it is gone"""
+    try:
+        with open(os.path.join(PROC, str(pid), "stat"), encoding="utf-8") as f:
+            # the command name may hold spaces and parentheses; the fields
+            # after its closing parenthesis do not
+            return f.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+
+
+def _parent_pids() -> dict[int, list[int]]:
+    """Child pids of every running process"""
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir(PROC):
+        if not entry.isdigit():
+            continue
+        fields = _stat(int(entry))
+        if fields is None:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+    return children
+
+
+def start_time(pid: int) -> int | None:
+    """
+    When `pid` started, in clock ticks since boot; `None` unless it runs.
+
+    Together with the pid this identifies a process, as pids are reused.
+    """
+    fields = _stat(pid)
+    if fields is None or fields[0] in ("Z", "X"):
+        return None
+    return int(fields[19])
+
+
+def process_tree(pid: int) -> list[int]:
+    """`pid` followed by all of its descendants"""
+    require_proc()
+    children = _parent_pids()
+    tree, todo = [pid], [pid]
+    while todo:
+        for child in children.get(todo.pop(), []):
+            tree.append(child)
+            todo.append(child)
+    return tree
+
+
+def _memory(pid: int) -> tuple[int, int]:
+    """Rss and pss of `pid` in bytes; zeros once it is gone"""
+    values = {}
+    try:
+        with open(os.path.join(PROC, str(pid), "smaps_rollup"), encoding="utf-8") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in ("Rss", "Pss"):
+                    values[name] = int(rest.split()[0]) * 1024
+    except OSError:
+        pass
+    if "Rss" not in values:
+        # kernels before 4.14 have no smaps_rollup; pss is then unknown
+        try:
+            with open(os.path.join(PROC, str(pid), "status"), encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        values["Rss"] = int(line.split()[1]) * 1024
+        except OSError:
+            pass
+    rss = values.get("Rss", 0)
+    return rss, values.get("Pss", rss)
+
+
+@dataclass
+class TreeMemory:
+    """
+    Memory of a process tree in bytes.
+
+    `rss` counts shared pages once per process, so it overstates what the
+    tree costs; `pss` splits them between the processes sharing them and is
+    the better figure to size machines by.
+    """
+
+    pids: list[int]
+    rss: int
+    pss: int
+
+    @property
+    def processes(self) -> int:
+        """Number of processes in the tree"""
+        return len(self.pids)
+
+
+def tree_memory(pid: int) -> TreeMemory:
+    """Memory of `pid` and all of its descendants"""
+    pids = process_tree(pid)
+    rss = pss = 0
+    for p in pids:
+        p_rss, p_pss = _memory(p)
+        rss += p_rss
+        pss += p_pss
+    return TreeMemory(pids, rss, pss)
+
+
+def driver_pid(driver: T_WebDriver) -> int:
+    """Pid of the local driver service of `driver`"""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is None:
+        msg = "driver has no local driver process"
+        raise ValueError(msg)
+    return process.pid
+
+
+def session_memory(driver: T_WebDriver) -> TreeMemory:
+    """
+    Memory of the driver service of `driver` and the browser it launched.
+
+    Drivers sharing a service (`shared_service=True`) share the tree, so the
+    result covers all of their browsers.
+    """
+    return tree_memory(driver_pid(driver))
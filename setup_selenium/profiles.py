@@ -0,0 +1,297 @@
+"""Pre-warmed browser profiles, cloned for every session"""
+
+from __future__ import annotations
+
+import contextlib
+import errno
+import fnmatch
+import hashlib
+import json
+import os as os
+import shutil
+import sys
+import tempfile
+import time
+from typing import TYPE_CHECKING
+
+from . import setup_selenium as _setup
+from .cache import DEFAULT_CACHE_DIR, FileLock
+from .options import OptionsTemplate, fresh_options
+from .setup_selenium import Browser
+from .teardown import shutdown
+
+if sys.platform != "win32":
+    import fcntl
+
+if TYPE_CHECKING:
+    from .setup_selenium import T_DrvOpts, T_WebDriver
+
+__all__ = ["ProfileTemplate", "clone_tree", "use_profile"]
+
+DEFAULT_PROFILE_DIR = os.path.join(DEFAULT_CACHE_DIR, "profiles")
+# long enough for component registration and the first database writes
+DEFAULT_SETTLE = 3.0
+MARKER = ".setup_selenium_template"
+
+# linux ioctl sharing the extents of one file with another (btrfs, xfs, ...)
+FICLONE = 0x40049409
+# unsupported by the filesystem, or source and clone on different ones
+_NO_REFLINK = {errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV, errno.ENOSYS}
+
+# held by a running browser; a clone must not look like a profile in use
+LOCK_FILES = frozenset(
+    {"SingletonLock", "SingletonSocket", "SingletonCookie", "lock", ".parentlock"}
+)
+
+# Files the browser only ever replaces as a whole, so clones can share them
+# through hardlinks: component data unpacked into versioned directories and
+# firefox's media plugins. Anything else may be written in place, like the
+# sqlite databases, and is copied.
+HARDLINK_SAFE = (
+    "AutofillStates/*",
+    "CertificateRevocation/*",
+    "Crowd Deny/*",
+    "FileTypePolicies/*",
+    "FirstPartySetsPreloaded/*",
+    "MEIPreload/*",
+    "OnDeviceHeadSuggestModel/*",
+    "OriginTrials/*",
+    "SSLErrorAssistant/*",
+    "Subresource Filter/Unindexed Rules/*",
+    "TrustTokenKeyCommitments/*",
+    "WidevineCdm/*",
+    "ZxcvbnData/*",
+    "hyphen-data/*",
+    "pki_metadata/*",
+    "gmp-gmpopenh264/*",
+    "gmp-widevinecdm/*",
+)
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """Clone `src` to `dst` sharing its extents; `False` if unsupported"""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    except OSError as exc:
+        # an empty file left behind would keep the hardlink from being made
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(dst)
+        if exc.errno in _NO_REFLINK:
+            return False
+        raise
+    shutil.copystat(src, dst)
+    return True
+
+
+def clone_tree(src: str, dst: str, reflink: bool = True) -> dict[str, int]:
+    """
+    Clone the directory `src` into the existing directory `dst`.
+
+    Every file is reflinked where the filesystem supports it, hardlinked when
+    it matches `HARDLINK_SAFE` and copied otherwise. `LOCK_FILES` are left
+    out. Returns how many files were cloned each way.
+    """
+    counts = {"reflink": 0, "hardlink": 0, "copy": 0}
+    for root, dirs, files in os.walk(src):
+        rel_root = os.path.relpath(root, src)
+        target_root = dst if rel_root == "." else os.path.join(dst, rel_root)
+        for name in dirs:
+            path = os.path.join(root, name)
+            if os.path.islink(path):
+                os.symlink(os.readlink(path), os.path.join(target_root, name))
+            else:
+                os.makedirs(os.path.join(target_root, name), exist_ok=True)
+        for name in files:
+            if name in LOCK_FILES or name == MARKER:
+                continue
+            path, target = os.path.join(root, name), os.path.join(target_root, name)
+            if os.path.islink(path):
+                os.symlink(os.readlink(path), target)
+                continue
+            rel = os.path.normpath(os.path.join(rel_root, name)).replace(os.sep, "/")
+            if reflink:
+                if _reflink(path, target):
+                    counts["reflink"] += 1
+                    continue
+                # the whole tree lives on the same filesystem
+                reflink = False
+            if any(fnmatch.fnmatchcase(rel, pattern) for pattern in HARDLINK_SAFE):
+                try:
+                    os.link(path, target)
+                    counts["hardlink"] += 1
+                    continue
+                except OSError:
+                    pass
+            shutil.copy2(path, target)
+            counts["copy"] += 1
+    return counts
+
+
+def profile_argument(browser: str, options: T_DrvOpts) -> str | None:
+    """The profile directory `options` already point the browser at, if any"""
+    arguments = list(options.arguments)
+    if browser == Browser.FIREFOX:
+        if "-profile" in arguments[:-1]:
+            return arguments[arguments.index("-profile") + 1]
+        return None
+    for argument in arguments:
+        if argument.startswith("--user-data-dir="):
+            return argument.partition("=")[2]
+    return None
+
+
+def use_profile(browser: str, options: T_DrvOpts, path: str) -> None:
+    """Point the browser of `options` at the profile directory `path`"""
+    browser = browser.lower()
+    existing = profile_argument(browser, options)
+    if existing is not None:
+        msg = f"options already use the profile {existing}"
+        raise ValueError(msg)
+    if browser == Browser.FIREFOX:
+        # geckodriver uses a profile passed this way in place, without copying
+        options.add_argument("-profile")
+        options.add_argument(path)
+    else:
+        options.add_argument(f"--user-data-dir={path}")
+
+
+def attach_profile(driver: T_WebDriver, path: str) -> None:
+    """Remove the profile directory `path` once `driver` quits"""
+    quit_driver = driver.quit
+
+    def quit() -> None:  # noqa: A001
+        try:
+            quit_driver()
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    driver.quit = quit  # type: ignore[method-assign]
+    driver.profile_dir = path  # type: ignore[union-attr]
+
+
+class ProfileTemplate:
+    """
+    A browser profile warmed up once, cloned into a fresh directory per session.
+
+    A new profile costs every launch its first-run work: component
+    registration, database creation and preference migration. `build`
+    launches the browser once on an empty profile with the default options of
+    `browser` (or `options`), lets it settle for `settle` seconds and keeps the
+    result in `directory`, by default a directory in the driver cache keyed by
+    browser, binary and arguments. The template is built once per machine,
+    processes waiting on a lock for the one building it.
+
+    Pass the template as `profile_template=` when creating drivers; every
+    session runs on its own clone (see `clone_tree`), removed when it quits.
+    """
+
+    def __init__(
+        self,
+        browser: Browser = Browser.CHROME,
+        directory: str | None = None,
+        binary: str | None = None,
+        driver_path: str | None = None,
+        options: T_DrvOpts | OptionsTemplate | None = None,
+        settle: float = DEFAULT_SETTLE,
+    ) -> None:
+        self.browser = Browser[browser.upper()]
+        self.binary = binary
+        self.driver_path = driver_path
+        self.options = options
+        self.settle = settle
+        if directory is None:
+            directory = os.path.join(
+                os.path.expanduser(DEFAULT_PROFILE_DIR), self._key()
+            )
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self._reflink = True
+
+    def _build_options(self) -> T_DrvOpts:
+        options = fresh_options(self.options)
+        if options is None:
+            options = _setup.SetupSelenium.options_template(self.browser).build()
+        return options
+
+    def _key(self) -> str:
+        """Name of the default directory, changing with what shapes the profile"""
+        options = self._build_options()
+        key = json.dumps([self.browser.lower(), self.binary, sorted(options.arguments)])
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        return f"{self.browser.lower()}-{digest}"
+
+    @property
+    def ready(self) -> bool:
+        """Whether the template has been built"""
+        return os.path.isfile(os.path.join(self.directory, MARKER))
+
+    def build(self, rebuild: bool = False) -> str:
+        """Build the template unless it exists; returns its directory"""
+        parent = os.path.dirname(self.directory)
+        os.makedirs(parent, exist_ok=True)
+        with FileLock(self.directory + ".lock"):
+            if self.ready and not rebuild:
+                return self.directory
+            staging = tempfile.mkdtemp(prefix=".building-", dir=parent)
+            try:
+                self._warm_up(staging)
+                for name in LOCK_FILES:
+                    path = os.path.join(staging, name)
+                    if os.path.lexists(path):
+                        os.remove(path)
+                with open(os.path.join(staging, MARKER), "w", encoding="utf-8"):
+                    pass
+                if os.path.exists(self.directory):
+                    shutil.rmtree(self.directory)
+                os.replace(staging, self.directory)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+        _setup.logger.info(f"built {self.browser} profile template {self.directory}")
+        return self.directory
+
+    def _warm_up(self, path: str) -> None:
+        options = self._build_options()
+        use_profile(self.browser, options, path)
+        start = time.perf_counter()
+        driver = _setup.SetupSelenium.create_driver(
+            self.browser,
+            headless=True,
+            binary=self.binary,
+            driver_path=self.driver_path,
+            options=options,
+        )
+        try:
+            driver.get("about:blank")
+            time.sleep(self.settle)
+        finally:
+            shutdown(driver)
+        _setup.logger.debug(
+            f"warmed up {self.browser} profile in {time.perf_counter() - start:.1f}s"
+        )
+
+    def clone(self) -> str:
+        """A fresh copy of the template in a new directory next to it"""
+        if not self.ready:
+            self.build()
+        # on the template's filesystem, or neither reflinks nor hardlinks work
+        path = tempfile.mkdtemp(
+            prefix=f".clone-{self.browser.lower()}-",
+            dir=os.path.dirname(self.directory),
+        )
+        try:
+            start = time.perf_counter()
+            counts = clone_tree(self.directory, path, reflink=self._reflink)
+        except BaseException:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+        # no need to try again on every session once it failed
+        self._reflink = counts["reflink"] > 0 or not any(counts.values())
+        _setup.logger.debug(
+            f"cloned profile template in {(time.perf_counter() - start) * 1000:.1f}ms"
+            f" ({counts['reflink']} reflinked, {counts['hardlink']} hardlinked,"
+            f" {counts['copy']} copied)"
+        )
+        return path
@@ -0,0 +1,67 @@
+"""Connections to remote webdrivers such as a Selenium Grid"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from selenium import __version__
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.client_config import ClientConfig
+
+__all__ = ["RemoteConfig"]
+
+# commands sent from several threads to one driver each need a connection
+DEFAULT_POOL_SIZE = 4
+# the timeout selenium itself uses for local chromium drivers
+DEFAULT_TIMEOUT = 120
+# ClientConfig and Remote(client_config=...) are only in newer selenium
+MIN_SELENIUM = (4, 26)
+
+
+@dataclass(frozen=True)
+class RemoteConfig:
+    """
+    Where and how to reach a remote end, e.g. a Selenium Grid hub.
+
+    Every driver keeps a pool of up to `pool_size` HTTP connections to `url`.
+    With `keep_alive` commands reuse those connections instead of opening a
+    new one per round-trip. With `pool_block` threads wait for a free
+    connection rather than opening (and discarding) extra ones.
+    """
+
+    url: str
+    keep_alive: bool = True
+    pool_size: int = DEFAULT_POOL_SIZE
+    pool_block: bool = False
+    timeout: int = DEFAULT_TIMEOUT
+    ignore_certificates: bool = False
+
+    def __post_init__(self) -> None:
+        if self.pool_size < 1:
+            msg = f"pool_size must be at least 1, got {self.pool_size}"
+            raise ValueError(msg)
+
+    def client_config(self) -> ClientConfig:
+        """Selenium's client configuration for this remote end"""
+        if tuple(int(p) for p in __version__.split(".")[:2]) < MIN_SELENIUM:
+            msg = (
+                f"remote drivers need selenium >= 4.26, but {__version__}"
+                " is installed"
+            )
+            raise RuntimeError(msg)
+        from selenium.webdriver.remote.client_config import (  # noqa: PLC0415
+            ClientConfig,
+        )
+
+        pool_args = {"maxsize": self.pool_size, "block": self.pool_block}
+        return ClientConfig(
+            remote_server_addr=self.url,
+            keep_alive=self.keep_alive,
+            timeout=self.timeout,
+            ignore_certificates=self.ignore_certificates,
+            # RemoteConnection reads the pool manager arguments from this
+            # nested key rather than from the mapping itself
+            init_args_for_pool_manager={"init_args_for_pool_manager": pool_args},
+        )
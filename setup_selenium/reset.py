@@ -0,0 +1,137 @@
+"""Bringing a driver back to a clean browser without restarting it"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from . import setup_selenium as _setup
+from .throttle import reset_throttling
+from .vitals import CHROMIUM_BROWSERS
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .setup_selenium import T_WebDriver
+
+__all__ = ["reset_session"]
+
+BLANK = "about:blank"
+
+# Clears what the open page can reach itself. Session storage belongs to the
+# tab rather than the browser, so this is the only way to clear it without
+# closing the tab; on firefox without system access it is also the fallback
+# for local storage, IndexedDB, the cache API and service workers.
+CLEAR_PAGE_SCRIPT = """
+const done = arguments[arguments.length - 1];
+if (!/^https?:$/.test(location.protocol)) return done(true);
+const attempt = async (step) => { try { await step(); } catch (e) {} };
+Promise.all([
+  attempt(() => sessionStorage.clear()),
+  attempt(() => localStorage.clear()),
+  attempt(async () => {
+    for (const db of await indexedDB.databases()) indexedDB.deleteDatabase(db.name);
+  }),
+  attempt(async () => {
+    for (const key of await caches.keys()) await caches.delete(key);
+  }),
+  attempt(async () => {
+    const workers = await navigator.serviceWorker.getRegistrations();
+    await Promise.all(workers.map((w) => w.unregister()));
+  }),
+]).then(() => done(true));
+"""
+
+# Runs in firefox's chrome context and clears every site at once
+FIREFOX_CLEAR_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const flags = Ci.nsIClearDataService;
+Services.clearData.deleteData(
+  flags.CLEAR_COOKIES | flags.CLEAR_DOM_STORAGES | flags.CLEAR_ALL_CACHES,
+  () => done(true),
+);
+"""
+
+
+def _origin(url: str) -> str | None:
+    """scheme://host[:port] of a web url, `None` for any other url"""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _history_origins(driver: T_WebDriver) -> set[str]:
+    """Origins of the pages in the history of the current window"""
+    history = driver.execute_cdp_cmd("Page.getNavigationHistory", {})  # type: ignore[union-attr]
+    origins = {_origin(entry["url"]) for entry in history.get("entries", [])}
+    origins.discard(None)
+    return origins  # type: ignore[return-value]
+
+
+def _clear_chromium(driver: T_WebDriver, origins: Iterable[str]) -> None:
+    cdp = driver.execute_cdp_cmd  # type: ignore[union-attr]
+    cdp("Network.clearBrowserCookies", {})
+    cdp("Network.clearBrowserCache", {})
+    for origin in sorted(origins):
+        # local storage, IndexedDB, the cache API, service workers and more
+        cdp("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+    reset_throttling(driver)  # type: ignore[arg-type]
+
+
+def _clear_firefox(driver: T_WebDriver) -> bool:
+    """Clear the data of every site through the chrome context, if allowed"""
+    try:
+        driver.execute("SET_CONTEXT", {"context": "chrome"})
+    except Exception:  # noqa: BLE001
+        _setup.logger.debug("no chrome context; clearing the open pages only")
+        return False
+    try:
+        driver.execute_async_script(FIREFOX_CLEAR_SCRIPT)
+    except Exception:  # noqa: BLE001
+        _setup.logger.debug("clearing site data failed; clearing the open pages only")
+        return False
+    finally:
+        driver.execute("SET_CONTEXT", {"context": "content"})
+    return True
+
+
+def reset_session(
+    driver: T_WebDriver, url: str = BLANK, origins: Iterable[str] = ()
+) -> None:
+    """
+    Bring `driver` back to a single window on `url` with no site data.
+
+    Extra windows are closed and cookies, local and session storage,
+    IndexedDB, the cache and service workers are cleared, which takes
+    milliseconds where a restart takes seconds. On chromium devtools clears
+    the cookies and cache of the whole browser and the storage of every origin
+    in the history of the open windows, plus `origins`, then removes any
+    throttling. On firefox the chrome context clears every site; firefox 138
+    and later only allow it with the `-remote-allow-system-access` argument,
+    and without it the open pages clear their own storage and cookies.
+    """
+    start = time.perf_counter()
+    browser = str(driver.capabilities.get("browserName", "")).lower()
+    chromium = browser in CHROMIUM_BROWSERS
+    wiped = chromium or _clear_firefox(driver)
+    seen = set(origins)
+
+    handles = driver.window_handles
+    # the first window is kept, so visit it last
+    for handle in reversed(handles):
+        driver.switch_to.window(handle)
+        if chromium:
+            seen.update(_history_origins(driver))
+        driver.execute_async_script(CLEAR_PAGE_SCRIPT)
+        if not wiped:
+            driver.delete_all_cookies()
+        if handle != handles[0]:
+            driver.close()
+    driver.get(url)
+    if chromium:
+        _clear_chromium(driver, seen)
+    _setup.logger.debug(
+        f"session reset in {(time.perf_counter() - start) * 1000:.1f}ms"
+    )
@@ -0,0 +1,258 @@
+"""Driver service processes shared between sessions"""
+
+from __future__ import annotations
+
+import atexit
+import collections
+import functools
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, TypeVar, cast
+
+from . import setup_selenium as _setup
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+    from selenium.webdriver.common.service import Service
+
+__all__ = ["ServiceRegistry", "SharedService", "shared_services"]
+
+S = TypeVar("S", bound="Service")
+
+
+@dataclass
+class _Process:
+    service: Service
+    refs: int = 0
+    timer: threading.Timer | None = field(default=None, repr=False)
+
+    def alive(self) -> bool:
+        process = getattr(self.service, "process", None)
+        return process is not None and process.poll() is None
+
+
+class ServiceRegistry:
+    """
+    Reference counted driver service processes.
+
+    Services are keyed by their class, driver path, arguments and log output,
+    so a different driver version always gets its own process. Sessions share
+    a process until it hosts `max_sessions` of them (unlimited for `None`).
+    A process is stopped once its last session quits, or `linger` seconds
+    later so sequential sessions can reuse it too.
+
+    Leases garbage collected without being stopped are only queued by their
+    finalizer, which may run at any point, even while this thread holds the
+    lock. The next `acquire` or `release` gives their sessions back.
+    """
+
+    def __init__(self, linger: float = 0.0) -> None:
+        self.linger = linger
+        self._lock = threading.Lock()
+        self._processes: dict[Hashable, list[_Process]] = {}
+        self._starting: dict[Hashable, threading.Lock] = {}
+        # appending to a deque takes no lock, so finalizers can always do it
+        self._orphans: collections.deque[tuple[Hashable, Service]] = collections.deque()
+
+    def orphan(self, key: Hashable, service: Service) -> None:
+        """Queue the release of a session whose lease was never stopped"""
+        self._orphans.append((key, service))
+
+    def _release_orphans(self) -> None:
+        while True:
+            try:
+                key, service = self._orphans.popleft()
+            except IndexError:
+                return
+            self.release(key, service)
+
+    def lease(
+        self,
+        service_class: type[S],
+        executable_path: str | None = None,
+        service_args: list[str] | None = None,
+        log_output: str | None = None,
+        max_sessions: int | None = None,
+    ) -> S:
+        """
+        A stand-in for `service_class` to hand to a single webdriver.
+
+        The webdriver starts and stops it like its own service; the process
+        behind it is shared.
+        """
+        factory = functools.partial(
+            service_class,
+            service_args=service_args,
+            log_output=log_output,  # type: ignore[arg-type]
+        )
+        key = (service_class, tuple(service_args or ()), log_output)
+        shared = SharedService(self, factory, key, executable_path, max_sessions)
+        return cast("S", shared)
+
+    @property
+    def processes(self) -> int:
+        """Number of service processes running"""
+        with self._lock:
+            return sum(len(procs) for procs in self._processes.values())
+
+    def acquire(
+        self,
+        key: Hashable,
+        factory: Callable[[], Service],
+        max_sessions: int | None = None,
+    ) -> Service:
+        """Add a session to a running service, starting one if needed"""
+        self._release_orphans()
+        with self._lock:
+            starting = self._starting.setdefault(key, threading.Lock())
+
+        # one start per key at a time so concurrent sessions share it
+        with starting:
+            with self._lock:
+                for proc in self._processes.get(key, []):
+                    if not proc.alive():
+                        continue
+                    if max_sessions is None or proc.refs < max_sessions:
+                        proc.refs += 1
+                        if proc.timer is not None:
+                            proc.timer.cancel()
+                            proc.timer = None
+                        return proc.service
+
+            service = factory()
+            service.start()
+            _setup.logger.debug(f"started shared driver service: {service.path}")
+            with self._lock:
+                procs = self._processes.setdefault(key, [])
+                # forget processes that died on their own
+                procs[:] = [p for p in procs if p.alive() or p.refs]
+                procs.append(_Process(service, refs=1))
+        return service
+
+    def release(self, key: Hashable, service: Service) -> None:
+        """Remove a session from `service`; stop it once it has none left"""
+        if self._orphans:
+            self._release_orphans()
+        with self._lock:
+            proc = next(
+                (p for p in self._processes.get(key, []) if p.service is service),
+                None,
+            )
+            if proc is None:
+                return
+            proc.refs -= 1
+            if proc.refs > 0:
+                return
+            if self.linger > 0 and proc.alive():
+                proc.timer = threading.Timer(
+                    self.linger, self._expire, args=(key, proc)
+                )
+                proc.timer.daemon = True
+                proc.timer.start()
+                return
+            self._processes[key].remove(proc)
+        self._stop(proc.service)
+
+    def _expire(self, key: Hashable, proc: _Process) -> None:
+        with self._lock:
+            if proc.refs > 0 or proc not in self._processes.get(key, []):
+                return
+            self._processes[key].remove(proc)
+        self._stop(proc.service)
+
+    @staticmethod
+    def _stop(service: Service) -> None:
+        try:
+            service.stop()
+        except Exception:  # noqa: BLE001
+            _setup.logger.warning("failed to stop shared driver service")
+
+    def stop_all(self) -> None:
+        """Stop every service, whether sessions still use it or not"""
+        self._orphans.clear()
+        with self._lock:
+            procs = [p for ps in self._processes.values() for p in ps]
+            self._processes.clear()
+        for proc in procs:
+            if proc.timer is not None:
+                proc.timer.cancel()
+            self._stop(proc.service)
+
+
+class SharedService:
+    """
+    Behaves like the service of a single webdriver, borrowing a shared process.
+
+    `start` joins a running process and `stop` leaves it again; anything else
+    is forwarded to the shared service.
+    """
+
+    def __init__(
+        self,
+        registry: ServiceRegistry,
+        factory: Callable[..., Service],
+        key: Hashable,
+        path: str | None = None,
+        max_sessions: int | None = None,
+    ) -> None:
+        self.registry = registry
+        self.path = path
+        self.max_sessions = max_sessions
+        self._factory = factory
+        self._key = key
+        self._service: Service | None = None
+        self._acquired: Hashable = None
+        self._finalizer: weakref.finalize | None = None
+
+    @property
+    def key(self) -> Hashable:
+        """Services with the same key may share a process"""
+        return (self._key, self.path)
+
+    def env_path(self) -> str | None:
+        """The shared service resolves its own environment override"""
+        return None
+
+    def start(self) -> None:
+        """Join a shared process, starting one if none can take the session"""
+        if self._service is not None:
+            return
+        factory = functools.partial(self._factory, executable_path=self.path)
+        self._acquired = self.key
+        self._service = self.registry.acquire(
+            self._acquired, factory, self.max_sessions
+        )
+        # a driver that was never quit still gives its session back
+        self._finalizer = weakref.finalize(
+            self, self.registry.orphan, self._acquired, self._service
+        )
+        self._finalizer.atexit = False
+
+    def stop(self) -> None:
+        """Leave the shared process"""
+        service, self._service = self._service, None
+        if self._finalizer is not None:
+            self._finalizer.detach()
+            self._finalizer = None
+        if service is not None:
+            self.registry.release(self._acquired, service)
+
+    @property
+    def service_url(self) -> str:
+        """Url of the shared process"""
+        if self._service is None:
+            msg = "shared service has not been started"
+            raise RuntimeError(msg)
+        return self._service.service_url
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        service = self.__dict__.get("_service")
+        if service is None:
+            raise AttributeError(name)
+        return getattr(service, name)
+
+
+shared_services = ServiceRegistry()
+atexit.register(shared_services.stop_all)
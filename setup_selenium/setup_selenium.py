@@ -2,38 +2,91 @@
 
 from __future__ import annotations
 
+import contextlib
+import functools
+import importlib
 import logging
 import os as os
+import shutil
 from enum import Enum
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Any, Callable, TypeVar, Union, cast
 
 from selenium import __version__
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
-from selenium.webdriver.common.selenium_manager import SeleniumManager
-from selenium.webdriver.edge.options import Options as EdgeOptions
-from selenium.webdriver.edge.service import Service as EdgeService
-from selenium.webdriver.edge.webdriver import WebDriver as Edge
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.firefox.webdriver import WebDriver as Firefox
-from semantic_version import Version  # type: ignore[import-untyped]
 from typing_extensions import TypeAlias
 
+from .cache import driver_cache, resolution_memo
+from .options import (
+    LowMemory,
+    OptionsTemplate,
+    fresh_options,
+    low_memory_template,
+    merge_feature_flags,
+    template_for,
+)
+from .teardown import DEFAULT_QUIT_TIMEOUT, shutdown, shutdown_all
+from .timing import StartupTimings, recorded, recording, timed
+
 if TYPE_CHECKING:
+    import asyncio
+    from collections.abc import Iterable, Iterator, Mapping
+    from types import TracebackType
 
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+    from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
     from selenium.webdriver.common.options import ArgOptions
-
-    T_WebDriver: TypeAlias = Union[Firefox, Chrome, Edge]
+    from selenium.webdriver.common.service import Service
+    from selenium.webdriver.edge.options import Options as EdgeOptions
+    from selenium.webdriver.edge.webdriver import WebDriver as Edge
+    from selenium.webdriver.firefox.options import Options as FirefoxOptions
+    from selenium.webdriver.firefox.webdriver import WebDriver as Firefox
+    from selenium.webdriver.remote.webdriver import WebDriver as Remote
+    from typing_extensions import Self
+
+    from .lean import LeanConfig
+    from .profiles import ProfileTemplate
+    from .remote import RemoteConfig
+    from .throttle import NetworkProfile
+
+    T_WebDriver: TypeAlias = Union[Firefox, Chrome, Edge, Remote]
     T_DrvOpts: TypeAlias = Union[FirefoxOptions, ChromeOptions, EdgeOptions]
 
+# The browser specific selenium modules (and semantic_version) are slow to
+# import, so they are only imported by the methods for that browser.
+# These names are still importable from this module for compatibility.
+LAZY_IMPORTS = {
+    "ChromeOptions": ("selenium.webdriver.chrome.options", "Options"),
+    "ChromeService": ("selenium.webdriver.chrome.service", "Service"),
+    "Chrome": ("selenium.webdriver.chrome.webdriver", "WebDriver"),
+    "EdgeOptions": ("selenium.webdriver.edge.options", "Options"),
+    "EdgeService": ("selenium.webdriver.edge.service", "Service"),
+    "Edge": ("selenium.webdriver.edge.webdriver", "WebDriver"),
+    "FirefoxOptions": ("selenium.webdriver.firefox.options", "Options"),
+    "FirefoxService": ("selenium.webdriver.firefox.service", "Service"),
+    "Firefox": ("selenium.webdriver.firefox.webdriver", "WebDriver"),
+    "SeleniumManager": (
+        "selenium.webdriver.common.selenium_manager",
+        "SeleniumManager",
+    ),
+    "Version": ("semantic_version", "Version"),
+}
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    if name not in LAZY_IMPORTS:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    module, attr = LAZY_IMPORTS[name]
+    value = getattr(importlib.import_module(module), attr)
+    globals()[name] = value
+    return value
+
+
 NEW_SELENIUM = False
-if Version(__version__) >= Version("4.20.0"):
+if tuple(int(p) for p in __version__.split(".")[:2]) >= (4, 20):
     NEW_SELENIUM = True
 
 
-__all__ = ["SetupSelenium"]
+__all__ = ["HEADLESS_SHELL", "SetupSelenium"]
 
 
 def create_logger(name: str) -> logging.Logger:
@@ -59,19 +112,107 @@ def set_logger(logr: logging.Logger) -> None:
     logger = logr
 
 
+T = TypeVar("T")
+
+
+async def run_blocking(
+    func: Callable[[], T],
+    timeout: float | None = None,
+    cleanup: Callable[[T], None] | None = None,
+) -> T:
+    """
+    Run a blocking call in the default executor.
+
+    The thread itself cannot be interrupted, so if the caller is cancelled or
+    times out the call keeps running and `cleanup` is applied to its result.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(None, func)
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    except (asyncio.CancelledError, asyncio.TimeoutError):
+        if cleanup is not None:
+
+            def _cleanup(fut: asyncio.Future[T]) -> None:
+                if fut.cancelled() or fut.exception() is not None:
+                    return
+                try:
+                    cleanup(fut.result())
+                except Exception:  # noqa: BLE001
+                    logger.warning("failed to clean up after cancelled call")
+
+            future.add_done_callback(_cleanup)
+        raise
+
+
+def time_service_start(service: Service) -> None:
+    """Record the driver service spawn as its own startup phase"""
+    start = service.start
+
+    def timed_start() -> None:
+        with timed("service"):
+            start()
+
+    service.start = timed_start  # type: ignore[method-assign]
+
+
+def attach_log_drainer(
+    driver: Chrome | Edge,
+    log_dir: str,
+    enable_log_performance: bool = False,
+    enable_log_console: bool = False,
+    interval: float | None = None,
+) -> None:
+    """Stream the enabled browser logs of `driver` into `log_dir`"""
+    log_types = [
+        log_type
+        for log_type, enabled in (
+            ("performance", enable_log_performance),
+            ("browser", enable_log_console),
+        )
+        if enabled
+    ]
+    if interval and log_types:
+        from .logs import LogDrainer
+
+        LogDrainer(driver, log_dir, log_types, interval=interval).attach()
+
+
+def quit_driver(driver: T_WebDriver) -> None:
+    """Quit a driver nobody is waiting for anymore"""
+    driver.quit()
+
+
+@contextlib.contextmanager
+def quit_on_error(driver: T_WebDriver) -> Iterator[None]:
+    """Shut `driver` down if setting it up any further fails"""
+    try:
+        yield
+    except BaseException:
+        shutdown(driver)
+        raise
+
+
 class Browser(str, Enum):
     EDGE = "edge"
     CHROME = "chrome"
     FIREFOX = "firefox"
 
 
+# `headless=HEADLESS_SHELL` runs chrome-headless-shell instead of full chrome
+HEADLESS_SHELL = "shell"
+HEADLESS_SHELL_BROWSER = "chrome-headless-shell"
+
+
 ################################################################################
 ################################################################################
 class SetupSelenium:
     def __init__(
         self,
         browser: Browser = Browser.CHROME,
-        headless: bool = False,
+        headless: bool | str = False,
         enable_log_performance: bool = False,
         enable_log_console: bool = False,
         enable_log_driver: bool = False,
@@ -80,7 +221,14 @@ class SetupSelenium:
         driver_version: str | None = None,
         browser_version: str | None = None,
         browser_path: str | None = None,
-        options: T_DrvOpts | None = None,
+        options: T_DrvOpts | OptionsTemplate | None = None,
+        shared_service: bool = False,
+        remote: str | RemoteConfig | None = None,
+        log_drain_interval: float | None = None,
+        collect_vitals: bool = False,
+        lean: LeanConfig | None = None,
+        monitor_interval: float | None = None,
+        profile_template: ProfileTemplate | None = None,
     ) -> None:
         log_path = os.path.abspath(os.path.expanduser(log_path))
 
@@ -90,26 +238,88 @@ class SetupSelenium:
         if browser_path:
             browser_path = os.path.abspath(os.path.expanduser(browser_path))
 
-        driverpath, binarypath = SetupSelenium.install_driver(
-            browser=browser,
-            driver_version=driver_version,
-            browser_version=browser_version,
-            browser_path=browser_path,
-        )
+        with recording(browser) as timings:
+            binarypath = None
+            # the remote end takes care of its own drivers and browsers
+            if remote is None:
+                from .versions import preflight
+
+                with timed("install"):
+                    driverpath, binarypath = SetupSelenium.install_driver(
+                        browser=browser,
+                        driver_version=driver_version,
+                        browser_version=browser_version,
+                        browser_path=browser_path,
+                        headless_shell=headless == HEADLESS_SHELL,
+                    )
+                if not driver_path:
+                    preflight(
+                        browser,
+                        (driverpath, binarypath),
+                        driver_version=driver_version,
+                        headless_shell=headless == HEADLESS_SHELL,
+                    )
+
+                driver_path = driver_path or driverpath
+
+            self.driver: T_WebDriver = self.create_driver(
+                browser=browser,
+                headless=headless,
+                enable_log_performance=enable_log_performance,
+                enable_log_console=enable_log_console,
+                enable_log_driver=enable_log_driver,
+                log_dir=log_path,
+                binary=binarypath,
+                driver_path=driver_path,
+                options=options,
+                shared_service=shared_service,
+                remote=remote,
+                log_drain_interval=log_drain_interval,
+                collect_vitals=collect_vitals,
+                lean=lean,
+                monitor_interval=monitor_interval,
+                profile_template=profile_template,
+            )
+        self.timings: StartupTimings = timings
+        self.closed = False
 
-        driver_path = driver_path or driverpath
+    def close(self, timeout: float = DEFAULT_QUIT_TIMEOUT) -> bool:
+        """
+        Quit the driver within `timeout` seconds, then kill what it left behind.
 
-        self.driver: T_WebDriver = self.create_driver(
-            browser=browser,
-            headless=headless,
-            enable_log_performance=enable_log_performance,
-            enable_log_console=enable_log_console,
-            enable_log_driver=enable_log_driver,
-            log_dir=log_path,
-            binary=binarypath,
-            driver_path=driver_path,
-            options=options,
-        )
+        Returns whether the driver quit cleanly; see `teardown.shutdown`.
+        """
+        if self.closed:
+            return True
+        self.closed = True
+        return shutdown(self.driver, timeout)
+
+    @staticmethod
+    def close_all(
+        items: Iterable[SetupSelenium | T_WebDriver | None],
+        timeout: float = DEFAULT_QUIT_TIMEOUT,
+        max_workers: int | None = None,
+    ) -> list[bool]:
+        """Close instances and quit drivers in parallel, each within `timeout`"""
+        drivers: list[T_WebDriver | None] = []
+        for item in items:
+            if isinstance(item, SetupSelenium):
+                drivers.append(None if item.closed else item.driver)
+                item.closed = True
+            else:
+                drivers.append(item)
+        return shutdown_all(drivers, timeout, max_workers)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
 
     ############################################################################
     @staticmethod
@@ -126,10 +336,127 @@ class SetupSelenium:
         browser_version: str | None = None,
         browser_path: str | None = None,
         install_browser: bool = False,
+        use_cache: bool = True,
+        headless_shell: bool = False,
     ) -> tuple[str, str]:
-        """Install the webdriver and browser if needed."""
-        browser = Browser[browser.upper()].lower()
+        """
+        Install the webdriver and browser if needed.
+
+        With `headless_shell` the browser is the chrome-headless-shell at
+        `browser_path`, which only exists for chrome. Selenium Manager cannot
+        install the shell, only resolve the chromedriver for its version.
+
+        A cached resolution whose browser or driver was replaced since (say by
+        a browser update) is resolved again when their versions no longer
+        match. Use `versions.preflight` to fail before launching a mismatch.
+        """
+        from .versions import compatible
+
+        browser = SetupSelenium._manager_browser(browser, headless_shell)
         driver_version = driver_version or None
+        if browser_path:
+            browser_path = os.path.abspath(os.path.expanduser(browser_path))
+        elif headless_shell:
+            msg = (
+                "the headless shell needs a browser_path:"
+                " selenium-manager cannot install chrome-headless-shell"
+            )
+            raise ValueError(msg)
+
+        def resolve() -> tuple[str, str]:
+            return SetupSelenium._run_selenium_manager(
+                browser=browser,
+                driver_version=driver_version,
+                browser_version=browser_version,
+                browser_path=browser_path,
+                install_browser=install_browser,
+            )
+
+        if not use_cache:
+            return resolve()
+
+        key = driver_cache.make_key(
+            browser=browser,
+            driver_version=driver_version,
+            browser_version=browser_version,
+            browser_path=browser_path,
+            install_browser=install_browser,
+        )
+
+        def outdated(paths: tuple[str, str]) -> bool:
+            # a pinned driver is the caller's choice; a pair as resolved is
+            # all Selenium Manager has to offer
+            if driver_version or not driver_cache.replaced(key):
+                return False
+            with timed("preflight"):
+                return compatible(browser, *paths) is False
+
+        def lookup() -> tuple[str, str]:
+            cached = driver_cache.get(key)
+            if cached is not None and outdated(cached):
+                logger.warning(
+                    f"cached driver {cached[0]} does not match {browser}"
+                    f" {cached[1]}, resolving again"
+                )
+                driver_cache.invalidate(key)
+                cached = None
+            if cached is None:
+                return driver_cache.get_or_resolve(key, resolve)
+
+            logger.debug(f"Driver path (cached): {cached[0]}")
+            logger.debug(f"Browser path (cached): {cached[1]}")
+            return cached
+
+        return resolution_memo.get_or_call(key, lookup)
+
+    @staticmethod
+    def invalidate_driver_cache(
+        browser: str | None = None,
+        driver_version: str | None = None,
+        browser_version: str | None = None,
+        browser_path: str | None = None,
+        install_browser: bool = False,
+        headless_shell: bool = False,
+    ) -> None:
+        """Drop cached `install_driver` results; all of them if no browser given"""
+        if browser is None:
+            resolution_memo.clear()
+            driver_cache.clear()
+            return
+
+        browser = SetupSelenium._manager_browser(browser, headless_shell)
+        if browser_path:
+            browser_path = os.path.abspath(os.path.expanduser(browser_path))
+        key = driver_cache.make_key(
+            browser=browser,
+            driver_version=driver_version or None,
+            browser_version=browser_version,
+            browser_path=browser_path,
+            install_browser=install_browser,
+        )
+        resolution_memo.invalidate(key)
+        driver_cache.invalidate(key)
+
+    @staticmethod
+    def _manager_browser(browser: str, headless_shell: bool = False) -> str:
+        """The name Selenium Manager knows `browser` by"""
+        browser = Browser[browser.upper()].lower()
+        if headless_shell and browser != Browser.CHROME:
+            msg = f"{browser} has no headless shell"
+            raise ValueError(msg)
+        # the shell runs chrome's driver, so selenium-manager knows it as chrome
+        return browser
+
+    @staticmethod
+    def _run_selenium_manager(
+        browser: str,
+        driver_version: str | None = None,
+        browser_version: str | None = None,
+        browser_path: str | None = None,
+        install_browser: bool = False,
+    ) -> tuple[str, str]:
+        """Run the Selenium Manager binary to resolve driver and browser paths"""
+        from selenium.webdriver.common.selenium_manager import SeleniumManager
 
         sm = SeleniumManager()
 
@@ -151,7 +478,6 @@ class SetupSelenium:
         if install_browser or browser_version:
             args.append("--force-browser-download")
         if browser_path:
-            browser_path = os.path.abspath(os.path.expanduser(browser_path))
             args.append("--browser-path")
             args.append(browser_path)
 
@@ -170,21 +496,105 @@ class SetupSelenium:
         return driver_path, browser_path
 
     @staticmethod
+    @recorded
     def create_driver(
         browser: Browser,
-        headless: bool = False,
+        headless: bool | str = False,
         enable_log_performance: bool = False,
         enable_log_console: bool = False,
         enable_log_driver: bool = False,
         log_dir: str = "./logs",
         binary: str | None = None,
         driver_path: str | None = None,
-        options: T_DrvOpts | None = None,
+        options: T_DrvOpts | OptionsTemplate | None = None,
+        shared_service: bool = False,
+        remote: str | RemoteConfig | None = None,
+        log_drain_interval: float | None = None,
+        collect_vitals: bool = False,
+        lean: LeanConfig | None = None,
+        monitor_interval: float | None = None,
+        profile_template: ProfileTemplate | None = None,
     ) -> T_WebDriver:
-        """Instantiates the browser driver"""
+        """
+        Instantiates the browser driver
+
+        With a `profile_template` the browser runs on a clone of it, which is
+        removed when the driver quits.
+        """
         browser = browser.lower()
+        if monitor_interval:
+            from .proc import require_proc
+
+            require_proc()
+        if isinstance(options, OptionsTemplate):
+            options = options.build()
         driver: T_WebDriver
-        if browser == Browser.FIREFOX:
+        if profile_template is not None:
+            if remote is not None:
+                msg = "profile templates need a local browser"
+                raise ValueError(msg)
+            from .profiles import attach_profile, use_profile
+
+            # the profile argument must not stick to options the caller reuses
+            options = fresh_options(options) or template_for(browser).build()
+            with timed("profile"):
+                profile_dir = profile_template.clone()
+            use_profile(browser, options, profile_dir)
+            try:
+                driver = SetupSelenium.create_driver(
+                    browser=Browser(browser),
+                    headless=headless,
+                    enable_log_performance=enable_log_performance,
+                    enable_log_console=enable_log_console,
+                    enable_log_driver=enable_log_driver,
+                    log_dir=log_dir,
+                    binary=binary,
+                    driver_path=driver_path,
+                    options=options,
+                    shared_service=shared_service,
+                    log_drain_interval=log_drain_interval,
+                    collect_vitals=collect_vitals,
+                    lean=lean,
+                    monitor_interval=monitor_interval,
+                )
+            except BaseException:
+                shutil.rmtree(profile_dir, ignore_errors=True)
+                raise
+            attach_profile(driver, profile_dir)
+            return driver
+
+        if remote is not None:
+            if lean is not None and browser == Browser.FIREFOX:
+                msg = "lean mode needs a local firefox"
+                raise ValueError(msg)
+            if headless == HEADLESS_SHELL:
+                msg = "the headless shell needs a local chrome"
+                raise ValueError(msg)
+            if monitor_interval:
+                msg = "resource monitoring needs a local driver"
+                raise ValueError(msg)
+            if lean is not None and lean.count:
+                msg = "counting blocked requests needs a local driver"
+                raise ValueError(msg)
+            driver = SetupSelenium.remote(
+                browser=browser,
+                remote=remote,
+                headless=headless,
+                enable_log_performance=enable_log_performance,
+                enable_log_console=enable_log_console,
+                enable_log_driver=enable_log_driver,
+                binary=binary,
+                options=options,
+            )
+            if lean is not None:
+                from .lean import LeanMode
+
+                with quit_on_error(driver):
+                    LeanMode(lean, browser).attach(driver)
+
+        elif browser == Browser.FIREFOX:
+            from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
             assert options is None or isinstance(options, FirefoxOptions)
             driver = SetupSelenium.firefox(
                 headless=headless,
@@ -193,9 +603,13 @@ class SetupSelenium:
                 binary=binary,
                 driver_path=driver_path,
                 options=options,
+                shared_service=shared_service,
+                lean=lean,
             )
 
         elif browser == Browser.CHROME:
+            from selenium.webdriver.chrome.options import Options as ChromeOptions
+
             assert options is None or isinstance(options, ChromeOptions)
             driver = SetupSelenium.chrome(
                 headless=headless,
@@ -206,9 +620,14 @@ class SetupSelenium:
                 binary=binary,
                 driver_path=driver_path,
                 options=options,
+                shared_service=shared_service,
+                log_drain_interval=log_drain_interval,
+                lean=lean,
             )
 
         elif browser == Browser.EDGE:
+            from selenium.webdriver.edge.options import Options as EdgeOptions
+
             assert options is None or isinstance(options, EdgeOptions)
             driver = SetupSelenium.edge(
                 headless=headless,
@@ -219,64 +638,322 @@ class SetupSelenium:
                 binary=binary,
                 driver_path=driver_path,
                 options=options,
+                shared_service=shared_service,
+                log_drain_interval=log_drain_interval,
+                lean=lean,
             )
 
         else:
             msg = f"Unknown browser: {browser}"
             raise ValueError(msg)
 
+        with quit_on_error(driver):
+            if collect_vitals:
+                from .vitals import VitalsCollector
+
+                VitalsCollector(driver).attach()
+            if monitor_interval:
+                from .monitor import ResourceMonitor
+
+                ResourceMonitor(driver, interval=monitor_interval).attach()
         return driver
 
+    ############################################################################
+    @staticmethod
+    async def ainstall_driver(
+        browser: str,
+        driver_version: str | None = None,
+        browser_version: str | None = None,
+        browser_path: str | None = None,
+        install_browser: bool = False,
+        use_cache: bool = True,
+        headless_shell: bool = False,
+        timeout: float | None = None,
+    ) -> tuple[str, str]:
+        """Async version of `install_driver`"""
+        func = functools.partial(
+            SetupSelenium.install_driver,
+            browser=browser,
+            driver_version=driver_version,
+            browser_version=browser_version,
+            browser_path=browser_path,
+            install_browser=install_browser,
+            use_cache=use_cache,
+            headless_shell=headless_shell,
+        )
+        return await run_blocking(func, timeout)
+
+    @staticmethod
+    async def acreate_driver(
+        browser: Browser,
+        headless: bool | str = False,
+        enable_log_performance: bool = False,
+        enable_log_console: bool = False,
+        enable_log_driver: bool = False,
+        log_dir: str = "./logs",
+        binary: str | None = None,
+        driver_path: str | None = None,
+        options: T_DrvOpts | OptionsTemplate | None = None,
+        shared_service: bool = False,
+        remote: str | RemoteConfig | None = None,
+        log_drain_interval: float | None = None,
+        collect_vitals: bool = False,
+        lean: LeanConfig | None = None,
+        monitor_interval: float | None = None,
+        profile_template: ProfileTemplate | None = None,
+        timeout: float | None = None,
+    ) -> T_WebDriver:
+        """
+        Async version of `create_driver`.
+
+        A driver which finishes starting after the caller was cancelled or timed
+        out is quit.
+        """
+        func = functools.partial(
+            SetupSelenium.create_driver,
+            browser=browser,
+            headless=headless,
+            enable_log_performance=enable_log_performance,
+            enable_log_console=enable_log_console,
+            enable_log_driver=enable_log_driver,
+            log_dir=log_dir,
+            binary=binary,
+            driver_path=driver_path,
+            options=options,
+            shared_service=shared_service,
+            remote=remote,
+            log_drain_interval=log_drain_interval,
+            collect_vitals=collect_vitals,
+            lean=lean,
+            monitor_interval=monitor_interval,
+            profile_template=profile_template,
+        )
+        return await run_blocking(func, timeout, cleanup=quit_driver)
+
+    @classmethod
+    async def acreate(
+        cls,
+        browser: Browser = Browser.CHROME,
+        headless: bool | str = False,
+        enable_log_performance: bool = False,
+        enable_log_console: bool = False,
+        enable_log_driver: bool = False,
+        log_path: str = "./logs",
+        driver_path: str | None = None,
+        driver_version: str | None = None,
+        browser_version: str | None = None,
+        browser_path: str | None = None,
+        options: T_DrvOpts | OptionsTemplate | None = None,
+        shared_service: bool = False,
+        remote: str | RemoteConfig | None = None,
+        log_drain_interval: float | None = None,
+        collect_vitals: bool = False,
+        lean: LeanConfig | None = None,
+        monitor_interval: float | None = None,
+        profile_template: ProfileTemplate | None = None,
+        timeout: float | None = None,
+    ) -> SetupSelenium:
+        """
+        Async version of `SetupSelenium()`.
+
+        An instance which finishes starting after the caller was cancelled or
+        timed out has its driver quit.
+        """
+        func = functools.partial(
+            cls,
+            browser=browser,
+            headless=headless,
+            enable_log_performance=enable_log_performance,
+            enable_log_console=enable_log_console,
+            enable_log_driver=enable_log_driver,
+            log_path=log_path,
+            driver_path=driver_path,
+            driver_version=driver_version,
+            browser_version=browser_version,
+            browser_path=browser_path,
+            options=options,
+            shared_service=shared_service,
+            remote=remote,
+            log_drain_interval=log_drain_interval,
+            collect_vitals=collect_vitals,
+            lean=lean,
+            monitor_interval=monitor_interval,
+            profile_template=profile_template,
+        )
+        return await run_blocking(
+            func, timeout, cleanup=lambda sel: quit_driver(sel.driver)
+        )
+
+    @classmethod
+    async def acreate_many(
+        cls,
+        configs: Iterable[Mapping[str, Any]],
+        timeout: float | None = None,
+        return_exceptions: bool = False,
+    ) -> list[SetupSelenium | BaseException]:
+        """
+        Start several instances concurrently; each config holds `acreate` kwargs.
+
+        With `return_exceptions` failures are returned in place of the instance.
+        Otherwise the instances that did start are quit and the first failure is
+        raised.
+        """
+        import asyncio
+
+        tasks = [
+            asyncio.ensure_future(cls.acreate(**{"timeout": timeout, **config}))
+            for config in configs
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        if not return_exceptions:
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                await asyncio.gather(
+                    *(
+                        run_blocking(functools.partial(quit_driver, r.driver))
+                        for r in results
+                        if isinstance(r, SetupSelenium)
+                    ),
+                    return_exceptions=True,
+                )
+                raise errors[0]
+        return results
+
+    @staticmethod
+    def options_template(
+        browser: str, low_memory: bool | LowMemory = False
+    ) -> OptionsTemplate:
+        """
+        Frozen default options of `browser`.
+
+        Use `derive` on the result for a customized variant; templates can be
+        passed as `options` anywhere options are accepted. `low_memory` adds
+        the default or the given `LowMemory` preset (chrome and edge only).
+        """
+        if isinstance(low_memory, LowMemory):
+            return low_memory_template(browser, low_memory)
+        if low_memory:
+            return low_memory_template(browser)
+        return template_for(browser)
+
+    @staticmethod
+    def apply_presets(
+        browser: str,
+        options: T_DrvOpts,
+        headless: bool | str = False,
+        enable_log_performance: bool = False,
+        enable_log_console: bool = False,
+        enable_log_driver: bool = False,
+    ) -> None:
+        """
+        Apply headless mode and logging preferences to `options`
+
+        `headless` is a bool, or `HEADLESS_SHELL` for chrome-headless-shell.
+        """
+        browser = browser.lower()
+        if headless not in (True, False, HEADLESS_SHELL):
+            msg = f"Unknown headless mode: {headless}"
+            raise ValueError(msg)
+        if headless == HEADLESS_SHELL and browser != Browser.CHROME:
+            msg = f"{browser} has no headless shell"
+            raise ValueError(msg)
+        if browser == Browser.FIREFOX:
+            from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
+            assert isinstance(options, FirefoxOptions)
+            if options.profile is not None:
+                from .firefox import cached_profile
+
+                # selenium zips the profile again for every session otherwise
+                options.profile = cached_profile(options.profile)
+            if headless:
+                options.add_argument("--headless")
+            if enable_log_driver and not options.log.level:
+                options.log.level = "trace"  # type: ignore[assignment]
+            if not options.log.level:
+                options.log.level = "fatal"  # type: ignore[assignment]
+            return
+
+        if browser == Browser.CHROME:
+            headless_arg, prefs_capability = "--headless=new", "goog:loggingPrefs"
+            if headless == HEADLESS_SHELL:
+                # the shell is the old headless mode, split off of chrome
+                headless_arg = "--headless"
+        elif browser == Browser.EDGE:
+            headless_arg, prefs_capability = "--headless", "ms:loggingPrefs"
+        else:
+            msg = f"Unknown browser: {browser}"
+            raise ValueError(msg)
+
+        if headless:
+            options.add_argument(headless_arg)
+        # a second --disable-features would silently replace the first
+        options.arguments[:] = merge_feature_flags(options.arguments)
+
+        logging_prefs = {"browser": "OFF", "performance": "OFF", "driver": "OFF"}
+
+        if enable_log_console:
+            logging_prefs["browser"] = "ALL"
+
+        # by default performance is disabled.
+        if enable_log_performance:
+            logging_prefs["performance"] = "ALL"
+            options.add_experimental_option(  # type: ignore[union-attr]
+                "perfLoggingPrefs",
+                {
+                    "enableNetwork": True,
+                    "enablePage": False,
+                },
+            )
+
+        if enable_log_driver:
+            logging_prefs["driver"] = "ALL"
+
+        options.set_capability(prefs_capability, logging_prefs)
+
     @staticmethod
     def firefox_options() -> FirefoxOptions:
         """Default options for firefox"""
-        options = FirefoxOptions()
-        options.set_capability("unhandledPromptBehavior", "ignore")
-
-        # profile settings
-        options.set_preference("app.update.auto", False)
-        options.set_preference("app.update.enabled", False)
-        options.set_preference("network.prefetch-next", False)
-        options.set_preference("network.dns.disablePrefetch", True)
-        options.set_preference(
-            "extensions.formautofill.addresses.capture.enabled", False
+        return cast(
+            "FirefoxOptions", SetupSelenium.options_template(Browser.FIREFOX).build()
         )
-        # By default, headless Firefox runs as though no pointers capabilities
-        # are available.
-        # https://github.com/microsoft/playwright/issues/7769#issuecomment-966098074
-        #
-        # This impacts React Spectrum which uses an '(any-pointer: fine)'
-        # media query to determine font size. It also causes certain chart
-        # elements to always be visible that should only be visible on
-        # hover.
-        #
-        # Available values for pointer capabilities:
-        # NO_POINTER             0x00
-        # COARSE_POINTER         0x01
-        # FINE_POINTER           0x02
-        # HOVER_CAPABLE_POINTER  0x04
-        #
-        # Setting to 0x02 | 0x04 says the system supports a mouse
-        options.set_preference("ui.primaryPointerCapabilities", 0x02 | 0x04)
-        options.set_preference("ui.allPointerCapabilities", 0x02 | 0x04)
-        return options
 
     @staticmethod
     def firefox(
-        headless: bool = False,
+        headless: bool | str = False,
         enable_log_driver: bool = False,
         log_dir: str = "./logs",
         driver_path: str | None = None,
         binary: str | None = None,
         options: FirefoxOptions | None = None,
+        shared_service: bool = False,
+        lean: LeanConfig | None = None,
     ) -> Firefox:
         """Instantiates firefox geockodriver"""
-        options = options or SetupSelenium.firefox_options()
+        from selenium.webdriver.firefox.service import Service as FirefoxService
+        from selenium.webdriver.firefox.webdriver import WebDriver as Firefox
+
+        with timed("options"):
+            options = options or SetupSelenium.firefox_options()
         if binary:
             options.binary_location = binary
 
-        if headless:
-            options.add_argument("--headless")
+        SetupSelenium.apply_presets(
+            Browser.FIREFOX,
+            options,
+            headless=headless,
+            enable_log_driver=enable_log_driver,
+        )
+
+        lean_mode = None
+        if lean is not None:
+            from .lean import LeanMode
+
+            LeanMode.check_proxy(options)
+            lean_mode = LeanMode(lean, Browser.FIREFOX)
+            for name, value in lean_mode.firefox_preferences().items():
+                options.set_preference(name, value)
 
         # setting logpath to /dev/null will prevent geckodriver from creating it's own
         # log file. if we enable root logging, we can capture the logging from
@@ -285,13 +962,18 @@ class SetupSelenium:
         if enable_log_driver:
             lp = os.path.abspath(os.path.expanduser(log_dir))
             logpath = os.path.join(lp, "geckodriver.log")
-            if not options.log.level:
-                options.log.level = "trace"  # type: ignore[assignment]
 
-        if not options.log.level:
-            options.log.level = "fatal"  # type: ignore[assignment]
+        if shared_service:
+            from .service import shared_services
 
-        if driver_path:
+            # geckodriver only supports a single session at a time
+            service = shared_services.lease(
+                FirefoxService,
+                executable_path=driver_path,
+                log_output=logpath,
+                max_sessions=1,
+            )
+        elif driver_path:
             service = FirefoxService(
                 executable_path=driver_path,
                 log_output=logpath,
@@ -301,68 +983,38 @@ class SetupSelenium:
                 log_output=logpath,
             )
 
-        driver = Firefox(service=service, options=options)
-
-        driverversion = driver.capabilities["moz:geckodriverVersion"]
-        browserversion = driver.capabilities["browserVersion"]
-
-        logger.info(f"Driver info: geckodriver={driverversion}")
-        logger.info(f"Browser info:    firefox={browserversion}")
-        SetupSelenium.log_options(options)
+        time_service_start(service)
+        with timed("session"):
+            try:
+                driver = Firefox(service=service, options=options)
+            except Exception:
+                if lean_mode is not None:
+                    lean_mode.stop()
+                raise
+        with quit_on_error(driver):
+            if lean_mode is not None:
+                lean_mode.attach(driver)
+
+            with timed("version_check"):
+                driverversion = driver.capabilities["moz:geckodriverVersion"]
+                browserversion = driver.capabilities["browserVersion"]
+
+                logger.info(f"Driver info: geckodriver={driverversion}")
+                logger.info(f"Browser info:    firefox={browserversion}")
+            SetupSelenium.log_options(options)
         return driver
 
     @staticmethod
     def chrome_options() -> ChromeOptions:
         """Default options for chrome"""
         logger.debug("Setting up chrome options")
-        # the ultimate list of flags (created by the chromium dev group)
-        # https://peter.sh/experiments/chromium-command-line-switches/
-
-        # The list of options set below mostly came from this StackOverflow post
-        # https://stackoverflow.com/q/48450594/2532408
-        opts = (
-            # "--disable-features=ImprovedCookieControls,LazyFrameLoading,GlobalMediaControls,DestroyProfileOnBrowserClose,MediaRouter,DialMediaRouteProvider,AcceptCHFrame,AutoExpandDetailsElement,CertificateTransparencyComponentUpdater,AvoidUnnecessaryBeforeUnloadCheckSync",  # noqa: ERA001
-            "--disable-back-forward-cache",
-            "--disable-background-timer-throttling",
-            "--disable-breakpad",
-            "--disable-component-extensions-with-background-pages",
-            "--disable-ipc-flooding-protection",
-            "--enable-features=NetworkService,NetworkServiceInProcess",
-            "--enable-logging",
-            "--export-tagged-pdf",
-            "--force-color-profile=srgb",
-            "--metrics-recording-only",
-            "--mute-audio",
-            # "--remote-debugging-pipe",  # noqa: ERA001
-            # fixes MUI fade issue
-            "--disable-renderer-backgrounding",
-            # fixes actionchains in headless
-            "--disable-backgrounding-occluded-windows",
-            "--disable-extensions",
-            "--allow-running-insecure-content",
-            "--ignore-certificate-errors",
-            "--disable-single-click-autofill",
-            "--disable-autofill-keyboard-accessory-view[8]",
-            "--disable-full-form-autofill-ios",
-            "--disable-infobars",
-            # chromedriver crashes without these two in linux
-            "--no-sandbox",
-            "--disable-dev-shm-usage",
-            # it's possible we no longer need to do these
-            "--disable-gpu",  # https://stackoverflow.com/q/51959986/2532408
-            # do not prompt about HTTP connections being insecure
-            "--disable-features=HttpsFirstBalancedModeAutoEnable",
+        return cast(
+            "ChromeOptions", SetupSelenium.options_template(Browser.CHROME).build()
         )
-        exp_prefs = {"autofill.profile_enabled": False}
-        options = ChromeOptions()
-        for opt in opts:
-            options.add_argument(opt)
-        options.add_experimental_option("prefs", exp_prefs)
-        return options
 
     @staticmethod
     def chrome(
-        headless: bool = False,
+        headless: bool | str = False,
         enable_log_performance: bool = False,
         enable_log_console: bool = False,
         enable_log_driver: bool = False,
@@ -370,30 +1022,55 @@ class SetupSelenium:
         driver_path: str | None = None,
         binary: str | None = None,
         options: ChromeOptions | None = None,
+        shared_service: bool = False,
+        log_drain_interval: float | None = None,
+        lean: LeanConfig | None = None,
     ) -> Chrome:
-        """Instantiates chromedriver"""
-        options = options or SetupSelenium.chrome_options()
+        """
+        Instantiates chromedriver
+
+        With `headless=HEADLESS_SHELL`, `binary` is the chrome-headless-shell
+        to run; without a `driver_path` its chromedriver is resolved through
+        Selenium Manager.
+        """
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
+        from semantic_version import Version  # type: ignore[import-untyped]
+
+        with timed("options"):
+            options = options or SetupSelenium.chrome_options()
+        if headless == HEADLESS_SHELL and not binary:
+            msg = (
+                "the headless shell needs a binary:"
+                " selenium-manager cannot install chrome-headless-shell"
+            )
+            raise ValueError(msg)
+        if headless == HEADLESS_SHELL and not driver_path:
+            from .versions import preflight
+
+            with timed("install"):
+                paths = SetupSelenium.install_driver(
+                    Browser.CHROME, browser_path=binary, headless_shell=True
+                )
+            preflight(Browser.CHROME, paths, headless_shell=True)
+            driver_path = paths[0]
         if binary:
             options.binary_location = binary
-
-        if headless:
-            options.add_argument("--headless=new")
-
-        logging_prefs = {"browser": "OFF", "performance": "OFF", "driver": "OFF"}
-
-        if enable_log_console:
-            logging_prefs["browser"] = "ALL"
-
-        # by default performance is disabled.
-        if enable_log_performance:
-            logging_prefs["performance"] = "ALL"
-            options.add_experimental_option(
-                "perfLoggingPrefs",
-                {
-                    "enableNetwork": True,
-                    "enablePage": False,
-                },
-            )
+        if lean is not None and lean.count:
+            if not log_drain_interval:
+                msg = "counting blocked requests needs a log_drain_interval"
+                raise ValueError(msg)
+            # lean mode counts the blocked requests in the drained performance log
+            enable_log_performance = True
+
+        SetupSelenium.apply_presets(
+            Browser.CHROME,
+            options,
+            headless=headless,
+            enable_log_performance=enable_log_performance,
+            enable_log_console=enable_log_console,
+            enable_log_driver=enable_log_driver,
+        )
 
         args: list | None = None
         logpath = None
@@ -403,12 +1080,18 @@ class SetupSelenium:
             args = [
                 # "--verbose"
             ]
-            logging_prefs["driver"] = "ALL"
-
-        options.set_capability("goog:loggingPrefs", logging_prefs)
 
         logger.debug("initializing chromedriver")
-        if driver_path:
+        if shared_service:
+            from .service import shared_services
+
+            service = shared_services.lease(
+                ChromeService,
+                executable_path=driver_path,
+                service_args=args,
+                log_output=logpath,
+            )
+        elif driver_path:
             service = ChromeService(
                 executable_path=driver_path,
                 service_args=args,
@@ -420,111 +1103,141 @@ class SetupSelenium:
                 log_output=logpath,  # type: ignore[arg-type]
             )
 
-        driver = Chrome(service=service, options=options)
+        time_service_start(service)
+        with timed("session"):
+            driver = Chrome(service=service, options=options)
+
+        with quit_on_error(driver):
+            with timed("version_check"):
+                capabilities = driver.capabilities
+                driver_vers = capabilities["chrome"]["chromedriverVersion"].split(" ")[
+                    0
+                ]
+                browser_vers = capabilities["browserVersion"]
+
+                drvmsg = f"Driver info: chromedriver={driver_vers}"
+                bsrmsg = f"Browser info:      chrome={browser_vers}"
+
+                dver = Version.coerce(driver_vers)
+                bver = Version.coerce(browser_vers)
+                if dver.major != bver.major:
+                    logger.critical(drvmsg)
+                    logger.critical(bsrmsg)
+                    logger.critical("chromedriver and browser versions not in sync!!")
+                else:
+                    logger.info(drvmsg)
+                    logger.info(bsrmsg)
+            SetupSelenium.log_options(options)
+            attach_log_drainer(
+                driver,
+                log_dir,
+                enable_log_performance=enable_log_performance,
+                enable_log_console=enable_log_console,
+                interval=log_drain_interval,
+            )
+            if lean is not None:
+                from .lean import LeanMode
 
-        driver_vers = driver.capabilities["chrome"]["chromedriverVersion"].split(" ")[0]
-        browser_vers = driver.capabilities["browserVersion"]
+                LeanMode(lean, Browser.CHROME).attach(driver)
 
-        drvmsg = f"Driver info: chromedriver={driver_vers}"
-        bsrmsg = f"Browser info:      chrome={browser_vers}"
+        return driver
 
-        dver = Version.coerce(driver_vers)
-        bver = Version.coerce(browser_vers)
-        if dver.major != bver.major:
-            logger.critical(drvmsg)
-            logger.critical(bsrmsg)
-            logger.critical("chromedriver and browser versions not in sync!!")
-        else:
-            logger.info(drvmsg)
-            logger.info(bsrmsg)
-        SetupSelenium.log_options(options)
+    @staticmethod
+    def remote(
+        browser: str,
+        remote: str | RemoteConfig,
+        headless: bool | str = False,
+        enable_log_performance: bool = False,
+        enable_log_console: bool = False,
+        enable_log_driver: bool = False,
+        binary: str | None = None,
+        options: T_DrvOpts | None = None,
+    ) -> Remote:
+        """Instantiates a remote webdriver, e.g. on a Selenium Grid"""
+        from selenium.webdriver.remote.webdriver import WebDriver as Remote
+
+        from .remote import RemoteConfig
+
+        config = remote if isinstance(remote, RemoteConfig) else RemoteConfig(remote)
+        client_config = config.client_config()
+        with timed("options"):
+            default = SetupSelenium.options_template(browser).build()
+            options = options or default
+        assert isinstance(options, type(default))
+        if binary:
+            options.binary_location = binary
 
+        SetupSelenium.apply_presets(
+            browser,
+            options,
+            headless=headless,
+            enable_log_performance=enable_log_performance,
+            enable_log_console=enable_log_console,
+            enable_log_driver=enable_log_driver,
+        )
+
+        logger.debug(f"initializing remote {browser} at {config.url}")
+        with timed("session"):
+            driver = Remote(
+                command_executor=config.url,
+                options=options,
+                client_config=client_config,
+            )
+
+        with timed("version_check"):
+            browser_vers = driver.capabilities.get("browserVersion")
+            logger.info(f"Browser info: {browser}={browser_vers} (remote)")
+        SetupSelenium.log_options(options)
         return driver
 
     @staticmethod
-    def set_network_throttle(driver: Chrome, network_type: str = "3G"):
-        """Experimental settings to slow down browser"""
-        # experimental settings to slow down browser
-        # @formatter:off
-        # fmt: off
-        network_conditions = {
-            #           latency, down, up
-            "GPRS"     : (500, 50,    20),
-            "2G"       : (300, 250,   50),
-            "SLOW3G"   : (100, 250,   100),
-            "3G"       : (100, 750,   250),
-            "FAST3G"   : (40,  1500,  750),
-            "LTE"      : (20,  4000,  3000),
-            "DSL"      : (5,   2000,  1000),
-            "WIFI"     : (2,   30000, 15000),
-        }
-        # fmt: on
-        # @formatter:on
-        net_lat, net_down, net_up = network_conditions[network_type]
-        net_down = net_down / 8 * 1024
-        net_up = net_up / 8 * 1024
-        driver.set_network_conditions(
-            offline=False,
-            latency=net_lat,
-            download_throughput=net_down,
-            upload_throughput=net_up,
-        )
+    def set_network_throttle(
+        driver: Chrome, network_type: str | NetworkProfile = "3G"
+    ) -> None:
+        """
+        Experimental settings to slow down browser
+
+        `network_type` is the name of one of the `NETWORK_PROFILES` or a
+        `NetworkProfile` with latency, throughput and packet loss of its own.
+        """
+        from .throttle import apply_network_profile
+
+        apply_network_profile(driver, network_type)
 
     @staticmethod
     def set_cpu_throttle(driver: Chrome, rate: int = 10):
         """Experimental settings to slow down browser"""
         driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": rate})
 
+    @staticmethod
+    def reset_throttle(driver: Chrome) -> None:
+        """Remove network and cpu throttling"""
+        from .throttle import reset_throttling
+
+        reset_throttling(driver)
+
+    @staticmethod
+    def reset_session(
+        driver: T_WebDriver, url: str = "about:blank", origins: Iterable[str] = ()
+    ) -> None:
+        """
+        Clear windows, cookies, storage, cache and throttling without a restart
+
+        See `reset.reset_session`.
+        """
+        from .reset import reset_session
+
+        reset_session(driver, url, origins)
+
     @staticmethod
     def edge_options() -> EdgeOptions:
         """Default options for edgedriver"""
         logger.debug("Setting up edge options")
-        # the ultimate list of flags (created by the chromium dev group)
-        # https://peter.sh/experiments/chromium-command-line-switches/
-
-        # The list of options set below mostly came from this StackOverflow post
-        # https://stackoverflow.com/q/48450594/2532408
-        opts = (
-            # "--disable-features=ImprovedCookieControls,LazyFrameLoading,GlobalMediaControls,DestroyProfileOnBrowserClose,MediaRouter,DialMediaRouteProvider,AcceptCHFrame,AutoExpandDetailsElement,CertificateTransparencyComponentUpdater,AvoidUnnecessaryBeforeUnloadCheckSync",  # noqa: ERA001
-            "--disable-back-forward-cache",
-            "--disable-background-timer-throttling",
-            "--disable-breakpad",
-            "--disable-component-extensions-with-background-pages",
-            "--disable-ipc-flooding-protection",
-            "--enable-features=NetworkService,NetworkServiceInProcess",
-            "--enable-logging",
-            "--export-tagged-pdf",
-            "--force-color-profile=srgb",
-            "--metrics-recording-only",
-            "--mute-audio",
-            # "--remote-debugging-pipe",  # noqa: ERA001
-            # fixes MUI fade issue
-            "--disable-renderer-backgrounding",
-            # fixes actionchains in headless
-            "--disable-backgrounding-occluded-windows",
-            "--disable-extensions",
-            "--allow-running-insecure-content",
-            "--ignore-certificate-errors",
-            "--disable-single-click-autofill",
-            "--disable-autofill-keyboard-accessory-view[8]",
-            "--disable-full-form-autofill-ios",
-            "--disable-infobars",
-            # edgedriver crashes without these two in linux
-            "--no-sandbox",
-            "--disable-dev-shm-usage",
-            # do not prompt about HTTP connections being insecure
-            "--disable-features=HttpsFirstBalancedModeAutoEnable",
-        )
-        exp_prefs = {"autofill.profile_enabled": False}
-        options = EdgeOptions()
-        for opt in opts:
-            options.add_argument(opt)
-        options.add_experimental_option("prefs", exp_prefs)
-        return options
+        return cast("EdgeOptions", SetupSelenium.options_template(Browser.EDGE).build())
 
     @staticmethod
     def edge(
-        headless: bool = False,
+        headless: bool | str = False,
         enable_log_performance: bool = False,
         enable_log_console: bool = False,
         enable_log_driver: bool = False,
@@ -532,30 +1245,34 @@ class SetupSelenium:
         driver_path: str | None = None,
         binary: str | None = None,
         options: EdgeOptions | None = None,
+        shared_service: bool = False,
+        log_drain_interval: float | None = None,
+        lean: LeanConfig | None = None,
     ) -> Edge:
         """Instantiates edgedriver"""
-        options = options or SetupSelenium.edge_options()
+        from selenium.webdriver.edge.service import Service as EdgeService
+        from selenium.webdriver.edge.webdriver import WebDriver as Edge
+        from semantic_version import Version  # type: ignore[import-untyped]
+
+        with timed("options"):
+            options = options or SetupSelenium.edge_options()
         if binary:
             options.binary_location = binary
-
-        if headless:
-            options.add_argument("--headless")
-
-        logging_prefs = {"browser": "OFF", "performance": "OFF", "driver": "OFF"}
-
-        if enable_log_console:
-            logging_prefs["browser"] = "ALL"
-
-        # by default performance is disabled.
-        if enable_log_performance:
-            logging_prefs["performance"] = "ALL"
-            options.add_experimental_option(
-                "perfLoggingPrefs",
-                {
-                    "enableNetwork": True,
-                    "enablePage": False,
-                },
-            )
+        if lean is not None and lean.count:
+            if not log_drain_interval:
+                msg = "counting blocked requests needs a log_drain_interval"
+                raise ValueError(msg)
+            # lean mode counts the blocked requests in the drained performance log
+            enable_log_performance = True
+
+        SetupSelenium.apply_presets(
+            Browser.EDGE,
+            options,
+            headless=headless,
+            enable_log_performance=enable_log_performance,
+            enable_log_console=enable_log_console,
+            enable_log_driver=enable_log_driver,
+        )
 
         args: list | None = None
         logpath = None
@@ -565,12 +1282,18 @@ class SetupSelenium:
             args = [
                 # "--verbose"
             ]
-            logging_prefs["driver"] = "ALL"
-
-        options.set_capability("ms:loggingPrefs", logging_prefs)
 
         logger.debug("initializing edgedriver")
-        if driver_path:
+        if shared_service:
+            from .service import shared_services
+
+            service = shared_services.lease(
+                EdgeService,
+                executable_path=driver_path,
+                service_args=args,
+                log_output=logpath,
+            )
+        elif driver_path:
             service = EdgeService(
                 executable_path=driver_path,
                 service_args=args,
@@ -581,26 +1304,44 @@ class SetupSelenium:
                 service_args=args,
                 log_output=logpath,  # type: ignore[arg-type]
             )
-        driver = Edge(service=service, options=options)
-
-        driver_vers = driver.capabilities["msedge"]["msedgedriverVersion"].split(" ")[0]
-        browser_vers = driver.capabilities["browserVersion"]
-
-        drvmsg = f"Driver info: msedge webdriver={driver_vers}"
-        bsrmsg = f"Browser info:          msedge={browser_vers}"
-
-        dver = Version.coerce(driver_vers)
-        bver = Version.coerce(browser_vers)
-        if dver.major != bver.major:
-            logger.critical(drvmsg)
-            logger.critical(bsrmsg)
-            logger.critical("msedgedriver and browser versions not in sync!!")
-            logger.warning(
-                "https://developer.microsoft.com/en-us/microsoft-edge/tools/webdriver/ "
-                "for the latest version"
+        time_service_start(service)
+        with timed("session"):
+            driver = Edge(service=service, options=options)
+
+        with quit_on_error(driver):
+            with timed("version_check"):
+                capabilities = driver.capabilities
+                driver_vers = capabilities["msedge"]["msedgedriverVersion"].split(" ")[
+                    0
+                ]
+                browser_vers = capabilities["browserVersion"]
+
+                drvmsg = f"Driver info: msedge webdriver={driver_vers}"
+                bsrmsg = f"Browser info:          msedge={browser_vers}"
+
+                dver = Version.coerce(driver_vers)
+                bver = Version.coerce(browser_vers)
+                if dver.major != bver.major:
+                    logger.critical(drvmsg)
+                    logger.critical(bsrmsg)
+                    logger.critical("msedgedriver and browser versions not in sync!!")
+                    logger.warning(
+                        "https://developer.microsoft.com/en-us/microsoft-edge/tools/webdriver/ "
+                        "for the latest version"
+                    )
+                else:
+                    logger.info(drvmsg)
+                    logger.info(bsrmsg)
+            SetupSelenium.log_options(options)
+            attach_log_drainer(
+                driver,
+                log_dir,
+                enable_log_performance=enable_log_performance,
+                enable_log_console=enable_log_console,
+                interval=log_drain_interval,
             )
-        else:
-            logger.info(drvmsg)
-            logger.info(bsrmsg)
-        SetupSelenium.log_options(options)
+            if lean is not None:
+                from .lean import LeanMode
+
+                LeanMode(lean, Browser.EDGE).attach(driver)
         return driver
@@ -0,0 +1,154 @@
+"""Quitting drivers within a deadline, killing what is left behind"""
+
+from __future__ import annotations
+
+import os as os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from . import setup_selenium as _setup
+from .proc import PROC, process_tree, start_time
+from .service import SharedService
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from subprocess import Popen
+
+    from .setup_selenium import T_WebDriver
+
+__all__ = ["DEFAULT_QUIT_TIMEOUT", "shutdown", "shutdown_all"]
+
+# chromedriver and geckodriver give up on a wedged browser long after this
+DEFAULT_QUIT_TIMEOUT = 10.0
+
+
+def _local_process(driver: T_WebDriver) -> Popen | None:
+    """The Popen of a driver service this driver does not share"""
+    service = getattr(driver, "service", None)
+    if service is None or isinstance(service, SharedService):
+        return None
+    return getattr(service, "process", None)
+
+
+def _snapshot(pid: int) -> dict[int, int]:
+    """Start times of the processes in the tree of `pid`, by pid"""
+    if not os.path.isdir(PROC):
+        return {}
+    tree = {}
+    for p in process_tree(pid):
+        started = start_time(p)
+        if started is not None:
+            tree[p] = started
+    return tree
+
+
+def _running(process: Popen, tree: dict[int, int]) -> list[int]:
+    """Pids of the tree still running; pids may have been reused by now"""
+    running = [p for p, started in tree.items() if start_time(p) == started]
+    if process.poll() is None and process.pid not in running:
+        running.insert(0, process.pid)
+    return running
+
+
+def _kill(process: Popen, tree: dict[int, int], grace: float) -> int:
+    """
+    Kill what is left of `process` and `tree` after `grace` seconds.
+
+    Returns how many processes were killed.
+    """
+    deadline = time.monotonic() + grace
+    # processes of a driver that did quit may take a moment to exit
+    while _running(process, tree) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    killed = 0
+    if process.poll() is None:
+        # the driver first, so it cannot start anything new
+        process.kill()
+        killed += 1
+    for pid in _running(process, tree):
+        if pid == process.pid:
+            continue
+        try:
+            os.kill(pid, signal.SIGKILL)
+            killed += 1
+        except OSError:
+            pass
+    if killed:
+        # a kill is delivered asynchronously; wait so callers see them gone
+        deadline = time.monotonic() + 1.0
+        while _running(process, tree) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        survivors = _running(process, tree)
+        if survivors:
+            _setup.logger.warning(f"processes {survivors} survived a kill")
+    return killed
+
+
+def shutdown(driver: T_WebDriver, timeout: float = DEFAULT_QUIT_TIMEOUT) -> bool:
+    """
+    Quit `driver`, giving up after `timeout` seconds.
+
+    The processes of its driver service, i.e. the browser and everything it
+    launched, are noted first. Whatever still runs once `quit` returned or
+    gave up is killed, so a wedged browser costs `timeout` at most and leaves
+    nothing behind. The whole tree is only known on linux; elsewhere only the
+    driver service process is killed. Shared services and remote sessions are
+    never killed. Returns whether `quit` finished in time without errors.
+    """
+    process = _local_process(driver)
+    tree: dict[int, int] = {}
+    if process is not None:
+        try:
+            tree = _snapshot(process.pid)
+        except Exception:  # noqa: BLE001
+            _setup.logger.warning("could not list the driver processes")
+
+    failed: list[BaseException] = []
+
+    def quit_driver() -> None:
+        try:
+            driver.quit()
+        except Exception as exc:  # noqa: BLE001
+            failed.append(exc)
+
+    started = time.monotonic()
+    quitting = threading.Thread(target=quit_driver, name="driver-quit", daemon=True)
+    quitting.start()
+    quitting.join(timeout)
+    clean = not quitting.is_alive() and not failed
+    if quitting.is_alive():
+        _setup.logger.warning(f"driver did not quit within {timeout}s")
+    elif failed:
+        _setup.logger.warning(f"driver failed to quit: {failed[0]!r}")
+
+    if process is not None:
+        grace = timeout - (time.monotonic() - started) if clean else 0.0
+        killed = _kill(process, tree, grace)
+        if killed:
+            _setup.logger.warning(f"killed {killed} processes left by the driver")
+    return clean
+
+
+def shutdown_all(
+    drivers: Iterable[T_WebDriver | None],
+    timeout: float = DEFAULT_QUIT_TIMEOUT,
+    max_workers: int | None = None,
+) -> list[bool]:
+    """
+    `shutdown` every driver in parallel; results in the order of `drivers`.
+
+    With enough workers all of them are gone within about `timeout` seconds.
+    `None` entries are skipped and count as a clean shutdown.
+    """
+    drivers = list(drivers)
+    pending = [d for d in drivers if d is not None]
+    if not pending:
+        return [True] * len(drivers)
+    with ThreadPoolExecutor(
+        max_workers=max_workers or len(pending), thread_name_prefix="shutdown"
+    ) as pool:
+        results = iter(list(pool.map(lambda d: shutdown(d, timeout), pending)))
+    return [True if d is None else next(results) for d in drivers]
@@ -0,0 +1,237 @@
+"""Network and cpu throttling profiles and a runner for profile matrices"""
+
+from __future__ import annotations
+
+import itertools
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Union
+
+from . import setup_selenium as _setup
+from .timing import percentile
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from selenium.webdriver.chromium.webdriver import ChromiumDriver
+
+__all__ = [
+    "NETWORK_PROFILES",
+    "CellResult",
+    "MatrixResult",
+    "NetworkProfile",
+    "apply_network_profile",
+    "network_profile",
+    "reset_throttling",
+    "run_matrix",
+]
+
+# the cpu throttling rate of an unthrottled browser
+NO_CPU_THROTTLE = 1
+
+
+@dataclass(frozen=True)
+class NetworkProfile:
+    """
+    Emulated network conditions of a chromium browser.
+
+    `latency` is added to every request in ms, `download` and `upload` are
+    in kbit/s (-1 leaves them unthrottled) and `packet_loss` is a percentage.
+    """
+
+    name: str
+    latency: float = 0
+    download: float = -1
+    upload: float = -1
+    packet_loss: float = 0.0
+    offline: bool = False
+
+    def __post_init__(self) -> None:
+        if self.latency < 0:
+            msg = f"latency must not be negative, got {self.latency}"
+            raise ValueError(msg)
+        if not 0 <= self.packet_loss <= 100:  # noqa: PLR2004
+            msg = f"packet_loss must be a percentage, got {self.packet_loss}"
+            raise ValueError(msg)
+
+    @staticmethod
+    def _bytes(kbits: float) -> float:
+        return kbits / 8 * 1024 if kbits >= 0 else -1
+
+    def conditions(self) -> dict[str, Any]:
+        """Arguments of chromedriver's setNetworkConditions command"""
+        return {
+            "offline": self.offline,
+            "latency": self.latency,
+            "download_throughput": self._bytes(self.download),
+            "upload_throughput": self._bytes(self.upload),
+        }
+
+    def cdp_conditions(self) -> dict[str, Any]:
+        """Arguments of the devtools Network.emulateNetworkConditions command"""
+        return {
+            "offline": self.offline,
+            "latency": self.latency,
+            "downloadThroughput": self._bytes(self.download),
+            "uploadThroughput": self._bytes(self.upload),
+            "packetLoss": self.packet_loss,
+        }
+
+
+# fmt: off
+NETWORK_PROFILES = {
+    p.name: p
+    for p in (
+        #                      latency, down,  up
+        NetworkProfile("GPRS",     500, 50,    20),
+        NetworkProfile("2G",       300, 250,   50),
+        NetworkProfile("SLOW3G",   100, 250,   100),
+        NetworkProfile("3G",       100, 750,   250),
+        NetworkProfile("FAST3G",   40,  1500,  750),
+        NetworkProfile("LTE",      20,  4000,  3000),
+        NetworkProfile("DSL",      5,   2000,  1000),
+        NetworkProfile("WIFI",     2,   30000, 15000),
+        NetworkProfile("OFFLINE",  offline=True),
+    )
+}
+# fmt: on
+
+NO_NETWORK_THROTTLE = NetworkProfile("NONE")
+
+T_Profile = Union[str, NetworkProfile]
+
+
+def network_profile(profile: T_Profile) -> NetworkProfile:
+    """A profile by its name in `NETWORK_PROFILES`, or `profile` itself"""
+    if isinstance(profile, NetworkProfile):
+        return profile
+    try:
+        return NETWORK_PROFILES[profile.upper()]
+    except KeyError:
+        msg = f"Unknown network profile: {profile}"
+        raise ValueError(msg) from None
+
+
+def apply_network_profile(driver: ChromiumDriver, profile: T_Profile) -> None:
+    """Throttle the network of a chromium browser"""
+    profile = network_profile(profile)
+    if profile.packet_loss:
+        # only the devtools protocol knows about packet loss; chromedriver
+        # does not reapply these conditions to new tabs
+        driver.execute_cdp_cmd(
+            "Network.emulateNetworkConditions", profile.cdp_conditions()
+        )
+        return
+    # same command as `set_network_conditions`, which remote drivers lack
+    driver.execute("setNetworkConditions", {"network_conditions": profile.conditions()})
+
+
+def reset_throttling(driver: ChromiumDriver) -> None:
+    """Remove any network and cpu throttling from a chromium browser"""
+    driver.execute("deleteNetworkConditions")
+    driver.execute_cdp_cmd(
+        "Network.emulateNetworkConditions", NO_NETWORK_THROTTLE.cdp_conditions()
+    )
+    driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": NO_CPU_THROTTLE})
+
+
+@dataclass
+class CellResult:
+    """Seconds every run of a scenario took under one network and cpu profile"""
+
+    network: str
+    cpu_rate: int
+    samples: list[float] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    def stats(self) -> dict[str, float]:
+        """min, mean, p50, p95 and max of the successful runs"""
+        if not self.samples:
+            return {}
+        return {
+            "min": min(self.samples),
+            "mean": statistics.fmean(self.samples),
+            "p50": percentile(self.samples, 50),
+            "p95": percentile(self.samples, 95),
+            "max": max(self.samples),
+        }
+
+    def as_dict(self) -> dict[str, object]:
+        """Plain dict suitable for json or metrics backends"""
+        return {
+            "network": self.network,
+            "cpu_rate": self.cpu_rate,
+            "runs": len(self.samples) + len(self.errors),
+            "errors": list(self.errors),
+            **self.stats(),
+        }
+
+
+@dataclass
+class MatrixResult:
+    """The cells of a network by cpu profile matrix"""
+
+    cells: dict[tuple[str, int], CellResult] = field(default_factory=dict)
+
+    def budgets(self, pct: float = 95) -> dict[str, dict[int, float]]:
+        """
+        The `pct` percentile of every cell, by network then cpu rate.
+
+        Cells without a successful run are left out.
+        """
+        budgets: dict[str, dict[int, float]] = {}
+        for (network, cpu_rate), cell in self.cells.items():
+            if cell.samples:
+                budgets.setdefault(network, {})[cpu_rate] = percentile(
+                    cell.samples, pct
+                )
+        return budgets
+
+    def as_dict(self) -> list[dict[str, object]]:
+        """Plain list suitable for json or metrics backends"""
+        return [cell.as_dict() for cell in self.cells.values()]
+
+
+def run_matrix(
+    driver: ChromiumDriver,
+    scenario: Callable[[ChromiumDriver], object],
+    networks: Iterable[T_Profile] = ("3G", "LTE"),
+    cpu_rates: Iterable[int] = (NO_CPU_THROTTLE,),
+    repeat: int = 1,
+    reset: Callable[[ChromiumDriver], object] | None = None,
+) -> MatrixResult:
+    """
+    Time `scenario` under every combination of network profile and cpu rate.
+
+    Each cell runs `repeat` times. Before each run the profile is applied;
+    after each run, failed or not, all throttling is removed and `reset` is
+    called so the next run starts from a clean browser. A failing run is
+    recorded in the errors of its cell instead of ending the matrix.
+    """
+    if repeat < 1:
+        msg = f"repeat must be at least 1, got {repeat}"
+        raise ValueError(msg)
+    profiles = [network_profile(n) for n in networks]
+    result = MatrixResult()
+    for profile, cpu_rate in itertools.product(profiles, cpu_rates):
+        cell = result.cells.setdefault(
+            (profile.name, cpu_rate), CellResult(profile.name, cpu_rate)
+        )
+        for _ in range(repeat):
+            try:
+                apply_network_profile(driver, profile)
+                _setup.SetupSelenium.set_cpu_throttle(driver, cpu_rate)  # type: ignore[arg-type]
+                start = time.perf_counter()
+                scenario(driver)
+                cell.samples.append(time.perf_counter() - start)
+            except Exception as exc:  # noqa: BLE001
+                _setup.logger.warning(
+                    f"scenario failed on {profile.name} at cpu rate {cpu_rate}: {exc}"
+                )
+                cell.errors.append(repr(exc))
+            finally:
+                reset_throttling(driver)
+                if reset is not None:
+                    reset(driver)
+    return result
@@ -0,0 +1,140 @@
+"""Startup timing instrumentation"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, TypeVar
+
+from typing_extensions import ParamSpec
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+__all__ = [
+    "StartupTimings",
+    "percentile",
+    "recorded",
+    "recording",
+    "set_timing_hook",
+    "timed",
+]
+
+P = ParamSpec("P")
+R = TypeVar("R")
+TimingHook = Callable[["StartupTimings"], None]
+
+
+@dataclass
+class StartupTimings:
+    """
+    Seconds spent in each startup phase.
+
+    Phases are exclusive: time spent in a phase nested inside another is only
+    counted for the inner one. Phases entered more than once accumulate.
+    """
+
+    browser: str | None = None
+    phases: dict[str, float] = field(default_factory=dict)
+    total: float = 0.0
+    _stack: list[float] = field(default_factory=list, repr=False)
+
+    def as_dict(self) -> dict[str, object]:
+        """Plain dict suitable for json or metrics backends"""
+        return {"browser": self.browser, "total": self.total, **self.phases}
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """The nearest-rank `pct` percentile of `samples`"""
+    if not samples:
+        msg = "percentile of no samples"
+        raise ValueError(msg)
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+_current: ContextVar[StartupTimings | None] = ContextVar(
+    "startup_timings", default=None
+)
+_hook: TimingHook | None = None
+
+
+def set_timing_hook(hook: TimingHook | None) -> None:
+    """Set a callback receiving the timings of every driver startup"""
+    if hook is not None and not callable(hook):
+        msg = "hook must be callable"
+        raise TypeError(msg)
+
+    global _hook  # noqa: PLW0603
+    _hook = hook
+
+
+@contextlib.contextmanager
+def recording(browser: str | None = None) -> Iterator[StartupTimings]:
+    """
+    Record the timed phases run inside the block.
+
+    Nested recordings share the outermost one; only the outermost recording
+    computes the total and is passed to the timing hook.
+    """
+    # Browser members lower() to their plain value
+    browser = browser.lower() if browser else None
+    outer = _current.get()
+    if outer is not None:
+        if outer.browser is None:
+            outer.browser = browser
+        yield outer
+        return
+
+    timings = StartupTimings(browser=browser)
+    token = _current.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings.total = time.perf_counter() - start
+        _current.reset(token)
+
+    if _hook is not None:
+        try:
+            _hook(timings)
+        except Exception:  # noqa: BLE001
+            from . import setup_selenium as _setup  # noqa: PLC0415
+
+            _setup.logger.warning("startup timing hook failed", exc_info=True)
+
+
+def recorded(func: Callable[P, R]) -> Callable[P, R]:
+    """Run `func` inside a recording named after its `browser` argument"""
+
+    @functools.wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        browser = kwargs.get("browser", args[0] if args else None)
+        with recording(browser if isinstance(browser, str) else None):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Time a phase of the active recording; a no-op outside of one"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+
+    timings._stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = timings._stack.pop()
+        timings.phases[phase] = timings.phases.get(phase, 0.0) + elapsed - nested
+        if timings._stack:
+            timings._stack[-1] += elapsed
@@ -0,0 +1,184 @@
+"""Driver and browser versions read from their binaries before launching"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os as os
+import re
+import subprocess
+import sys
+import threading
+
+from . import setup_selenium as _setup
+from .cache import driver_cache
+from .setup_selenium import HEADLESS_SHELL_BROWSER, Browser
+from .timing import timed
+
+__all__ = ["binary_version", "check_compatible", "compatible", "preflight"]
+
+# chromedriver prints a build hash after its version, chrome a channel
+VERSION = re.compile(r"\b\d+(?:\.\d+)+\b")
+DEFAULT_TIMEOUT = 10.0
+
+# drivers only serve a browser with the same major version
+CHECKED = frozenset({Browser.CHROME, Browser.EDGE, HEADLESS_SHELL_BROWSER})
+
+_lock = threading.Lock()
+_versions: dict[tuple[str, int, int], str | None] = {}
+
+
+def _windows_version(path: str) -> str | None:
+    """
+    Version of a chromium browser from its install directory.
+
+    `chrome.exe --version` starts the browser rather than printing anything,
+    but every install keeps its files in a directory named after the version
+    next to the executable.
+    """
+    try:
+        names = os.listdir(os.path.dirname(path))
+    except OSError:
+        return None
+    versions = [name for name in names if VERSION.fullmatch(name)]
+    if not versions:
+        return None
+    return max(versions, key=lambda v: tuple(int(part) for part in v.split(".")))
+
+
+def _read_version(path: str, timeout: float) -> str | None:
+    if sys.platform == "win32" and not os.path.basename(path).lower().endswith(
+        "driver.exe"
+    ):
+        return _windows_version(path)
+    try:
+        result = subprocess.run(  # noqa: S603
+            [path, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=False,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION.search(result.stdout)
+    return match.group(0) if match else None
+
+
+def _entry_path(key: tuple[str, int, int]) -> str:
+    """Where the version for `key` is kept, in the driver cache directory"""
+    digest = hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+    return os.path.join(driver_cache.cache_dir, "versions", f"{digest}.json")
+
+
+def _load(key: tuple[str, int, int]) -> str | None:
+    try:
+        with open(_entry_path(key), encoding="utf-8") as f:
+            entry = json.load(f)
+        if entry["key"] != list(key):
+            return None
+        return str(entry["version"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _store(key: tuple[str, int, int], version: str) -> None:
+    path = _entry_path(key)
+    # write then rename so readers never see a partially written entry
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "version": version}, f)
+        os.replace(tmp, path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+
+
+def binary_version(path: str, timeout: float = DEFAULT_TIMEOUT) -> str | None:
+    """
+    Version `path --version` prints; `None` if it cannot be told.
+
+    The result is cached by path, modification time and size, so a binary
+    updated in place is read again: in the process, and on disk next to the
+    driver cache entries so new processes do not run the binary either.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        if key in _versions:
+            return _versions[key]
+    version = _load(key)
+    if version is None:
+        version = _read_version(path, timeout)
+        # one that could not be told may just have timed out; try next time
+        if version is not None:
+            _store(key, version)
+    with _lock:
+        _versions[key] = version
+    return version
+
+
+def clear() -> None:
+    """Forget every version read in this process"""
+    with _lock:
+        _versions.clear()
+
+
+def major(version: str) -> int:
+    return int(version.split(".", 1)[0])
+
+
+def compatible(browser: str, driver_path: str, browser_path: str) -> bool | None:
+    """
+    Whether the driver at `driver_path` can drive the browser at `browser_path`.
+
+    `None` when that cannot be told before launching: geckodriver supports a
+    range of firefox versions, and either binary may not report its version.
+    """
+    browser = browser.lower()
+    if browser not in CHECKED:
+        return None
+    driver_version = binary_version(driver_path)
+    browser_version = binary_version(browser_path)
+    if driver_version is None or browser_version is None:
+        return None
+    return major(driver_version) == major(browser_version)
+
+
+def check_compatible(browser: str, driver_path: str, browser_path: str) -> None:
+    """Raise `RuntimeError` if the driver is known not to drive the browser"""
+    browser = browser.lower()
+    if compatible(browser, driver_path, browser_path) is not False:
+        return
+    msg = (
+        f"driver {driver_path} ({binary_version(driver_path)}) does not match"
+        f" {browser} {browser_path} ({binary_version(browser_path)})"
+    )
+    raise RuntimeError(msg)
+
+
+def preflight(
+    browser: str,
+    paths: tuple[str, str],
+    driver_version: str | None = None,
+    headless_shell: bool = False,
+) -> None:
+    """
+    Raise `RuntimeError` before launching a driver known not to match its browser.
+
+    `paths` are what `install_driver` returned for the other arguments. A
+    pinned `driver_version` is the caller's choice and not checked.
+    """
+    if driver_version:
+        return
+    browser = _setup.SetupSelenium._manager_browser(browser, headless_shell)
+    if headless_shell:
+        browser = HEADLESS_SHELL_BROWSER
+    with timed("preflight"):
+        check_compatible(browser, *paths)
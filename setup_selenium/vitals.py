@@ -0,0 +1,295 @@
+"""Web vitals and navigation timing of every page a driver loads"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable
+
+from . import setup_selenium as _setup
+from .timing import percentile
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+    from .setup_selenium import T_WebDriver
+
+__all__ = ["PageVitals", "VitalsCollector", "set_vitals_hook", "summarize"]
+
+VitalsHook = Callable[["PageVitals"], None]
+
+CHROMIUM_BROWSERS = frozenset(
+    {"chrome", "chromium", "chrome-headless-shell", "msedge", "microsoftedge"}
+)
+DEFAULT_PERCENTILES = (50, 75, 95)
+# pages that are not worth a record, like the blank page of a new session
+_SKIPPED_SCHEMES = ("about:", "data:", "chrome:", "edge:")
+
+# Registers buffered PerformanceObservers once per document and keeps running
+# values for what the performance timeline does not keep itself:
+#  - lcp: start time of the last largest-contentful-paint candidate
+#  - cls: largest session window of layout shifts (gaps < 1s, at most 5s)
+#  - inp: longest duration per interaction, reduced when collecting
+#  - long tasks and the blocking time past 50ms of each of them
+INSTALL_SCRIPT = """
+(() => {
+  if (window.__setupSeleniumVitals) return;
+  const state = {lcp: null, cls: 0, window: 0, first: 0, last: 0,
+                 interactions: {}, longTasks: 0, blocking: 0,
+                 supported: [], observers: []};
+  window.__setupSeleniumVitals = state;
+  const interaction = (e) => {
+    if (!e.interactionId) return;
+    const seen = state.interactions[e.interactionId] || 0;
+    state.interactions[e.interactionId] = Math.max(seen, e.duration);
+  };
+  const handlers = {
+    "largest-contentful-paint": (e) => { state.lcp = e.startTime; },
+    "layout-shift": (e) => {
+      if (e.hadRecentInput) return;
+      if (state.window && e.startTime - state.last < 1000
+          && e.startTime - state.first < 5000) {
+        state.window += e.value;
+      } else {
+        state.window = e.value;
+        state.first = e.startTime;
+      }
+      state.last = e.startTime;
+      state.cls = Math.max(state.cls, state.window);
+    },
+    "event": interaction,
+    "first-input": interaction,
+    "longtask": (e) => {
+      state.longTasks += 1;
+      state.blocking += Math.max(e.duration - 50, 0);
+    },
+  };
+  const supported = PerformanceObserver.supportedEntryTypes || [];
+  for (const type of Object.keys(handlers)) {
+    if (!supported.includes(type)) continue;
+    const handle = handlers[type];
+    const observer = new PerformanceObserver((list) => list.getEntries().forEach(handle));
+    const options = {type: type, buffered: true};
+    if (type === "event") options.durationThreshold = 16;
+    try {
+      observer.observe(options);
+      state.supported.push(type);
+      state.observers.push([observer, handle]);
+    } catch (e) {}
+  }
+})();
+"""
+
+COLLECT_SCRIPT = INSTALL_SCRIPT + """
+const state = window.__setupSeleniumVitals;
+// entries still queued for the observer callbacks
+state.observers.forEach(([observer, handle]) => observer.takeRecords().forEach(handle));
+const values = {};
+const nav = performance.getEntriesByType("navigation")[0];
+if (nav) {
+  values.ttfb = nav.responseStart || null;
+  values.dom_interactive = nav.domInteractive || null;
+  values.dom_content_loaded = nav.domContentLoadedEventEnd || null;
+  values.load = nav.loadEventEnd || null;
+  values.dns = nav.domainLookupEnd - nav.domainLookupStart;
+  values.connect = nav.connectEnd - nav.connectStart;
+  values.transfer_size = nav.transferSize;
+}
+performance.getEntriesByType("paint").forEach((p) => {
+  values[p.name === "first-paint" ? "fp" : "fcp"] = p.startTime;
+});
+values.lcp = state.lcp;
+if (state.supported.includes("layout-shift")) values.cls = state.cls;
+if (state.supported.includes("longtask")) {
+  values.long_tasks = state.longTasks;
+  values.tbt = state.blocking;
+}
+// the worst interaction, ignoring one outlier for every 50 interactions
+const durations = Object.values(state.interactions).sort((a, b) => b - a);
+if (durations.length) {
+  values.inp = durations[Math.min(durations.length - 1, Math.floor(durations.length / 50))];
+}
+return {url: location.href, time_origin: performance.timeOrigin, values: values};
+"""
+
+_hook: VitalsHook | None = None
+
+
+def set_vitals_hook(hook: VitalsHook | None) -> None:
+    """Set a callback receiving the vitals of every page any collector finishes"""
+    if hook is not None and not callable(hook):
+        msg = "hook must be callable"
+        raise TypeError(msg)
+
+    global _hook  # noqa: PLW0603
+    _hook = hook
+
+
+@dataclass
+class PageVitals:
+    """
+    What one page load measured, in ms (`cls` is unitless).
+
+    `values` are the in-page measurements; `metrics` holds chromium's devtools
+    Performance.getMetrics at the time the page was last collected.
+    """
+
+    url: str
+    browser: str | None = None
+    time_origin: float = 0.0
+    values: dict[str, float] = field(default_factory=dict)
+    metrics: dict[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, object]:
+        """Plain dict suitable for json or metrics backends"""
+        return {
+            "url": self.url,
+            "browser": self.browser,
+            "time_origin": self.time_origin,
+            **self.values,
+            **self.metrics,
+        }
+
+
+def summarize(
+    pages: Iterable[PageVitals], percentiles: Iterable[float] = DEFAULT_PERCENTILES
+) -> dict[str, dict[str, float]]:
+    """Count and percentiles of every value and metric over `pages`"""
+    samples: dict[str, list[float]] = {}
+    for page in pages:
+        for name, value in {**page.values, **page.metrics}.items():
+            samples.setdefault(name, []).append(value)
+    pcts = tuple(percentiles)
+    return {
+        name: {
+            "count": len(values),
+            **{f"p{pct:g}": percentile(values, pct) for pct in pcts},
+        }
+        for name, values in samples.items()
+    }
+
+
+class VitalsCollector:
+    """
+    Records navigation timing, paint timing, LCP, CLS, INP and long tasks.
+
+    `collect` reads the measurements of the current page from in-page
+    PerformanceObservers, plus devtools Performance.getMetrics on chromium.
+    Once attached, the page being left is collected before every `get` and
+    the last one when the driver quits. Pages navigated to otherwise are only
+    recorded if `collect` is called while they are shown.
+    """
+
+    def __init__(self, driver: T_WebDriver) -> None:
+        self.driver = driver
+        caps = getattr(driver, "capabilities", None) or {}
+        self.browser: str | None = caps.get("browserName")
+        self.chromium = (self.browser or "").lower() in CHROMIUM_BROWSERS
+        self.pages: list[PageVitals] = []
+        self._current: PageVitals | None = None
+        self._started = False
+
+    def start(self) -> Self:
+        """Observe from the start of every document (chromium only)"""
+        if self._started:
+            return self
+        self._started = True
+        if not self.chromium:
+            return self
+        try:
+            # long tasks are not buffered, so observe before the page runs
+            self.driver.execute_cdp_cmd(  # type: ignore[union-attr]
+                "Page.addScriptToEvaluateOnNewDocument", {"source": INSTALL_SCRIPT}
+            )
+            self.driver.execute_cdp_cmd("Performance.enable", {})  # type: ignore[union-attr]
+        except Exception:  # noqa: BLE001
+            _setup.logger.warning("devtools unavailable; collecting in-page only")
+            self.chromium = False
+        return self
+
+    def _metrics(self) -> dict[str, float]:
+        if not self.chromium:
+            return {}
+        result = self.driver.execute_cdp_cmd("Performance.getMetrics", {})  # type: ignore[union-attr]
+        return {m["name"]: m["value"] for m in result.get("metrics", [])}
+
+    def collect(self) -> PageVitals | None:
+        """Measure the current page; `None` for blank and internal pages"""
+        if not self._started:
+            self.start()
+        snapshot = self.driver.execute_script(COLLECT_SCRIPT)
+        if not snapshot or snapshot["url"].startswith(_SKIPPED_SCHEMES):
+            return None
+        page = PageVitals(
+            url=snapshot["url"],
+            browser=self.browser,
+            time_origin=snapshot["time_origin"],
+            values={k: v for k, v in snapshot["values"].items() if v is not None},
+            metrics=self._metrics(),
+        )
+        current = self._current
+        if current is not None and current.time_origin != page.time_origin:
+            self._finish(current)
+        self._current = page
+        return page
+
+    def _finish(self, page: PageVitals) -> None:
+        self.pages.append(page)
+        if _hook is not None:
+            try:
+                _hook(page)
+            except Exception:  # noqa: BLE001
+                _setup.logger.warning("vitals hook failed", exc_info=True)
+
+    def _collect_quietly(self) -> None:
+        try:
+            self.collect()
+        except Exception:  # noqa: BLE001
+            _setup.logger.warning("failed to collect page vitals", exc_info=True)
+
+    def _leave(self) -> None:
+        self._collect_quietly()
+        current, self._current = self._current, None
+        if current is not None:
+            self._finish(current)
+
+    def stop(self) -> None:
+        """Collect the current page one last time and record it"""
+        self._leave()
+
+    def summary(
+        self, percentiles: Iterable[float] = DEFAULT_PERCENTILES
+    ) -> dict[str, dict[str, float]]:
+        """Percentiles over the pages recorded so far"""
+        pages = self.pages + ([self._current] if self._current else [])
+        return summarize(pages, percentiles)
+
+    def attach(self) -> Self:
+        """Collect on every `get` and when the driver quits"""
+        get, quit_driver = self.driver.get, self.driver.quit
+
+        def collecting_get(url: str) -> None:
+            self._leave()
+            get(url)
+
+        def quit() -> None:  # noqa: A001
+            self.stop()
+            quit_driver()
+
+        self.driver.get = collecting_get  # type: ignore[method-assign]
+        self.driver.quit = quit  # type: ignore[method-assign]
+        self.driver.vitals = self  # type: ignore[union-attr]
+        return self.start()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop()
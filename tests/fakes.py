@@ -0,0 +1,345 @@
+"""Stand-ins for webdrivers so tests can run without browsers"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any
+
+from selenium.common.exceptions import InvalidSessionIdException
+from selenium.webdriver.chrome import (
+    service as chrome_service,
+    webdriver as chrome_webdriver,
+)
+from selenium.webdriver.firefox import (
+    service as firefox_service,
+    webdriver as firefox_webdriver,
+)
+
+from setup_selenium import SetupSelenium
+from setup_selenium.proc import start_time
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    import pytest
+    from typing_extensions import Self
+
+
+class FakeDriver:
+    def __init__(self, browser: str = "chrome") -> None:
+        self.browser = browser
+        self.quit_called = False
+        self.resets = 0
+        self.options: object = None
+        self.binary: str | None = None
+        self.urls: list[str] = []
+
+    def get(self, url: str) -> None:
+        self.urls.append(url)
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+class FakeService:
+    """A driver service starting nothing, in `delay` seconds"""
+
+    delay = 0.0
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.kwargs = kwargs
+        self.started = False
+
+    def start(self) -> None:
+        time.sleep(self.delay)
+        self.started = True
+
+
+class ChromiumDriver:
+    """Buffers log entries like chromedriver until get_log is called"""
+
+    def __init__(self) -> None:
+        self.session_id = "abc123"
+        self.buffers: dict[str, list[dict[str, Any]]] = {
+            "performance": [],
+            "browser": [],
+        }
+        self.emitted = dict.fromkeys(self.buffers, 0)
+        self.lock = threading.Lock()
+        self.quit_called = False
+        self.cdp: list[tuple[str, dict[str, Any]]] = []
+        self.capabilities = {
+            "browserVersion": "145.0.7632.46",
+            "chrome": {"chromedriverVersion": "145.0.7632.46 (abc)"},
+        }
+
+    def emit(self, log_type: str, count: int) -> None:
+        with self.lock:
+            start = self.emitted[log_type]
+            self.emitted[log_type] += count
+            self.buffers[log_type].extend(
+                {"level": "INFO", "message": f"{log_type} {start + i}", "timestamp": i}
+                for i in range(count)
+            )
+
+    def execute_cdp_cmd(self, cmd: str, params: dict[str, Any]) -> dict[str, Any]:
+        self.cdp.append((cmd, params))
+        return {}
+
+    def get_log(self, log_type: str) -> list[dict[str, Any]]:
+        if self.quit_called:
+            raise InvalidSessionIdException
+        with self.lock:
+            entries, self.buffers[log_type] = self.buffers[log_type], []
+        return entries
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+class FakeChrome(ChromiumDriver):
+    """Replaces selenium's chrome webdriver, taking `delay` seconds per session"""
+
+    delay = 0.0
+
+    def __init__(self, service: FakeService, options: Any) -> None:  # noqa: ANN401
+        super().__init__()
+        self.service = service
+        self.options = options
+        service.start()
+        time.sleep(self.delay)
+
+
+class FakeFirefox:
+    """Replaces selenium's firefox webdriver"""
+
+    def __init__(self, service: FakeService, options: Any) -> None:  # noqa: ANN401
+        self.service = service
+        self.options = options
+        self.quit_called = False
+        self.capabilities = {
+            "moz:geckodriverVersion": "0.36.0",
+            "browserVersion": "140.0",
+        }
+        # the profile as selenium sends it for a new session
+        firefox_options = options.to_capabilities()["moz:firefoxOptions"]
+        self.encoded = firefox_options.get("profile")
+        service.start()
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+def patch_chrome(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Launch `FakeChrome` instead of chromedriver and chrome"""
+    monkeypatch.setattr(chrome_service, "Service", FakeService)
+    monkeypatch.setattr(chrome_webdriver, "WebDriver", FakeChrome)
+
+
+def patch_firefox(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Launch `FakeFirefox` instead of geckodriver and firefox"""
+    monkeypatch.setattr(firefox_service, "Service", FakeService)
+    monkeypatch.setattr(firefox_webdriver, "WebDriver", FakeFirefox)
+
+
+# a "driver" starting a "browser" running argv[1], then reporting its pid;
+# the browser outlives the driver unless argv[2] is "kill"
+PROCESS_DRIVER = """
+import subprocess, sys
+browser = subprocess.Popen(
+    [sys.executable, "-c", sys.argv[1]], stdout=subprocess.DEVNULL
+)
+print(browser.pid, flush=True)
+try:
+    input()
+finally:
+    if sys.argv[2] == "kill":
+        browser.kill()
+"""
+SLEEPING = "import time; time.sleep(60)"
+BUSY = "while True: pass"
+
+
+class ProcessService:
+    """A driver service around an already running process"""
+
+    def __init__(self, process: subprocess.Popen) -> None:
+        self.process = process
+
+
+class ProcessDriver:
+    """
+    A driver whose service process is a real process tree.
+
+    The "browser" runs `browser` and is left behind on quit, as a crashed
+    driver would, unless `kill`. With `hang` quitting never returns.
+    """
+
+    def __init__(
+        self, browser: str = SLEEPING, kill: bool = False, hang: bool = False
+    ) -> None:
+        self.session_id = "abc123"
+        self.hang = hang
+        self.quit_called = False
+        process = subprocess.Popen(  # noqa: S603
+            [sys.executable, "-c", PROCESS_DRIVER, browser, "kill" if kill else ""],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        self.service = ProcessService(process)
+        assert process.stdout is not None
+        self.browser_pid = int(process.stdout.readline())
+
+    @property
+    def process(self) -> subprocess.Popen:
+        return self.service.process
+
+    def quit(self) -> None:
+        self.quit_called = True
+        if self.hang:
+            threading.Event().wait()
+        self.process.communicate(b"\n", timeout=10)
+
+    def alive(self) -> bool:
+        return self.process.poll() is None or start_time(self.browser_pid) is not None
+
+    def close(self) -> None:
+        """Kill whatever the test left running"""
+        self.process.kill()
+        self.process.wait()
+        if start_time(self.browser_pid) is not None:
+            os.kill(self.browser_pid, signal.SIGKILL)
+
+
+def patch_drivers(
+    monkeypatch: pytest.MonkeyPatch, delay: float = 0.01
+) -> list[FakeDriver]:
+    """Replace driver installation and creation with fakes"""
+    drivers: list[FakeDriver] = []
+    lock = threading.Lock()
+
+    def fake_install(
+        browser: str,
+        browser_path: str | None = None,
+        headless_shell: bool = False,
+        **_: str | None,
+    ) -> tuple[str, str]:
+        browser = SetupSelenium._manager_browser(browser, headless_shell)
+        return f"/fake/{browser}driver", browser_path or f"/fake/{browser}"
+
+    def fake_create(browser: str, **kwargs: Any) -> FakeDriver:
+        time.sleep(delay)
+        driver = FakeDriver(browser)
+        driver.options = kwargs.get("options")
+        driver.binary = kwargs.get("binary")
+        with lock:
+            drivers.append(driver)
+        return driver
+
+    monkeypatch.setattr(SetupSelenium, "install_driver", staticmethod(fake_install))
+    monkeypatch.setattr(SetupSelenium, "create_driver", staticmethod(fake_create))
+    return drivers
+
+
+class StubRemoteHandler(BaseHTTPRequestHandler):
+    # keep-alive needs HTTP/1.1
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: StubRemote
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _reply(self, value: Any) -> None:  # noqa: ANN401
+        body = json.dumps({"value": value}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, error: str) -> None:
+        body = json.dumps({"value": {"error": error, "message": ""}}).encode()
+        self.send_response(500)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else {}
+        with self.server.lock:
+            self.server.requests.append((self.command, self.path, body))
+        if self.command == "POST" and self.path == "/session":
+            caps = body["capabilities"]["alwaysMatch"]
+            with self.server.lock:
+                self.server.sessions.append(caps)
+            value = {
+                "sessionId": uuid.uuid4().hex,
+                "capabilities": {**caps, "browserVersion": "145.0.7632.46"},
+            }
+            self._reply(value)
+        elif self.path.endswith(tuple(self.server.errors)):
+            self._error("unsupported operation")
+        elif self.path.endswith("/title"):
+            self._reply("stub")
+        elif self.path.endswith("/window/handles"):
+            self._reply(self.server.handles)
+        elif self.path.endswith("/cdp/execute"):
+            self._reply(self.server.cdp.get(body["cmd"], {}))
+        else:
+            self._reply(None)
+
+    do_GET = do_POST = do_DELETE = _handle
+
+
+class StubRemote(ThreadingHTTPServer):
+    """Just enough of a Selenium Grid to create sessions and run commands"""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubRemoteHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests: list[tuple[str, str, dict]] = []
+        self.sessions: list[dict] = []
+        # replies to window handle and devtools commands, by command name
+        self.handles: list[str] = ["main"]
+        self.cdp: dict[str, Any] = {}
+        # path suffixes answered with an error
+        self.errors: set[str] = set()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def __enter__(self) -> Self:
+        threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.shutdown()
+        self.server_close()
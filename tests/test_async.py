@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, cast
+
+import pytest
+from fakes import FakeDriver, patch_drivers
+
+from setup_selenium import Browser, SetupSelenium
+
+
+@pytest.fixture
+def launched(monkeypatch: pytest.MonkeyPatch) -> list[FakeDriver]:
+    return patch_drivers(monkeypatch, delay=0.2)
+
+
+def test_ainstall_driver(launched: list[FakeDriver]) -> None:
+    paths = asyncio.run(SetupSelenium.ainstall_driver(Browser.FIREFOX))
+
+    assert paths == ("/fake/firefoxdriver", "/fake/firefox")
+    assert not launched
+
+
+def test_acreate_driver(launched: list[FakeDriver]) -> None:
+    driver = asyncio.run(SetupSelenium.acreate_driver(Browser.EDGE, headless=True))
+
+    assert cast("FakeDriver", driver).browser == "edge"
+    assert launched == [driver]
+
+
+def test_acreate_runs_concurrently(launched: list[FakeDriver]) -> None:
+    async def main() -> list[SetupSelenium]:
+        return await asyncio.gather(*(SetupSelenium.acreate() for _ in range(5)))
+
+    start = time.perf_counter()
+    instances = asyncio.run(main())
+    elapsed = time.perf_counter() - start
+
+    assert len(instances) == 5
+    assert len(launched) == 5
+    assert elapsed < 0.2 * 5 / 2
+
+
+def test_acreate_timeout_quits_late_driver(launched: list[FakeDriver]) -> None:
+    async def main() -> None:
+        with pytest.raises(asyncio.TimeoutError):
+            await SetupSelenium.acreate(timeout=0.05)
+        await asyncio.sleep(0.3)
+
+    asyncio.run(main())
+
+    assert len(launched) == 1
+    assert launched[0].quit_called
+
+
+def test_acreate_cancel_quits_late_driver(launched: list[FakeDriver]) -> None:
+    async def main() -> None:
+        task = asyncio.ensure_future(SetupSelenium.acreate_driver(Browser.CHROME))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.3)
+
+    asyncio.run(main())
+
+    assert len(launched) == 1
+    assert launched[0].quit_called
+
+
+@pytest.mark.usefixtures("launched")
+def test_acreate_many() -> None:
+    configs = [{"browser": Browser.CHROME}, {"browser": Browser.FIREFOX}]
+    instances = asyncio.run(SetupSelenium.acreate_many(configs))
+
+    browsers = [
+        cast("FakeDriver", cast("SetupSelenium", i).driver).browser for i in instances
+    ]
+    assert browsers == ["chrome", "firefox"]
+
+
+def test_acreate_many_failure_quits_others(launched: list[FakeDriver]) -> None:
+    configs: list[dict[str, Any]] = [{"browser": Browser.CHROME}, {"browser": "opera"}]
+
+    with pytest.raises(KeyError):
+        asyncio.run(SetupSelenium.acreate_many(configs))
+
+    assert len(launched) == 1
+    assert launched[0].quit_called
+
+
+def test_acreate_many_return_exceptions(launched: list[FakeDriver]) -> None:
+    configs: list[dict[str, Any]] = [{"browser": Browser.CHROME}, {"browser": "opera"}]
+    results = asyncio.run(SetupSelenium.acreate_many(configs, return_exceptions=True))
+
+    assert isinstance(results[0], SetupSelenium)
+    assert isinstance(results[1], KeyError)
+    assert not launched[0].quit_called
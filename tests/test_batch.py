@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import time
+from typing import cast
+
+import pytest
+from fakes import FakeDriver, patch_drivers
+
+from setup_selenium import Browser, DriverSpec, SetupSelenium, create_drivers
+
+
+@pytest.fixture
+def launched(monkeypatch: pytest.MonkeyPatch) -> list[FakeDriver]:
+    return patch_drivers(monkeypatch, delay=0.2)
+
+
+def test_create_drivers_heterogeneous(launched: list[FakeDriver]) -> None:
+    specs = [
+        DriverSpec(Browser.CHROME),
+        DriverSpec(Browser.FIREFOX),
+        DriverSpec(Browser.EDGE),
+    ]
+    result = create_drivers(specs)
+
+    assert result.ok
+    browsers = [cast("FakeDriver", d).browser for d in result.drivers]
+    assert browsers == ["chrome", "firefox", "edge"]
+    assert len(launched) == 3
+
+
+def test_create_drivers_is_parallel(launched: list[FakeDriver]) -> None:
+    start = time.perf_counter()
+    result = create_drivers([DriverSpec(Browser.CHROME)] * 8)
+    elapsed = time.perf_counter() - start
+
+    assert result.ok
+    assert len(launched) == 8
+    assert elapsed < 0.2 * 8 / 2
+
+
+def test_create_drivers_dedupes_resolution(monkeypatch: pytest.MonkeyPatch) -> None:
+    patch_drivers(monkeypatch)
+    installs: list[str] = []
+
+    def fake_install(browser: str, **_: str | None) -> tuple[str, str]:
+        installs.append(browser)
+        return "/fake/driver", "/fake/browser"
+
+    monkeypatch.setattr(SetupSelenium, "install_driver", staticmethod(fake_install))
+    specs = [
+        *[DriverSpec(Browser.CHROME)] * 4,
+        *[DriverSpec(Browser.FIREFOX)] * 2,
+        DriverSpec(Browser.EDGE, driver_path="/my/driver"),
+    ]
+    result = create_drivers(specs, max_workers=2)
+
+    assert result.ok
+    assert sorted(installs) == ["chrome", "firefox"]
+
+
+def test_create_drivers_partial_result(launched: list[FakeDriver]) -> None:
+    specs = [DriverSpec(Browser.CHROME), DriverSpec("opera")]  # type: ignore[arg-type]
+    result = create_drivers(specs)
+
+    assert not result.ok
+    assert result.drivers[0] is launched[0]
+    assert result.drivers[1] is None
+    assert isinstance(result.errors[1], KeyError)
+
+
+def test_create_drivers_raise_on_error(launched: list[FakeDriver]) -> None:
+    specs = [DriverSpec(Browser.CHROME), DriverSpec("opera")]  # type: ignore[arg-type]
+    with pytest.raises(KeyError):
+        create_drivers(specs, raise_on_error=True)
+
+    assert launched[0].quit_called
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import pytest
+
+from setup_selenium import Browser, SetupSelenium
+from setup_selenium.cache import (
+    DriverCache,
+    FileLock,
+    ResolutionMemo,
+    driver_cache,
+    resolution_memo,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+@pytest.fixture
+def fake_binaries(tmp_path: Path) -> tuple[str, str]:
+    driver = tmp_path / "driver"
+    browser = tmp_path / "browser"
+    driver.write_text("")
+    browser.write_text("")
+    return str(driver), str(browser)
+
+
+@pytest.fixture
+def sm_calls(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, fake_binaries: tuple[str, str]
+) -> Iterator[list[dict]]:
+    """Replace the Selenium Manager run and point the caches at a temp dir"""
+    calls: list[dict] = []
+
+    def fake_run(**kwargs: str | bool | None) -> tuple[str, str]:
+        calls.append(kwargs)
+        time.sleep(0.05)
+        return fake_binaries
+
+    monkeypatch.setattr(driver_cache, "cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setattr(driver_cache, "ttl", 60.0)
+    monkeypatch.setattr(SetupSelenium, "_run_selenium_manager", fake_run)
+    resolution_memo.clear()
+    yield calls
+    resolution_memo.clear()
+
+
+def test_cache_roundtrip(tmp_path: Path, fake_binaries: tuple[str, str]) -> None:
+    cache = DriverCache(cache_dir=str(tmp_path / "cache"), ttl=60)
+    key = cache.make_key("chrome")
+
+    assert cache.get(key) is None
+    cache.set(key, *fake_binaries)
+    assert cache.get(key) == fake_binaries
+
+
+def test_cache_key_depends_on_arguments() -> None:
+    keys = {
+        DriverCache.make_key("chrome"),
+        DriverCache.make_key("firefox"),
+        DriverCache.make_key("chrome", driver_version="1.0"),
+        DriverCache.make_key("chrome", browser_version="1.0"),
+        DriverCache.make_key("chrome", browser_path="/bin/chrome"),
+        DriverCache.make_key("chrome", install_browser=True),
+    }
+    assert len(keys) == 6
+
+
+def test_cache_expires(tmp_path: Path, fake_binaries: tuple[str, str]) -> None:
+    cache = DriverCache(cache_dir=str(tmp_path / "cache"), ttl=0.01)
+    key = cache.make_key("chrome")
+    cache.set(key, *fake_binaries)
+    time.sleep(0.05)
+
+    assert cache.get(key) is None
+    assert not os.path.exists(cache.entry_path(key))
+
+
+def test_cache_drops_missing_files(
+    tmp_path: Path, fake_binaries: tuple[str, str]
+) -> None:
+    cache = DriverCache(cache_dir=str(tmp_path / "cache"), ttl=60)
+    key = cache.make_key("chrome")
+    cache.set(key, *fake_binaries)
+    os.remove(fake_binaries[0])
+
+    assert cache.get(key) is None
+
+
+def test_install_driver_uses_cache(sm_calls: list[dict]) -> None:
+    paths1 = SetupSelenium.install_driver(Browser.CHROME)
+    paths2 = SetupSelenium.install_driver(Browser.CHROME)
+
+    assert paths1 == paths2
+    assert len(sm_calls) == 1
+
+
+def test_install_driver_bypass_cache(sm_calls: list[dict]) -> None:
+    SetupSelenium.install_driver(Browser.CHROME)
+    SetupSelenium.install_driver(Browser.CHROME, use_cache=False)
+
+    assert len(sm_calls) == 2
+
+
+def test_invalidate_driver_cache(sm_calls: list[dict]) -> None:
+    SetupSelenium.install_driver(Browser.CHROME)
+    SetupSelenium.install_driver(Browser.FIREFOX)
+    SetupSelenium.invalidate_driver_cache(Browser.CHROME)
+    SetupSelenium.install_driver(Browser.CHROME)
+    SetupSelenium.install_driver(Browser.FIREFOX)
+
+    assert len(sm_calls) == 3
+
+    SetupSelenium.invalidate_driver_cache()
+    SetupSelenium.install_driver(Browser.CHROME)
+    SetupSelenium.install_driver(Browser.FIREFOX)
+
+    assert len(sm_calls) == 5
+
+
+def test_install_driver_single_flight(sm_calls: list[dict]) -> None:
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(
+            pool.map(lambda _: SetupSelenium.install_driver(Browser.CHROME), range(8))
+        )
+
+    assert len(set(results)) == 1
+    assert len(sm_calls) == 1
+
+
+def test_memo_skips_disk_cache(sm_calls: list[dict]) -> None:
+    SetupSelenium.install_driver(Browser.CHROME)
+    driver_cache.clear()
+    SetupSelenium.install_driver(Browser.CHROME)
+
+    assert len(sm_calls) == 1
+
+
+def test_memo_shares_exceptions() -> None:
+    memo = ResolutionMemo()
+    started = threading.Event()
+    calls = []
+
+    def boom() -> tuple[str, str]:
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        msg = "nope"
+        raise ValueError(msg)
+
+    def call() -> BaseException | None:
+        try:
+            memo.get_or_call("key", boom)
+        except ValueError as exc:
+            return exc
+        return None
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first = pool.submit(call)
+        started.wait()
+        rest = [pool.submit(call) for _ in range(3)]
+        errors = [first.result()] + [f.result() for f in rest]
+
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert len(calls) == 1
+
+
+def test_memo_is_bounded(fake_binaries: tuple[str, str]) -> None:
+    memo = ResolutionMemo(maxsize=2)
+    calls = []
+
+    def resolve() -> tuple[str, str]:
+        calls.append(1)
+        return fake_binaries
+
+    memo.get_or_call("a", resolve)
+    memo.get_or_call("b", resolve)
+    memo.get_or_call("a", resolve)
+    memo.get_or_call("c", resolve)  # evicts "b"
+    memo.get_or_call("a", resolve)
+    memo.get_or_call("b", resolve)
+
+    assert len(calls) == 4
+
+
+def test_file_lock_excludes(tmp_path: Path) -> None:
+    path = str(tmp_path / "x.lock")
+    with FileLock(path), pytest.raises(TimeoutError):
+        FileLock(path, timeout=0.1).acquire()
+
+    with FileLock(path, timeout=0.1):
+        pass
+
+
+RESOLVE_SCRIPT = """
+import sys, time
+from setup_selenium.cache import DriverCache
+
+cache_dir, driver, browser, counter = sys.argv[1:]
+
+def resolve():
+    with open(counter, "a") as f:
+        f.write("x")
+    time.sleep(0.2)
+    return driver, browser
+
+print(DriverCache(cache_dir=cache_dir, ttl=60).get_or_resolve("key", resolve))
+"""
+
+
+def test_get_or_resolve_across_processes(
+    tmp_path: Path, fake_binaries: tuple[str, str]
+) -> None:
+    counter = tmp_path / "counter"
+    args = [str(tmp_path / "cache"), *fake_binaries, str(counter)]
+    procs = [
+        subprocess.Popen(  # noqa: S603
+            [sys.executable, "-c", RESOLVE_SCRIPT, *args], stdout=subprocess.PIPE
+        )
+        for _ in range(4)
+    ]
+    outputs = {p.communicate()[0] for p in procs}
+
+    assert all(p.returncode == 0 for p in procs)
+    assert len(outputs) == 1
+    assert counter.read_text() == "x"
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import base64
+import io
+import zipfile
+from typing import TYPE_CHECKING
+
+import pytest
+from fakes import patch_firefox
+from selenium.webdriver.firefox.firefox_profile import FirefoxProfile
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
+from setup_selenium import Browser, SetupSelenium
+from setup_selenium.firefox import (
+    CachedFirefoxProfile,
+    cached_profile,
+    encoded_profiles,
+    profile_digest,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+@pytest.fixture(autouse=True)
+def empty_cache() -> Iterator[None]:
+    encoded_profiles.clear()
+    yield
+    encoded_profiles.clear()
+
+
+def user_js(encoded: str) -> str:
+    with zipfile.ZipFile(io.BytesIO(base64.b64decode(encoded))) as zipped:
+        return zipped.read("user.js").decode("utf-8")
+
+
+def test_encoding_is_cached() -> None:
+    profile = CachedFirefoxProfile()
+    profile.set_preference("app.update.auto", False)
+
+    first = profile.encoded
+    second = profile.encoded
+
+    assert first == second
+    assert 'user_pref("app.update.auto", false);' in user_js(first)
+    assert (encoded_profiles.misses, encoded_profiles.hits) == (1, 1)
+
+
+def test_identical_profiles_share_an_encoding() -> None:
+    profiles = [CachedFirefoxProfile() for _ in range(3)]
+    for profile in profiles:
+        profile.set_preference("network.prefetch-next", False)
+
+    assert len({p.encoded for p in profiles}) == 1
+    assert len(encoded_profiles) == 1
+
+
+def test_changed_contents_are_encoded_again() -> None:
+    profile = CachedFirefoxProfile()
+    before = profile.encoded
+    profile.set_preference("ui.allPointerCapabilities", 6)
+
+    after = profile.encoded
+
+    assert after != before
+    assert "ui.allPointerCapabilities" in user_js(after)
+    assert len(encoded_profiles) == 2
+
+
+def test_digest_covers_names_and_contents(tmp_path: Path) -> None:
+    (tmp_path / "a").write_text("1")
+    first = profile_digest(str(tmp_path))
+    (tmp_path / "a").write_text("2")
+    second = profile_digest(str(tmp_path))
+    (tmp_path / "a").rename(tmp_path / "b")
+
+    assert len({first, second, profile_digest(str(tmp_path))}) == 3
+
+
+def test_cached_profile_shares_the_directory() -> None:
+    profile = FirefoxProfile()
+    profile.set_preference("app.update.enabled", False)
+
+    cached = cached_profile(profile)
+
+    assert isinstance(cached, CachedFirefoxProfile)
+    assert cached.path == profile.path
+    assert cached_profile(cached) is cached
+    assert user_js(cached.encoded) == user_js(profile.encoded)
+
+
+def test_cache_is_bounded() -> None:
+    encoded_profiles.maxsize = 2
+    try:
+        for value in range(3):
+            profile = CachedFirefoxProfile()
+            profile.set_preference("value", value)
+            profile.encoded  # noqa: B018
+    finally:
+        encoded_profiles.maxsize = 8
+
+    assert len(encoded_profiles) == 2
+
+
+def test_sessions_reuse_the_encoding(monkeypatch: pytest.MonkeyPatch) -> None:
+    patch_firefox(monkeypatch)
+    profile = FirefoxProfile()
+    profile.set_preference("browser.startup.page", 0)
+
+    drivers = []
+    for _ in range(3):
+        options = FirefoxOptions()
+        options.profile = profile
+        drivers.append(
+            SetupSelenium.create_driver(
+                Browser.FIREFOX, driver_path="/fake/geckodriver", options=options
+            )
+        )
+
+    assert len({d.encoded for d in drivers}) == 1  # type: ignore[union-attr,attr-defined]
+    assert (encoded_profiles.misses, encoded_profiles.hits) == (1, 2)
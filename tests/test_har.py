@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import gzip
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from setup_selenium import HarBuilder, write_har
+from setup_selenium.har import PageSummary
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+WALL = 1_700_000_000.0
+
+
+def event(method: str, **params: Any) -> dict[str, Any]:
+    """A performance log entry the way chromedriver returns it"""
+    message = {"message": {"method": method, "params": params}, "webview": "ABC"}
+    return {"level": "INFO", "message": json.dumps(message), "timestamp": 0}
+
+
+def timing(start: float, **offsets: float) -> dict[str, float]:
+    base = dict.fromkeys(
+        ("dnsStart", "dnsEnd", "connectStart", "connectEnd", "sslStart", "sslEnd"),
+        -1.0,
+    )
+    return {**base, "requestTime": start, **offsets}
+
+
+def request(
+    request_id: str,
+    url: str,
+    ts: float,
+    loader: str = "L1",
+    resource: str = "Script",
+    **extra: Any,
+) -> dict[str, Any]:
+    return event(
+        "Network.requestWillBeSent",
+        requestId=request_id,
+        loaderId=loader,
+        documentURL=url if resource == "Document" else "https://example.com/",
+        request={"url": url, "method": "GET", "headers": {"Accept": "*/*"}},
+        timestamp=ts,
+        wallTime=WALL + ts,
+        type=resource,
+        frameId="F1",
+        **extra,
+    )
+
+
+def response(request_id: str, ts: float, status: int = 200, **extra: Any) -> dict:
+    return event(
+        "Network.responseReceived",
+        requestId=request_id,
+        timestamp=ts,
+        type="Script",
+        response={
+            "url": "",
+            "status": status,
+            "statusText": "OK",
+            "headers": {"Content-Type": "text/javascript"},
+            "mimeType": "text/javascript",
+            "protocol": "h2",
+            "remoteIPAddress": "93.184.216.34",
+            "encodedDataLength": 100,
+            **extra,
+        },
+    )
+
+
+def finished(request_id: str, ts: float, size: int) -> dict[str, Any]:
+    return event(
+        "Network.loadingFinished",
+        requestId=request_id,
+        timestamp=ts,
+        encodedDataLength=size,
+    )
+
+
+def page_load() -> list[dict[str, Any]]:
+    """A document with two scripts, one of them failing"""
+    return [
+        request("L1", "https://example.com/", 10.0, resource="Document"),
+        response(
+            "L1",
+            10.2,
+            timing=timing(
+                10.01,
+                dnsStart=5,
+                dnsEnd=15,
+                connectStart=15,
+                connectEnd=60,
+                sslStart=30,
+                sslEnd=60,
+                sendStart=60,
+                sendEnd=61,
+                receiveHeadersEnd=161,
+            ),
+        ),
+        event("Network.dataReceived", requestId="L1", dataLength=3000),
+        finished("L1", 10.3, 1600),
+        {"level": "INFO", "message": '{"message":{"method":"Log.entryAdded"}}'},
+        request("2", "https://example.com/app.js?v=3", 10.31),
+        request("3", "https://cdn.example.com/lib.js", 10.32),
+        response(
+            "2",
+            10.5,
+            timing=timing(10.35, sendStart=0, sendEnd=1, receiveHeadersEnd=100),
+        ),
+        finished("2", 10.9, 5100),
+        event(
+            "Network.loadingFailed",
+            requestId="3",
+            timestamp=10.4,
+            errorText="net::ERR_CONNECTION_REFUSED",
+        ),
+        event("Page.loadEventFired", timestamp=11.0),
+    ]
+
+
+def test_entries_finish_in_order() -> None:
+    builder = HarBuilder()
+
+    done = [[e["request"]["url"] for e in builder.feed(le)] for le in page_load()]
+
+    assert [urls for urls in done if urls] == [
+        ["https://example.com/"],
+        ["https://example.com/app.js?v=3"],
+        ["https://cdn.example.com/lib.js"],
+    ]
+    assert builder.pending == 0
+
+
+def test_entry_timings() -> None:
+    entries = HarBuilder().feed_all(page_load())
+
+    document, script, failed = entries
+    assert document["timings"] == {
+        "blocked": 15.0,
+        "dns": 10.0,
+        "connect": 45.0,
+        "ssl": 30.0,
+        "send": 1.0,
+        "wait": 100.0,
+        "receive": 129.0,
+    }
+    assert document["time"] == 300.0
+    assert script["timings"]["blocked"] == 40.0
+    assert script["request"]["queryString"] == [{"name": "v", "value": "3"}]
+    assert failed["_error"] == "net::ERR_CONNECTION_REFUSED"
+    assert failed["response"]["status"] == 0
+
+
+def test_entry_sizes() -> None:
+    document = HarBuilder().feed_all(page_load())[0]
+
+    assert document["response"]["_transferSize"] == 1600
+    assert document["response"]["bodySize"] == 1500
+    assert document["response"]["content"]["size"] == 3000
+    assert document["serverIPAddress"] == "93.184.216.34"
+
+
+def test_page_summary() -> None:
+    builder = HarBuilder(slowest=2)
+    builder.feed_all(page_load())
+
+    (summary,) = builder.summaries
+    assert summary == PageSummary(
+        id="page_1",
+        url="https://example.com/",
+        requests=3,
+        failed=1,
+        bytes=6700,
+        blocked=55.0,
+        duration=900.0,
+        slowest=[
+            ("https://example.com/app.js?v=3", 590.0),
+            ("https://example.com/", 300.0),
+        ],
+    )
+    assert builder.pages[0]["pageTimings"]["onLoad"] == 1000.0
+
+
+def test_navigation_starts_a_new_page() -> None:
+    log = [
+        *page_load(),
+        request("L2", "https://example.com/next", 20.0, "L2", "Document"),
+        finished("L2", 20.1, 900),
+        request("7", "https://example.com/next.js", 20.2, "L2"),
+        finished("7", 20.3, 100),
+    ]
+    builder = HarBuilder()
+
+    entries = builder.feed_all(log)
+
+    assert [e["pageref"] for e in entries] == [
+        "page_1",
+        "page_1",
+        "page_1",
+        "page_2",
+        "page_2",
+    ]
+    assert [s.requests for s in builder.summaries] == [3, 2]
+    assert builder.summaries[1].bytes == 1000
+
+
+def test_redirect_becomes_its_own_entry() -> None:
+    log = [
+        request("L1", "http://example.com/", 1.0, resource="Document"),
+        request(
+            "L1",
+            "https://example.com/",
+            1.1,
+            resource="Document",
+            redirectResponse={"status": 301, "statusText": "Moved", "headers": {}},
+        ),
+        finished("L1", 1.2, 500),
+    ]
+    builder = HarBuilder()
+
+    entries = builder.feed_all(log)
+
+    assert [e["response"]["status"] for e in entries] == [301, 0]
+    assert entries[0]["response"]["redirectURL"] == "https://example.com/"
+    assert len(builder.pages) == 1
+
+
+def test_unfinished_requests_are_pending() -> None:
+    builder = HarBuilder()
+
+    entries = builder.feed_all([*page_load()[:4], request("9", "wss://x/", 10.5)])
+
+    assert len(entries) == 1
+    assert builder.pending == 1
+
+
+@pytest.mark.parametrize("name", ["run.har", "run.har.gz"])
+def test_write_har(tmp_path: Path, name: str) -> None:
+    path = tmp_path / name
+
+    summaries = write_har(iter(page_load()), str(path))
+
+    opener: Any = gzip.open if name.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        har = json.load(f)
+    assert har["log"]["version"] == "1.2"
+    assert har["log"]["creator"]["name"] == "setup-selenium-testing"
+    assert len(har["log"]["entries"]) == 3
+    assert [p["id"] for p in har["log"]["pages"]] == ["page_1"]
+    assert summaries[0].requests == 3
+
+
+def test_write_har_without_network_events(tmp_path: Path) -> None:
+    path = tmp_path / "empty.har"
+
+    write_har([], str(path))
+
+    har = json.loads(path.read_text())
+    assert har["log"]["entries"] == []
+    assert har["log"]["pages"] == []
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import re
+import subprocess
+from typing import TYPE_CHECKING
+
+import pytest
+from fakes import StubRemote, patch_chrome
+from selenium.webdriver.common.selenium_manager import SeleniumManager
+
+from setup_selenium import HEADLESS_SHELL, Browser, DriverSpec, SetupSelenium
+from setup_selenium.cache import driver_cache, resolution_memo
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+def accepted_browsers() -> set[str]:
+    """Browser names the installed selenium-manager accepts"""
+    binary = str(SeleniumManager()._get_binary())
+    try:
+        help_text = subprocess.run(  # noqa: S603
+            [binary, "--help"], capture_output=True, text=True, timeout=30, check=True
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        pytest.skip("selenium-manager does not run here")
+    match = re.search(r"Browser name \(([^)]*)\)", help_text)
+    assert match is not None
+    return set(re.findall(r"[\w-]+", match.group(1))) - {"or"}
+
+
+@pytest.fixture
+def shell(tmp_path: Path) -> str:
+    path = tmp_path / "chrome-headless-shell"
+    path.write_text("")
+    return str(path)
+
+
+@pytest.fixture
+def sm_args(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, shell: str
+) -> Iterator[list[list]]:
+    """Record Selenium Manager runs, resolving to files in a temp dir"""
+    runs: list[list] = []
+    driver = tmp_path / "chromedriver"
+    driver.write_text("")
+
+    def fake_run(_: SeleniumManager, args: list) -> dict[str, str]:
+        runs.append(args)
+        browser_path = shell if "--browser-path" in args else str(tmp_path / "chrome")
+        return {"driver_path": str(driver), "browser_path": browser_path}
+
+    monkeypatch.setattr(driver_cache, "cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setattr(SeleniumManager, "_run", fake_run)
+    monkeypatch.setattr(SeleniumManager, "_get_binary", lambda _: "selenium-manager")
+    resolution_memo.clear()
+    yield runs
+    resolution_memo.clear()
+
+
+@pytest.fixture
+def fake_chrome(monkeypatch: pytest.MonkeyPatch) -> None:
+    patch_chrome(monkeypatch)
+
+
+def test_install_driver_resolves_the_shell_driver(
+    sm_args: list[list], shell: str
+) -> None:
+    driver_path, browser_path = SetupSelenium.install_driver(
+        Browser.CHROME, browser_path=shell, headless_shell=True
+    )
+    SetupSelenium.install_driver(
+        Browser.CHROME, browser_path=shell, headless_shell=True
+    )
+    SetupSelenium.install_driver(Browser.CHROME)
+
+    assert browser_path == shell
+    assert [args[1:] for args in sm_args] == [
+        ["--browser", "chrome", "--browser-path", shell, "--output", "json"],
+        ["--browser", "chrome", "--output", "json"],
+    ]
+
+
+def test_selenium_manager_knows_every_browser_asked_for(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, shell: str
+) -> None:
+    names = accepted_browsers()
+    asked: list[str] = []
+
+    def fake_run(_: SeleniumManager, args: list) -> dict[str, str]:
+        asked.append(args[args.index("--browser") + 1])
+        return {"driver_path": str(tmp_path / "driver"), "browser_path": shell}
+
+    monkeypatch.setattr(SeleniumManager, "_run", fake_run)
+    monkeypatch.delenv("SE_DRIVER_MIRROR_URL", raising=False)
+    for browser in Browser:
+        SetupSelenium.install_driver(browser, use_cache=False)
+    SetupSelenium.install_driver(
+        Browser.CHROME, browser_path=shell, headless_shell=True, use_cache=False
+    )
+
+    assert len(asked) == len(Browser) + 1
+    assert set(asked) <= names
+
+
+def test_selenium_manager_cannot_install_the_shell(sm_args: list[list]) -> None:
+    with pytest.raises(ValueError, match="needs a browser_path"):
+        SetupSelenium.install_driver(Browser.CHROME, headless_shell=True)
+    with pytest.raises(ValueError, match="needs a binary"):
+        SetupSelenium.create_driver(Browser.CHROME, headless=HEADLESS_SHELL)
+    with pytest.raises(ValueError, match="needs a browser_path"):
+        SetupSelenium(Browser.CHROME, headless=HEADLESS_SHELL)
+    assert sm_args == []
+
+
+def test_only_chrome_has_a_shell() -> None:
+    with pytest.raises(ValueError, match="firefox has no headless shell"):
+        SetupSelenium.install_driver(
+            Browser.FIREFOX, browser_path="/opt/firefox", headless_shell=True
+        )
+    with pytest.raises(ValueError, match="edge has no headless shell"):
+        SetupSelenium.create_driver(
+            Browser.EDGE, headless=HEADLESS_SHELL, driver_path="/fake/msedgedriver"
+        )
+
+
+def test_unknown_headless_mode() -> None:
+    options = SetupSelenium.chrome_options()
+    with pytest.raises(ValueError, match="Unknown headless mode: old"):
+        SetupSelenium.apply_presets(Browser.CHROME, options, headless="old")
+
+
+@pytest.mark.usefixtures("fake_chrome")
+def test_create_driver_launches_the_shell(sm_args: list[list], shell: str) -> None:
+    driver = SetupSelenium.create_driver(
+        Browser.CHROME, headless=HEADLESS_SHELL, binary=shell
+    )
+
+    assert driver.options.binary_location == shell  # type: ignore[union-attr,attr-defined]
+    assert driver.service.kwargs["executable_path"].endswith("chromedriver")  # type: ignore[union-attr,attr-defined]
+    arguments = driver.options.arguments  # type: ignore[union-attr,attr-defined]
+    assert "--headless" in arguments
+    assert "--headless=new" not in arguments
+    assert len(sm_args) == 1
+
+
+@pytest.mark.usefixtures("fake_chrome")
+def test_given_binary_is_not_resolved(sm_args: list[list]) -> None:
+    driver = SetupSelenium.create_driver(
+        Browser.CHROME,
+        headless=HEADLESS_SHELL,
+        driver_path="/fake/chromedriver",
+        binary="/opt/chrome-headless-shell",
+    )
+
+    assert driver.options.binary_location == "/opt/chrome-headless-shell"  # type: ignore[union-attr,attr-defined]
+    assert sm_args == []
+
+
+def test_batch_resolves_the_shell_separately() -> None:
+    shell = DriverSpec(Browser.CHROME, headless=HEADLESS_SHELL)
+    chrome = DriverSpec(Browser.CHROME, headless=True)
+
+    assert shell.install_key() != chrome.install_key()
+
+
+def test_remote_shell_is_refused() -> None:
+    with StubRemote() as grid, pytest.raises(ValueError, match="local chrome"):
+        SetupSelenium.create_driver(
+            Browser.CHROME, headless=HEADLESS_SHELL, remote=grid.url
+        )
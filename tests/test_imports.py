@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+
+from setup_selenium import setup_selenium as sel_module
+
+BROWSER_MODULES = (
+    "selenium.webdriver.chrome",
+    "selenium.webdriver.edge",
+    "selenium.webdriver.firefox",
+)
+
+
+def loaded_after(code: str) -> list[str]:
+    script = (
+        f"import sys, json\n{code}\n"
+        f"print(json.dumps([m for m in sys.modules if m.startswith({BROWSER_MODULES!r})]))"
+    )
+    out = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout)
+
+
+def test_import_loads_no_browser_modules() -> None:
+    assert loaded_after("import setup_selenium") == []
+
+
+def test_options_load_only_their_browser() -> None:
+    loaded = loaded_after(
+        "from setup_selenium import SetupSelenium\nSetupSelenium.firefox_options()"
+    )
+    assert loaded
+    assert all(m.startswith("selenium.webdriver.firefox") for m in loaded)
+
+
+def test_lazy_names_still_importable() -> None:
+    assert sel_module.ChromeOptions is ChromeOptions
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import base64
+import json
+import shutil
+import socket
+import subprocess
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from fakes import ChromiumDriver, FakeChrome, StubRemote, patch_chrome, patch_firefox
+from selenium.webdriver.common.proxy import Proxy
+
+from setup_selenium import Browser, LeanConfig, LogDrainer, SetupSelenium
+from setup_selenium.lean import DEFAULT_LEAN, LeanMode, transfer_sizes
+from setup_selenium.logs import read_log
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+ANALYTICS = "https://www.google-analytics.com/analytics.js"
+VIDEO = "https://cdn.example.com/intro.mp4?t=3"
+APP = "https://example.com/app.js"
+
+
+def perf(method: str, **params: Any) -> dict[str, Any]:
+    message = {"message": {"method": method, "params": params}}
+    return {"level": "INFO", "message": json.dumps(message), "timestamp": 0}
+
+
+def load(request_id: str, url: str, blocked: bool) -> list[dict[str, Any]]:
+    """Performance log entries of one request, blocked by devtools or not"""
+    sent = perf(
+        "Network.requestWillBeSent",
+        requestId=request_id,
+        loaderId="L1",
+        request={"url": url, "method": "GET"},
+        timestamp=1.0,
+        wallTime=1.0,
+        type="Script",
+    )
+    if blocked:
+        return [
+            sent,
+            perf(
+                "Network.loadingFailed",
+                requestId=request_id,
+                timestamp=1.1,
+                errorText="net::ERR_BLOCKED_BY_CLIENT",
+                blockedReason="inspector",
+            ),
+        ]
+    return [
+        sent,
+        perf(
+            "Network.loadingFinished",
+            requestId=request_id,
+            timestamp=1.2,
+            encodedDataLength=5000,
+        ),
+    ]
+
+
+def test_patterns_include_resource_types() -> None:
+    config = LeanConfig(url_patterns=("*ads.example.com/*",), resource_types=("font",))
+
+    assert config.patterns[0] == "*ads.example.com/*"
+    assert "*.woff2" in config.patterns
+    assert "*.woff2?*" in config.patterns
+    assert config.rule_for("https://example.com/f.woff2?v=1") == "*.woff2?*"
+    assert config.rule_for(APP) == ""
+    # "?" is no wildcard
+    assert config.rule_for("https://example.com/f.woffx") == ""
+
+
+def test_unknown_resource_type() -> None:
+    with pytest.raises(ValueError, match="Unknown resource types: script"):
+        LeanConfig(resource_types=("script",))
+
+
+def test_default_config() -> None:
+    assert DEFAULT_LEAN.rule_for(ANALYTICS) == "*google-analytics.com/*"
+    assert DEFAULT_LEAN.rule_for(VIDEO) == "*.mp4?*"
+    assert DEFAULT_LEAN.rule_for(APP) == ""
+
+
+def test_chromium_blocks_through_devtools() -> None:
+    driver = ChromiumDriver()
+
+    LeanMode(DEFAULT_LEAN, Browser.CHROME).attach(driver)  # type: ignore[arg-type]
+
+    assert driver.cdp == [
+        ("Network.enable", {}),
+        ("Network.setBlockedURLs", {"urls": list(DEFAULT_LEAN.patterns)}),
+    ]
+    assert driver.lean.chromium  # type: ignore[attr-defined]
+
+
+COUNTING = LeanConfig(
+    url_patterns=DEFAULT_LEAN.url_patterns,
+    resource_types=DEFAULT_LEAN.resource_types,
+    count=True,
+)
+
+
+def test_chromium_report(tmp_path: Path) -> None:
+    driver = ChromiumDriver()
+    drainer = LogDrainer(driver, str(tmp_path), log_types=["performance"])  # type: ignore[arg-type]
+    drainer.attach()
+    lean = LeanMode(COUNTING, Browser.EDGE).attach(driver)  # type: ignore[arg-type]
+    driver.buffers["performance"] = [
+        *load("1", ANALYTICS, blocked=True),
+        *load("2", APP, blocked=False),
+        *load("3", VIDEO, blocked=True),
+        *load("4", ANALYTICS, blocked=True),
+    ]
+    baseline = transfer_sizes(load("9", ANALYTICS, blocked=False))
+    drainer.drain()
+
+    report = lean.report(baseline)
+
+    assert report.requests == 3
+    assert report.bytes == 10000
+    assert report.unknown_size == 1
+    assert report.by_rule == {"*google-analytics.com/*": 2, "*.mp4?*": 1}
+    assert lean.report(baseline).requests == 3
+    driver.quit()
+    # every entry still made it into the log file
+    assert len(list(read_log(drainer.paths["performance"]))) == 8
+
+
+def test_report_leaves_the_log_alone() -> None:
+    driver = ChromiumDriver()
+    lean = LeanMode(COUNTING, Browser.CHROME).attach(driver)  # type: ignore[arg-type]
+    driver.buffers["performance"] = load("1", ANALYTICS, blocked=True)
+
+    assert lean.report().requests == 0
+    assert len(driver.buffers["performance"]) == 2
+
+
+def test_chrome_logs_performance_only_to_count(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    patch_chrome(monkeypatch)
+
+    driver = SetupSelenium.create_driver(
+        Browser.CHROME, driver_path="/fake/chromedriver", lean=DEFAULT_LEAN
+    )
+    counting = SetupSelenium.create_driver(
+        Browser.CHROME,
+        driver_path="/fake/chromedriver",
+        lean=COUNTING,
+        log_dir=str(tmp_path),
+        log_drain_interval=60,
+    )
+
+    assert "perfLoggingPrefs" not in driver.options.experimental_options  # type: ignore[union-attr,attr-defined]
+    assert not hasattr(driver, "log_drainer")
+    assert "perfLoggingPrefs" in counting.options.experimental_options  # type: ignore[union-attr,attr-defined]
+    assert counting.log_drainer.listeners  # type: ignore[union-attr,attr-defined]
+
+
+def test_driver_is_quit_when_blocking_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    patch_chrome(monkeypatch)
+    launched: list[FakeChrome] = []
+
+    def failing_cdp(self: FakeChrome, *_: Any) -> None:
+        launched.append(self)
+        msg = "devtools went away"
+        raise RuntimeError(msg)
+
+    monkeypatch.setattr(FakeChrome, "execute_cdp_cmd", failing_cdp)
+
+    with pytest.raises(RuntimeError, match="devtools went away"):
+        SetupSelenium.create_driver(
+            Browser.CHROME, driver_path="/fake/chromedriver", lean=DEFAULT_LEAN
+        )
+    assert launched[0].quit_called
+
+
+def test_counting_needs_a_drainer(monkeypatch: pytest.MonkeyPatch) -> None:
+    patch_chrome(monkeypatch)
+
+    with pytest.raises(ValueError, match="needs a log_drain_interval"):
+        SetupSelenium.create_driver(
+            Browser.CHROME, driver_path="/fake/chromedriver", lean=COUNTING
+        )
+    with StubRemote() as grid, pytest.raises(ValueError, match="local driver"):
+        SetupSelenium.create_driver(Browser.CHROME, remote=grid.url, lean=COUNTING)
+    assert grid.sessions == []
+
+
+def request_through(proxy: str, request: bytes) -> bytes:
+    host, port = proxy.split(":")
+    with socket.create_connection((host, int(port)), timeout=5) as conn:
+        conn.sendall(request)
+        return conn.recv(1024)
+
+
+def test_firefox_proxy_counts_blocked_requests() -> None:
+    lean = LeanMode(DEFAULT_LEAN, Browser.FIREFOX)
+    prefs = lean.firefox_preferences()
+    proxy = lean._proxy.address  # type: ignore[union-attr]
+    try:
+        reply = request_through(
+            proxy, f"GET {VIDEO} HTTP/1.1\r\nHost: cdn.example.com\r\n\r\n".encode()
+        )
+        request_through(proxy, b"CONNECT www.google-analytics.com:443 HTTP/1.1\r\n\r\n")
+    finally:
+        lean.stop()
+
+    assert reply.startswith(b"HTTP/1.1 403")
+    assert prefs["network.proxy.type"] == 2
+    assert lean.blocked == {VIDEO: 1, "https://www.google-analytics.com/": 1}
+    report = lean.report()
+    assert report.requests == 2
+    assert report.by_rule == {"*.mp4?*": 1, "*google-analytics.com/*": 1}
+
+
+PAC_HARNESS = """
+eval(%s);
+console.log(JSON.stringify(%s.map((url) => FindProxyForURL(url, ""))));
+"""
+
+
+def test_pac_script_routes_blocked_urls() -> None:
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node is not installed")
+    # "*.gif?*" would block gifts.example.com if "?" was a wildcard
+    config = LeanConfig(DEFAULT_LEAN.url_patterns, resource_types=("image", "media"))
+    lean = LeanMode(config, Browser.FIREFOX)
+    prefs = lean.firefox_preferences()
+    lean.stop()
+    encoded = prefs["network.proxy.autoconfig_url"].split("base64,", 1)[1]
+    pac = base64.b64decode(encoded).decode("utf-8")
+
+    urls = [ANALYTICS, VIDEO, APP, "https://gifts.example.com/"]
+    script = PAC_HARNESS % (json.dumps(pac), json.dumps(urls))
+    out = subprocess.run(  # noqa: S603
+        [node, "-e", script], capture_output=True, text=True, check=True
+    )
+
+    blocked, video, app, gifts = json.loads(out.stdout)
+    assert blocked == video
+    assert blocked.startswith("PROXY 127.0.0.1:")
+    assert app == gifts == "DIRECT"
+
+
+def test_firefox_gets_lean_preferences(monkeypatch: pytest.MonkeyPatch) -> None:
+    patch_firefox(monkeypatch)
+
+    driver = SetupSelenium.create_driver(
+        Browser.FIREFOX, driver_path="/fake/geckodriver", lean=DEFAULT_LEAN
+    )
+    lean = driver.lean  # type: ignore[union-attr,attr-defined]
+    prefs = driver.options.preferences  # type: ignore[union-attr,attr-defined]
+    assert prefs["network.proxy.autoconfig_url.include_path"] is True
+    assert lean._proxy is not None
+    driver.quit()
+
+    assert lean._proxy is None
+
+
+def test_firefox_proxy_is_not_replaced(monkeypatch: pytest.MonkeyPatch) -> None:
+    patch_firefox(monkeypatch)
+    started: list[LeanMode] = []
+    monkeypatch.setattr(LeanMode, "firefox_preferences", started.append)
+    corporate = SetupSelenium.firefox_options()
+    corporate.proxy = Proxy({"proxyType": "manual", "httpProxy": "proxy:3128"})
+    system = SetupSelenium.firefox_options()
+    system.set_preference("network.proxy.type", 5)
+
+    for options in (corporate, system):
+        with pytest.raises(ValueError, match="replaces the firefox proxy"):
+            SetupSelenium.create_driver(
+                Browser.FIREFOX,
+                driver_path="/fake/geckodriver",
+                options=options,
+                lean=DEFAULT_LEAN,
+            )
+
+    assert started == []
+
+
+def test_remote_chrome_lean() -> None:
+    with StubRemote() as grid:
+        driver = SetupSelenium.create_driver(
+            Browser.CHROME, remote=grid.url, lean=DEFAULT_LEAN
+        )
+        driver.quit()
+
+    cmds = [body.get("cmd") for _, path, body in grid.requests if "cdp" in path]
+    assert cmds == ["Network.enable", "Network.setBlockedURLs"]
+
+
+def test_remote_firefox_lean_is_refused() -> None:
+    with pytest.raises(ValueError, match="local firefox"):
+        SetupSelenium.create_driver(
+            Browser.FIREFOX, remote="http://grid:4444", lean=DEFAULT_LEAN
+        )
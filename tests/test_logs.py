@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import gzip
+import os
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+from fakes import ChromiumDriver, patch_chrome
+
+from setup_selenium import Browser, LogDrainer, SetupSelenium
+from setup_selenium.logs import read_log
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_drain_writes_jsonl(tmp_path: Path) -> None:
+    driver = ChromiumDriver()
+    drainer = LogDrainer(driver, str(tmp_path))  # type: ignore[arg-type]
+    driver.emit("performance", 3)
+    driver.emit("browser", 1)
+
+    assert drainer.drain() == 4
+    assert drainer.drain() == 0
+    driver.emit("performance", 2)
+    drainer.stop()
+
+    perf = list(read_log(drainer.paths["performance"]))
+    assert [e["message"] for e in perf] == [f"performance {i}" for i in range(5)]
+    assert drainer.counts == {"performance": 5, "browser": 1}
+    assert os.path.basename(drainer.paths["browser"]) == (
+        "session-abc123.browser.jsonl.gz"
+    )
+
+
+def test_files_are_readable_while_written(tmp_path: Path) -> None:
+    driver = ChromiumDriver()
+    drainer = LogDrainer(driver, str(tmp_path), log_types=["performance"])  # type: ignore[arg-type]
+    driver.emit("performance", 10)
+    drainer.drain()
+
+    # the gzip member is not finished yet, but every flushed entry is there
+    assert len(list(read_log(drainer.paths["performance"]))) == 10
+    with pytest.raises(EOFError), gzip.open(drainer.paths["performance"]) as f:
+        f.read()
+    drainer.stop()
+    assert len(list(read_log(drainer.paths["performance"]))) == 10
+
+
+def test_background_draining(tmp_path: Path) -> None:
+    driver = ChromiumDriver()
+    with LogDrainer(driver, str(tmp_path), interval=0.01) as drainer:  # type: ignore[arg-type]
+        for _ in range(5):
+            driver.emit("performance", 100)
+            time.sleep(0.02)
+        # memory stays bounded: the driver buffer is emptied as we go
+        assert len(driver.buffers["performance"]) <= 100
+
+    assert drainer.counts["performance"] == 500
+
+
+def test_attach_drains_before_quit(tmp_path: Path) -> None:
+    driver = ChromiumDriver()
+    drainer = LogDrainer(driver, str(tmp_path), interval=60).attach()  # type: ignore[arg-type]
+    driver.emit("browser", 2)
+    driver.quit()
+
+    assert driver.quit_called
+    assert drainer.counts["browser"] == 2
+
+
+def test_stops_when_session_is_gone(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    driver = ChromiumDriver()
+    drainer = LogDrainer(driver, str(tmp_path), interval=0.01).start()  # type: ignore[arg-type]
+    driver.quit_called = True
+    assert drainer._thread is not None
+    drainer._thread.join(timeout=5)
+
+    assert not drainer._thread.is_alive()
+    assert "the session is gone" in caplog.text
+    drainer.stop()
+
+
+def test_invalid_interval() -> None:
+    with pytest.raises(ValueError, match="interval"):
+        LogDrainer(ChromiumDriver(), interval=0)  # type: ignore[arg-type]
+
+
+def test_chrome_attaches_drainer(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    patch_chrome(monkeypatch)
+    driver = SetupSelenium.create_driver(
+        Browser.CHROME,
+        driver_path="/fake/chromedriver",
+        enable_log_performance=True,
+        log_dir=str(tmp_path),
+        log_drain_interval=60,
+    )
+    drainer = driver.log_drainer  # type: ignore[union-attr,attr-defined]
+    assert drainer.log_types == ("performance",)
+    driver.emit("performance", 3)  # type: ignore[union-attr,attr-defined]
+    driver.quit()
+
+    assert drainer.counts["performance"] == 3
+
+
+def test_chrome_without_interval(monkeypatch: pytest.MonkeyPatch) -> None:
+    patch_chrome(monkeypatch)
+    driver = SetupSelenium.create_driver(
+        Browser.CHROME, driver_path="/fake/chromedriver", enable_log_performance=True
+    )
+
+    assert not hasattr(driver, "log_drainer")
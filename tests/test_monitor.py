@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from fakes import BUSY, FakeChrome, ProcessDriver, StubRemote, patch_chrome
+
+from setup_selenium import (
+    Browser,
+    ResourceMonitor,
+    SetupSelenium,
+    proc,
+    set_resource_hook,
+)
+from setup_selenium.monitor import ResourceSample, ResourceSummary
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+pytestmark = pytest.mark.skipif(
+    not os.path.isdir("/proc"), reason="needs /proc (linux)"
+)
+
+
+@pytest.fixture
+def driver() -> Iterator[ProcessDriver]:
+    # a busy "browser", killed with its driver
+    driver = ProcessDriver(BUSY, kill=True)
+    yield driver
+    driver.close()
+
+
+@pytest.fixture
+def hooked() -> Iterator[list[ResourceSummary]]:
+    summaries: list[ResourceSummary] = []
+    set_resource_hook(summaries.append)
+    yield summaries
+    set_resource_hook(None)
+
+
+def test_samples_the_process_tree(driver: ProcessDriver) -> None:
+    monitor = ResourceMonitor(driver, interval=0.05)  # type: ignore[arg-type]
+
+    # until the "browser" runs; cpu is only measured between two samples
+    while monitor.sample().processes < 2:  # type: ignore[union-attr]
+        time.sleep(0.01)
+    time.sleep(0.5)
+    sample = monitor.sample()
+
+    assert sample is not None
+    assert sample.processes == 2
+    assert sample.cpu > 20
+    assert sample.rss > 0
+    assert sample.threads >= 2
+    assert sample.fds >= 3
+
+
+def test_summary_on_quit(
+    driver: ProcessDriver,
+    hooked: list[ResourceSummary],
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    monitor = ResourceMonitor(driver, interval=0.05).attach()  # type: ignore[arg-type]
+    time.sleep(0.3)
+    with caplog.at_level(logging.INFO, logger="sel"):
+        driver.quit()
+
+    assert driver.resources is monitor  # type: ignore[attr-defined]
+    assert driver.process.returncode == 0
+    (summary,) = hooked
+    assert len(summary.samples) >= 3
+    assert summary.peak["processes"] == 2
+    assert summary.as_dict()["timeline"][0]["time"] == 0.0  # type: ignore[index]
+    assert "session-abc123: " in caplog.text
+    # stopping again reports nothing new
+    assert monitor.stop() is summary
+    assert len(hooked) == 1
+
+
+def test_callback_replaces_the_hook(
+    driver: ProcessDriver, hooked: list[ResourceSummary]
+) -> None:
+    received: list[ResourceSummary] = []
+    with ResourceMonitor(driver, interval=0.05, callback=received.append):  # type: ignore[arg-type]
+        pass
+
+    assert len(received) == 1
+    assert hooked == []
+
+
+def test_sampling_ends_with_the_process(driver: ProcessDriver) -> None:
+    monitor = ResourceMonitor(driver, interval=0.05)  # type: ignore[arg-type]
+    driver.quit()
+
+    assert monitor.sample() is None
+    assert monitor.stop().describe() == "session-abc123: no resource samples"
+
+
+def test_summary_statistics() -> None:
+    summary = ResourceSummary(
+        "s",
+        [
+            ResourceSample(0.0, 2, 0.0, 100, 10, 20),
+            ResourceSample(1.0, 3, 50.0, 300, 12, 24),
+            ResourceSample(2.0, 3, 100.0, 200, 14, 22),
+        ],
+    )
+
+    assert summary.peak == {
+        "processes": 3,
+        "cpu": 100.0,
+        "rss": 300,
+        "threads": 14,
+        "fds": 24,
+    }
+    assert summary.mean["cpu"] == 50.0
+    assert summary.rss_growth == 100
+    assert "timeline" not in summary.as_dict(timeline=False)
+
+
+def test_invalid_interval(driver: ProcessDriver) -> None:
+    with pytest.raises(ValueError, match="interval must be positive"):
+        ResourceMonitor(driver, interval=0)  # type: ignore[arg-type]
+
+
+def test_remote_drivers_cannot_be_monitored() -> None:
+    with StubRemote() as grid, pytest.raises(ValueError, match="local driver"):
+        SetupSelenium.create_driver(
+            Browser.CHROME, remote=grid.url, monitor_interval=1.0
+        )
+
+
+def test_monitoring_needs_proc_before_launch(monkeypatch: pytest.MonkeyPatch) -> None:
+    launched: list[Any] = []
+    monkeypatch.setattr(SetupSelenium, "chrome", staticmethod(launched.append))
+    monkeypatch.setattr(proc, "PROC", "/nonexistent")
+
+    with pytest.raises(RuntimeError, match="needs /nonexistent"):
+        SetupSelenium.create_driver(Browser.CHROME, monitor_interval=1.0)
+    assert launched == []
+
+
+def test_driver_is_quit_when_attaching_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    patch_chrome(monkeypatch)
+    monitored: list[FakeChrome] = []
+    init = ResourceMonitor.__init__
+
+    def recording_init(
+        self: ResourceMonitor, driver: FakeChrome, **kwargs: float
+    ) -> None:
+        monitored.append(driver)
+        init(self, driver, **kwargs)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(ResourceMonitor, "__init__", recording_init)
+
+    # a fake chrome has no driver process to monitor
+    with pytest.raises(ValueError, match="no local driver process"):
+        SetupSelenium.create_driver(
+            Browser.CHROME, driver_path="/fake/chromedriver", monitor_interval=1.0
+        )
+    assert monitored[0].quit_called
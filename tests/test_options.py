@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+from fakes import patch_drivers
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
+from setup_selenium import (
+    Browser,
+    DriverPool,
+    DriverSpec,
+    OptionsTemplate,
+    SetupSelenium,
+    create_drivers,
+)
+from setup_selenium.options import (
+    CHROMIUM_ARGUMENTS,
+    HTTPS_FIRST_ARGUMENT,
+    LowMemory,
+    merge_feature_flags,
+)
+
+
+def test_chromium_templates_share_arguments() -> None:
+    chrome = SetupSelenium.options_template(Browser.CHROME)
+    edge = SetupSelenium.options_template(Browser.EDGE)
+
+    assert chrome.arguments[: len(CHROMIUM_ARGUMENTS)] == CHROMIUM_ARGUMENTS
+    assert edge.arguments == (*CHROMIUM_ARGUMENTS, HTTPS_FIRST_ARGUMENT)
+    assert chrome.arguments[-2:] == ("--disable-gpu", HTTPS_FIRST_ARGUMENT)
+
+
+def test_build_returns_independent_options() -> None:
+    first = SetupSelenium.chrome_options()
+    first.add_argument("--headless")
+    first.experimental_options["prefs"]["extra"] = True
+    second = SetupSelenium.chrome_options()
+
+    assert isinstance(second, ChromeOptions)
+    assert "--headless" not in second.arguments
+    assert second.experimental_options["prefs"] == {"autofill.profile_enabled": False}
+
+
+def test_firefox_template() -> None:
+    options = SetupSelenium.firefox_options()
+
+    assert isinstance(options, FirefoxOptions)
+    assert options.preferences["network.prefetch-next"] is False
+    assert options.to_capabilities()["unhandledPromptBehavior"] == "ignore"
+
+
+def test_templates_are_immutable() -> None:
+    template = SetupSelenium.options_template(Browser.CHROME)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        template.arguments = ()  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        template.experimental_options["prefs"]["extra"] = True  # type: ignore[index]
+
+
+def test_derive() -> None:
+    base = SetupSelenium.options_template(Browser.CHROME)
+    derived = base.derive(
+        arguments=["--window-size=1920,1080", "--mute-audio"],
+        remove_arguments=["--disable-gpu", "--disable-features"],
+        experimental_options={"excludeSwitches": ["enable-automation"]},
+    )
+
+    assert derived.arguments[-1] == "--window-size=1920,1080"
+    assert derived.arguments.count("--mute-audio") == 1
+    assert "--disable-gpu" not in derived.arguments
+    assert HTTPS_FIRST_ARGUMENT not in derived.arguments
+    assert set(derived.experimental_options) == {"prefs", "excludeSwitches"}
+    # the original is untouched
+    assert "--disable-gpu" in base.arguments
+    built = derived.build()
+    assert isinstance(built, ChromeOptions)
+    assert built.experimental_options["excludeSwitches"] == ["enable-automation"]
+
+
+def test_invalid_templates() -> None:
+    with pytest.raises(ValueError, match="Unknown browser"):
+        OptionsTemplate(browser="opera")
+    with pytest.raises(ValueError, match="preferences"):
+        OptionsTemplate(browser="chrome", preferences={"a": 1})
+    with pytest.raises(ValueError, match="experimental"):
+        OptionsTemplate(browser="firefox", experimental_options={"a": 1})
+
+
+def test_pool_builds_template_per_driver(monkeypatch: pytest.MonkeyPatch) -> None:
+    patch_drivers(monkeypatch)
+    template = SetupSelenium.options_template(Browser.CHROME)
+    with DriverPool(min_size=0, max_size=2, options=template) as pool:
+        first = pool.acquire(timeout=5)
+        second = pool.acquire(timeout=5)
+        assert isinstance(first.options, ChromeOptions)  # type: ignore[union-attr,attr-defined]
+        assert first.options is not second.options  # type: ignore[union-attr,attr-defined]
+        pool.release(first)
+        pool.release(second)
+
+
+def test_batch_builds_template_per_driver(monkeypatch: pytest.MonkeyPatch) -> None:
+    patch_drivers(monkeypatch)
+    template = SetupSelenium.options_template(Browser.CHROME)
+    result = create_drivers([DriverSpec(options=template)] * 2)
+
+    first, second = result.drivers
+    assert isinstance(first.options, ChromeOptions)  # type: ignore[union-attr]
+    assert first.options is not second.options  # type: ignore[union-attr]
+
+
+def test_feature_flags_are_merged() -> None:
+    template = SetupSelenium.options_template(Browser.EDGE).derive(
+        arguments=["--disable-features=Translate,HttpsFirstBalancedModeAutoEnable"]
+    )
+
+    flags = [a for a in template.arguments if a.startswith("--disable-features")]
+    assert flags == ["--disable-features=HttpsFirstBalancedModeAutoEnable,Translate"]
+    assert merge_feature_flags(
+        ["--enable-features=A", "--x", "--enable-features=B"]
+    ) == [
+        "--enable-features=A,B",
+        "--x",
+    ]
+
+
+def test_low_memory_preset() -> None:
+    template = SetupSelenium.options_template(Browser.CHROME, low_memory=True)
+    options = template.build()
+    SetupSelenium.apply_presets(Browser.CHROME, options, headless=True)
+
+    disabled = [a for a in options.arguments if a.startswith("--disable-features")]
+    assert len(disabled) == 1
+    assert "IsolateOrigins" in disabled[0]
+    # a switch, not a feature, and the back/forward cache has its own flag
+    assert "site-per-process" not in disabled[0]
+    assert "BackForwardCache" not in disabled[0]
+    assert "--process-per-site" in options.arguments
+    assert "--disable-site-isolation-trials" in options.arguments
+    assert HTTPS_FIRST_ARGUMENT.split("=")[1] in disabled[0]
+    assert "--renderer-process-limit=2" in options.arguments
+    assert "--disable-background-networking" in options.arguments
+    assert options.arguments[-1] == "--headless=new"
+
+
+def test_custom_low_memory_preset() -> None:
+    preset = LowMemory(
+        renderer_process_limit=None,
+        site_isolation=True,
+        cache_dir="/mnt/ramdisk/cache",
+        background_networking=True,
+    )
+    arguments = SetupSelenium.options_template(
+        Browser.EDGE, low_memory=preset
+    ).arguments
+
+    assert "--disk-cache-dir=/mnt/ramdisk/cache" in arguments
+    assert not any(a.startswith("--renderer-process-limit") for a in arguments)
+    assert "--disable-site-isolation-trials" not in arguments
+    assert "--disable-background-networking" not in arguments
+    assert "--process-per-site" not in arguments
+    assert "IsolateOrigins" not in " ".join(arguments)
+
+
+def test_invalid_low_memory_presets() -> None:
+    with pytest.raises(ValueError, match="only available for chrome and edge"):
+        SetupSelenium.options_template(Browser.FIREFOX, low_memory=True)
+    with pytest.raises(ValueError, match="renderer_process_limit"):
+        LowMemory(renderer_process_limit=0)
+    with pytest.raises(ValueError, match="cache sizes"):
+        LowMemory(disk_cache_size=-1)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any, cast
+
+import pytest
+from fakes import FakeDriver, patch_drivers
+
+from setup_selenium import HEADLESS_SHELL, Browser, DriverPool, SetupSelenium
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+@pytest.fixture
+def launched(monkeypatch: pytest.MonkeyPatch) -> list[FakeDriver]:
+    return patch_drivers(monkeypatch)
+
+
+def fake_reset(driver: Any) -> None:  # noqa: ANN401
+    driver.resets += 1
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_pool_prelaunches_min_size(launched: list[FakeDriver]) -> None:
+    with DriverPool(Browser.CHROME, min_size=2, max_size=4) as pool:
+        wait_for(lambda: pool.idle == 2)
+        assert len(launched) == 2
+
+
+def test_pool_runs_the_headless_shell(launched: list[FakeDriver]) -> None:
+    with DriverPool(
+        Browser.CHROME,
+        min_size=1,
+        headless=HEADLESS_SHELL,
+        browser_path="/opt/chrome-headless-shell",
+    ) as pool:
+        wait_for(lambda: pool.idle == 1)
+    assert launched[0].binary == "/opt/chrome-headless-shell"
+
+
+def test_pool_lease_resets_and_reuses(launched: list[FakeDriver]) -> None:
+    with DriverPool(min_size=1, max_size=1, reset=fake_reset) as pool:
+        with pool.lease(timeout=2) as driver1:
+            pass
+        wait_for(lambda: pool.idle == 1)
+        with pool.lease(timeout=2) as driver2:
+            pass
+
+    assert driver1 is driver2
+    assert cast("FakeDriver", driver1).resets == 2
+    assert len(launched) == 1
+
+
+@pytest.mark.usefixtures("launched")
+def test_pool_refills_after_acquire() -> None:
+    with DriverPool(min_size=1, max_size=2, reset=fake_reset) as pool:
+        pool.acquire(timeout=2)
+        wait_for(lambda: pool.idle == 1)
+        assert pool.size == 2
+
+
+@pytest.mark.usefixtures("launched")
+def test_pool_respects_max_size() -> None:
+    with DriverPool(min_size=0, max_size=1, reset=fake_reset) as pool:
+        driver = pool.acquire(timeout=2)
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.1)
+        pool.release(driver)
+        assert pool.acquire(timeout=2) is driver
+
+
+@pytest.mark.usefixtures("launched")
+def test_pool_discards_on_error() -> None:
+    with DriverPool(min_size=0, max_size=1, reset=fake_reset) as pool:
+        with pytest.raises(ZeroDivisionError), pool.lease(timeout=2) as driver:
+            1 / 0  # noqa: B018
+        wait_for(lambda: cast("FakeDriver", driver).quit_called)
+        assert pool.acquire(timeout=2) is not driver
+
+
+def test_pool_evicts_idle(launched: list[FakeDriver]) -> None:
+    with DriverPool(min_size=0, max_size=2, idle_timeout=0.05) as pool:
+        pool.release(pool.acquire(timeout=2), discard=False)
+        wait_for(lambda: pool.size == 0)
+
+    assert all(d.quit_called for d in launched)
+
+
+def test_pool_close_quits_drivers(launched: list[FakeDriver]) -> None:
+    pool = DriverPool(min_size=2, max_size=2, reset=fake_reset)
+    leased = pool.acquire(timeout=2)
+    wait_for(lambda: pool.idle == 1)
+    pool.close()
+    pool.release(leased)
+
+    assert all(d.quit_called for d in launched)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+
+def test_pool_raises_launch_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fake_install(**_: str | None) -> tuple[str, str]:
+        msg = "no driver"
+        raise ValueError(msg)
+
+    monkeypatch.setattr(SetupSelenium, "install_driver", fake_install)
+    with DriverPool(min_size=0) as pool, pytest.raises(ValueError, match="no driver"):
+        pool.acquire(timeout=2)
+
+
+def test_pool_invalid_sizes() -> None:
+    with pytest.raises(ValueError, match="invalid pool size"):
+        DriverPool(min_size=3, max_size=2)
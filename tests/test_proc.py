@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from fakes import ProcessDriver
+
+from setup_selenium.proc import driver_pid, process_tree, session_memory, tree_memory
+
+pytestmark = pytest.mark.skipif(
+    not os.path.isdir("/proc"), reason="needs /proc (linux)"
+)
+
+
+def test_tree_includes_children() -> None:
+    # a child with a child of its own
+    code = "import subprocess, sys; subprocess.run([sys.executable, '-c', 'input()'])"
+    child = subprocess.Popen(  # noqa: S603
+        [sys.executable, "-c", code], stdin=subprocess.PIPE
+    )
+    try:
+        for _ in range(100):
+            tree = process_tree(os.getpid())
+            if len(tree) >= 3:
+                break
+            time.sleep(0.05)
+        memory = tree_memory(child.pid)
+    finally:
+        child.communicate(b"\n", timeout=10)
+
+    assert tree[0] == os.getpid()
+    assert child.pid in tree
+    assert memory.processes == 2
+    assert memory.rss > memory.pss > 0
+
+
+def test_gone_processes_use_no_memory() -> None:
+    child = subprocess.Popen([sys.executable, "-c", "pass"])  # noqa: S603
+    child.wait()
+
+    memory = tree_memory(child.pid)
+
+    assert memory.pids == [child.pid]
+    assert memory.rss == memory.pss == 0
+
+
+def test_session_memory() -> None:
+    driver = ProcessDriver()
+    try:
+        memory = session_memory(driver)  # type: ignore[arg-type]
+    finally:
+        driver.close()
+
+    assert memory.pids == [driver.process.pid, driver.browser_pid]
+    assert memory.rss > 0
+
+
+def test_remote_drivers_have_no_process() -> None:
+    with pytest.raises(ValueError, match="no local driver process"):
+        driver_pid(object())  # type: ignore[arg-type]
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import errno
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fakes import FakeDriver, StubRemote
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
+from setup_selenium import Browser, ProfileTemplate, SetupSelenium, profiles
+from setup_selenium.profiles import MARKER, clone_tree, profile_argument, use_profile
+
+
+def write(path: Path, content: str = "x") -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_clone_tree(tmp_path: Path) -> None:
+    src, dst = tmp_path / "template", tmp_path / "clone"
+    write(src / "Default" / "Preferences", "{}")
+    write(src / "WidevineCdm" / "4.10" / "libwidevinecdm.so")
+    write(src / MARKER)
+    (src / "SingletonLock").symlink_to("host-1234")
+    (src / "Default" / "Current").symlink_to("Preferences")
+    dst.mkdir()
+
+    counts = clone_tree(str(src), str(dst), reflink=False)
+
+    assert counts == {"reflink": 0, "hardlink": 1, "copy": 1}
+    assert (dst / "Default" / "Preferences").read_text() == "{}"
+    assert not (dst / "Default" / "Preferences").samefile(
+        src / "Default" / "Preferences"
+    )
+    assert (dst / "WidevineCdm" / "4.10" / "libwidevinecdm.so").samefile(
+        src / "WidevineCdm" / "4.10" / "libwidevinecdm.so"
+    )
+    assert os.readlink(dst / "Default" / "Current") == "Preferences"
+    assert not os.path.lexists(dst / "SingletonLock")
+    assert not (dst / MARKER).exists()
+
+
+def test_clone_tree_falls_back_without_reflinks(tmp_path: Path) -> None:
+    src, dst = tmp_path / "template", tmp_path / "clone"
+    for index in range(3):
+        write(src / f"file{index}", str(index))
+    dst.mkdir()
+
+    counts = clone_tree(str(src), str(dst))
+
+    assert sum(counts.values()) == 3
+    assert [(dst / f"file{i}").read_text() for i in range(3)] == ["0", "1", "2"]
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="FICLONE is linux")
+def test_hardlinks_after_a_failed_reflink(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    src, dst = tmp_path / "template", tmp_path / "clone"
+    write(src / "WidevineCdm" / "4.10" / "libwidevinecdm.so")
+    write(src / "WidevineCdm" / "4.10" / "manifest.json")
+    dst.mkdir()
+    attempts: list[int] = []
+
+    def unsupported(*_: Any) -> None:
+        attempts.append(1)
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+    monkeypatch.setattr(profiles.fcntl, "ioctl", unsupported)
+
+    counts = clone_tree(str(src), str(dst))
+
+    assert counts == {"reflink": 0, "hardlink": 2, "copy": 0}
+    assert len(attempts) == 1
+    for name in ("libwidevinecdm.so", "manifest.json"):
+        path = Path("WidevineCdm", "4.10", name)
+        assert (dst / path).samefile(src / path)
+
+
+def test_use_profile() -> None:
+    chrome, firefox = ChromeOptions(), FirefoxOptions()
+
+    use_profile(Browser.CHROME, chrome, "/profiles/clone")
+    use_profile(Browser.FIREFOX, firefox, "/profiles/clone")
+
+    assert chrome.arguments == ["--user-data-dir=/profiles/clone"]
+    assert firefox.arguments == ["-profile", "/profiles/clone"]
+    assert profile_argument(Browser.FIREFOX, firefox) == "/profiles/clone"
+    with pytest.raises(ValueError, match="already use the profile"):
+        use_profile(Browser.CHROME, chrome, "/profiles/other")
+
+
+@pytest.fixture
+def warmups(monkeypatch: pytest.MonkeyPatch) -> list[Any]:
+    """Fake browser launches writing a profile into their user data dir"""
+    launched: list[Any] = []
+
+    def fake_create(browser: str, **kwargs: Any) -> FakeDriver:
+        options = kwargs["options"]
+        launched.append(options)
+        path = profile_argument(browser, options)
+        assert path is not None
+        write(Path(path) / "Default" / "Preferences", "{}")
+        os.symlink("host-1234", os.path.join(path, "SingletonLock"))
+        return FakeDriver(browser)
+
+    monkeypatch.setattr(SetupSelenium, "create_driver", staticmethod(fake_create))
+    return launched
+
+
+def test_template_is_built_once(tmp_path: Path, warmups: list[Any]) -> None:
+    template = ProfileTemplate(directory=str(tmp_path / "chrome"), settle=0)
+
+    assert not template.ready
+    assert template.build() == str(tmp_path / "chrome")
+    template.build()
+    clone = template.clone()
+
+    assert len(warmups) == 1
+    assert template.ready
+    assert not os.path.lexists(tmp_path / "chrome" / "SingletonLock")
+    assert (Path(clone) / "Default" / "Preferences").read_text() == "{}"
+    assert not (Path(clone) / MARKER).exists()
+    # no staging directory left behind, the clone lives next to the template
+    assert {p.name for p in tmp_path.iterdir()} == {
+        "chrome",
+        "chrome.lock",
+        os.path.basename(clone),
+    }
+
+    template.build(rebuild=True)
+    assert len(warmups) == 2
+
+
+def test_default_directory_follows_the_options() -> None:
+    plain = ProfileTemplate(Browser.CHROME)
+    custom = ProfileTemplate(
+        Browser.CHROME,
+        options=SetupSelenium.options_template(Browser.CHROME).derive(
+            arguments=["--lang=de"]
+        ),
+    )
+
+    assert os.path.basename(plain.directory).startswith("chrome-")
+    assert plain.directory != custom.directory
+    assert plain.directory == ProfileTemplate(Browser.CHROME).directory
+
+
+@pytest.fixture
+def template(tmp_path: Path) -> ProfileTemplate:
+    directory = tmp_path / "template"
+    write(directory / "Default" / "Preferences", "{}")
+    write(directory / MARKER)
+    return ProfileTemplate(directory=str(directory))
+
+
+def test_sessions_run_on_a_clone(
+    monkeypatch: pytest.MonkeyPatch, template: ProfileTemplate
+) -> None:
+    launched: list[ChromeOptions] = []
+
+    def fake_chrome(options: ChromeOptions, **_: Any) -> FakeDriver:
+        launched.append(options)
+        return FakeDriver()
+
+    monkeypatch.setattr(SetupSelenium, "chrome", staticmethod(fake_chrome))
+    options = SetupSelenium.chrome_options()
+
+    driver = SetupSelenium.create_driver(
+        Browser.CHROME, options=options, profile_template=template
+    )
+    clone = driver.profile_dir  # type: ignore[union-attr,attr-defined]
+
+    assert profile_argument(Browser.CHROME, launched[0]) == clone
+    assert os.path.dirname(clone) == os.path.dirname(template.directory)
+    assert profile_argument(Browser.CHROME, options) is None
+    assert os.path.isfile(os.path.join(clone, "Default", "Preferences"))
+    driver.quit()
+    assert driver.quit_called  # type: ignore[union-attr,attr-defined]
+    assert not os.path.exists(clone)
+
+
+def test_clone_is_removed_when_launching_fails(
+    monkeypatch: pytest.MonkeyPatch, template: ProfileTemplate
+) -> None:
+    clones: list[str] = []
+
+    def failing_chrome(options: ChromeOptions, **_: Any) -> FakeDriver:
+        clones.append(profile_argument(Browser.CHROME, options) or "")
+        msg = "chrome failed to start"
+        raise RuntimeError(msg)
+
+    monkeypatch.setattr(SetupSelenium, "chrome", staticmethod(failing_chrome))
+
+    with pytest.raises(RuntimeError, match="failed to start"):
+        SetupSelenium.create_driver(Browser.CHROME, profile_template=template)
+    assert clones
+    assert not os.path.exists(clones[0])
+
+
+def test_remote_drivers_cannot_use_templates(template: ProfileTemplate) -> None:
+    with StubRemote() as grid, pytest.raises(ValueError, match="local browser"):
+        SetupSelenium.create_driver(
+            Browser.CHROME, remote=grid.url, profile_template=template
+        )
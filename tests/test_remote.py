@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from fakes import StubRemote
+from selenium.webdriver.remote.webdriver import WebDriver as Remote
+
+from setup_selenium import (
+    Browser,
+    DriverPool,
+    DriverSpec,
+    RemoteConfig,
+    SetupSelenium,
+    create_drivers,
+    remote,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@pytest.fixture
+def grid() -> Iterator[StubRemote]:
+    with StubRemote() as server:
+        yield server
+
+
+def test_presets_are_applied(grid: StubRemote) -> None:
+    driver = SetupSelenium.create_driver(
+        Browser.CHROME,
+        headless=True,
+        enable_log_performance=True,
+        remote=grid.url,
+    )
+    driver.quit()
+
+    assert isinstance(driver, Remote)
+    (caps,) = grid.sessions
+    assert caps["browserName"] == "chrome"
+    args = caps["goog:chromeOptions"]["args"]
+    assert args[:-1] == list(SetupSelenium.options_template(Browser.CHROME).arguments)
+    assert args[-1] == "--headless=new"
+    assert caps["goog:loggingPrefs"]["performance"] == "ALL"
+
+
+def test_firefox_presets(grid: StubRemote) -> None:
+    SetupSelenium.create_driver(Browser.FIREFOX, headless=True, remote=grid.url).quit()
+
+    (caps,) = grid.sessions
+    assert caps["moz:firefoxOptions"]["args"] == ["--headless"]
+    assert caps["moz:firefoxOptions"]["log"] == {"level": "fatal"}
+
+
+def test_commands_reuse_connection(grid: StubRemote) -> None:
+    driver = SetupSelenium.remote(Browser.EDGE, RemoteConfig(grid.url))
+    for _ in range(20):
+        assert driver.title == "stub"
+    driver.quit()
+
+    assert grid.connections == 1
+
+
+def test_without_keep_alive(grid: StubRemote) -> None:
+    driver = SetupSelenium.remote(
+        Browser.CHROME, RemoteConfig(grid.url, keep_alive=False)
+    )
+    for _ in range(5):
+        assert driver.title == "stub"
+    driver.quit()
+
+    assert grid.connections > 1
+
+
+def test_pool_size_is_passed_to_connection(grid: StubRemote) -> None:
+    config = RemoteConfig(grid.url, pool_size=7, pool_block=True)
+    driver = SetupSelenium.remote(Browser.CHROME, config)
+    pool = driver.command_executor._conn.connection_from_url(grid.url)  # type: ignore[union-attr]
+    driver.quit()
+
+    assert pool.pool.maxsize == 7
+    assert pool.block
+
+
+def test_invalid_pool_size() -> None:
+    with pytest.raises(ValueError, match="pool_size"):
+        RemoteConfig("http://localhost:4444", pool_size=0)
+
+
+def test_remote_needs_newer_selenium(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(remote, "__version__", "4.25.0")
+
+    with pytest.raises(RuntimeError, match=r"selenium >= 4.26, but 4.25.0"):
+        SetupSelenium.remote(Browser.CHROME, "http://localhost:1")
+
+
+def test_instance_skips_install(
+    grid: StubRemote, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def no_install(*_: object, **__: object) -> None:
+        raise AssertionError
+
+    monkeypatch.setattr(SetupSelenium, "install_driver", staticmethod(no_install))
+    sel = SetupSelenium(Browser.CHROME, headless=True, remote=grid.url)
+    sel.driver.quit()
+
+    with DriverPool(Browser.CHROME, min_size=0, remote=grid.url) as pool, pool.lease():
+        pass
+    create_drivers([DriverSpec(remote=grid.url)], raise_on_error=True).quit()
+
+    assert len(grid.sessions) == 3
+
+
+def test_throttle_on_remote(grid: StubRemote) -> None:
+    driver = SetupSelenium.remote(Browser.CHROME, grid.url)
+    SetupSelenium.set_network_throttle(driver, "3G")  # type: ignore[arg-type]
+    SetupSelenium.set_cpu_throttle(driver, 4)  # type: ignore[arg-type]
+    driver.quit()
+
+    paths = [path for _, path, _ in grid.requests]
+    assert any(p.endswith("/chromium/network_conditions") for p in paths)
+    assert any(p.endswith("/goog/cdp/execute") for p in paths)
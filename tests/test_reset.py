@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from fakes import StubRemote, patch_drivers
+
+from setup_selenium import Browser, DriverPool, SetupSelenium
+from setup_selenium.reset import CLEAR_PAGE_SCRIPT, FIREFOX_CLEAR_SCRIPT, reset_session
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@pytest.fixture
+def grid() -> Iterator[StubRemote]:
+    with StubRemote() as server:
+        yield server
+
+
+def sent(grid: StubRemote) -> list[tuple[str, str, object]]:
+    """Commands after session creation, without the session prefix"""
+    result = []
+    for method, path, body in grid.requests:
+        if path == "/session":
+            continue
+        command = path.split("/", 3)[-1]
+        detail = body.get("cmd") or body.get("context") or body.get("url")
+        if body.get("script") == CLEAR_PAGE_SCRIPT:
+            detail = "clear page"
+        elif body.get("script") == FIREFOX_CLEAR_SCRIPT:
+            detail = "clear all sites"
+        result.append((method, command, detail))
+    return result
+
+
+def test_chromium_reset(grid: StubRemote) -> None:
+    grid.handles = ["main", "popup"]
+    grid.cdp["Page.getNavigationHistory"] = {
+        "entries": [
+            {"url": "about:blank"},
+            {"url": "https://example.com/login?next=/"},
+            {"url": "http://localhost:8000/app"},
+        ]
+    }
+    driver = SetupSelenium.remote(Browser.CHROME, grid.url)
+    grid.requests.clear()
+
+    reset_session(driver, origins=["https://cdn.example.net"])
+
+    assert sent(grid) == [
+        ("GET", "window/handles", None),
+        ("POST", "window", None),
+        ("POST", "goog/cdp/execute", "Page.getNavigationHistory"),
+        ("POST", "execute/async", "clear page"),
+        ("DELETE", "window", None),
+        ("POST", "window", None),
+        ("POST", "goog/cdp/execute", "Page.getNavigationHistory"),
+        ("POST", "execute/async", "clear page"),
+        ("POST", "url", "about:blank"),
+        ("POST", "goog/cdp/execute", "Network.clearBrowserCookies"),
+        ("POST", "goog/cdp/execute", "Network.clearBrowserCache"),
+        ("POST", "goog/cdp/execute", "Storage.clearDataForOrigin"),
+        ("POST", "goog/cdp/execute", "Storage.clearDataForOrigin"),
+        ("POST", "goog/cdp/execute", "Storage.clearDataForOrigin"),
+        ("DELETE", "chromium/network_conditions", None),
+        ("POST", "goog/cdp/execute", "Network.emulateNetworkConditions"),
+        ("POST", "goog/cdp/execute", "Emulation.setCPUThrottlingRate"),
+    ]
+    cleared = [
+        body["params"]
+        for _, _, body in grid.requests
+        if body.get("cmd") == "Storage.clearDataForOrigin"
+    ]
+    assert cleared == [
+        {"origin": origin, "storageTypes": "all"}
+        for origin in (
+            "http://localhost:8000",
+            "https://cdn.example.net",
+            "https://example.com",
+        )
+    ]
+
+
+def test_firefox_reset_clears_every_site(grid: StubRemote) -> None:
+    driver = SetupSelenium.remote(Browser.FIREFOX, grid.url)
+    grid.requests.clear()
+
+    SetupSelenium.reset_session(driver, url="https://example.com/")
+
+    assert sent(grid) == [
+        ("POST", "moz/context", "chrome"),
+        ("POST", "execute/async", "clear all sites"),
+        ("POST", "moz/context", "content"),
+        ("GET", "window/handles", None),
+        ("POST", "window", None),
+        ("POST", "execute/async", "clear page"),
+        ("POST", "url", "https://example.com/"),
+    ]
+
+
+def test_firefox_without_system_access(grid: StubRemote) -> None:
+    grid.errors.add("/moz/context")
+    driver = SetupSelenium.remote(Browser.FIREFOX, grid.url)
+    grid.requests.clear()
+
+    reset_session(driver)
+
+    assert sent(grid)[1:] == [
+        ("GET", "window/handles", None),
+        ("POST", "window", None),
+        ("POST", "execute/async", "clear page"),
+        ("DELETE", "cookie", None),
+        ("POST", "url", "about:blank"),
+    ]
+
+
+def test_pool_resets_with_reset_session(monkeypatch: pytest.MonkeyPatch) -> None:
+    patch_drivers(monkeypatch)
+    with DriverPool(min_size=0) as pool:
+        assert pool.reset is reset_session
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import gc
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+
+from setup_selenium.service import ServiceRegistry, SharedService
+
+ports = itertools.count(9000)
+started: list[FakeService] = []
+
+
+class FakeProcess:
+    def __init__(self) -> None:
+        self.returncode: int | None = None
+
+    def poll(self) -> int | None:
+        return self.returncode
+
+
+class FakeService:
+    def __init__(
+        self,
+        executable_path: str | None = None,
+        service_args: list[str] | None = None,
+        log_output: str | None = None,
+    ) -> None:
+        self.path = executable_path
+        self.service_args = service_args
+        self.log_output = log_output
+        self.port = next(ports)
+        self.process: FakeProcess | None = None
+        self.stopped = False
+
+    @property
+    def service_url(self) -> str:
+        return f"http://localhost:{self.port}"
+
+    def start(self) -> None:
+        time.sleep(0.01)
+        self.process = FakeProcess()
+        started.append(self)
+
+    def stop(self) -> None:
+        self.stopped = True
+        if self.process is not None:
+            self.process.returncode = 0
+
+
+@pytest.fixture(autouse=True)
+def _reset_started() -> None:
+    started.clear()
+
+
+def session(
+    registry: ServiceRegistry, path: str = "/fake/driver", **kwargs: Any
+) -> SharedService:
+    """Start a lease the way a webdriver would"""
+    service = registry.lease(FakeService, **kwargs)  # type: ignore[type-var]
+    assert isinstance(service, SharedService)
+    service.path = service.env_path() or path
+    service.start()
+    return service
+
+
+def test_sessions_share_one_process() -> None:
+    registry = ServiceRegistry()
+    first = session(registry)
+    second = session(registry)
+
+    assert len(started) == 1
+    assert first.service_url == second.service_url
+    assert first.port == second.port
+    first.stop()
+    assert not started[0].stopped
+    second.stop()
+    assert started[0].stopped
+    assert registry.processes == 0
+
+
+def test_stop_is_idempotent() -> None:
+    registry = ServiceRegistry()
+    first = session(registry)
+    second = session(registry)
+    first.stop()
+    first.stop()
+
+    assert not started[0].stopped
+    second.stop()
+
+
+def test_different_keys_get_their_own_process() -> None:
+    registry = ServiceRegistry()
+    sessions = [
+        session(registry, path="/fake/driver-118"),
+        session(registry, path="/fake/driver-119"),
+        session(registry, path="/fake/driver-119", service_args=["--verbose"]),
+    ]
+
+    assert len(started) == 3
+    registry.stop_all()
+    assert all(s.stopped for s in started)
+    for s in sessions:
+        s.stop()
+
+
+def test_max_sessions() -> None:
+    registry = ServiceRegistry()
+    first = session(registry, max_sessions=1)
+    second = session(registry, max_sessions=1)
+
+    assert len(started) == 2
+    first.stop()
+    third = session(registry, max_sessions=1)
+    assert len(started) == 3
+    second.stop()
+    third.stop()
+    assert registry.processes == 0
+
+
+def test_linger_reuses_process() -> None:
+    registry = ServiceRegistry(linger=0.2)
+    session(registry).stop()
+    session(registry).stop()
+
+    assert len(started) == 1
+    assert registry.processes == 1
+    time.sleep(0.4)
+    assert registry.processes == 0
+    assert started[0].stopped
+
+
+def test_dead_process_is_replaced() -> None:
+    registry = ServiceRegistry()
+    first = session(registry)
+    assert started[0].process is not None
+    started[0].process.returncode = 1
+    second = session(registry)
+
+    assert len(started) == 2
+    first.stop()
+    second.stop()
+    assert registry.processes == 0
+
+
+def test_concurrent_sessions_start_once() -> None:
+    registry = ServiceRegistry()
+    barrier = threading.Barrier(8)
+
+    def start(_: int) -> SharedService:
+        barrier.wait()
+        return session(registry)
+
+    with ThreadPoolExecutor(8) as pool:
+        sessions = list(pool.map(start, range(8)))
+
+    assert len(started) == 1
+    for s in sessions:
+        s.stop()
+    assert started[0].stopped
+
+
+def test_unreferenced_lease_releases() -> None:
+    registry = ServiceRegistry()
+    keep = session(registry)
+    session(registry)
+    gc.collect()
+
+    keep.stop()
+    assert started[0].stopped
+
+
+def test_unreferenced_lease_never_takes_the_lock() -> None:
+    registry = ServiceRegistry()
+    keep = session(registry)
+    lost = session(registry)
+    # collected while the registry is busy, as cyclic gc may do
+    with registry._lock:
+        del lost
+        gc.collect()
+
+    assert registry.processes == 1
+    keep.stop()
+    assert started[0].stopped
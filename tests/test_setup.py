@@ -10,9 +10,12 @@ from selenium.common.exceptions import NoSuchDriverException
 from semantic_version import Version  # type: ignore[import-untyped]
 
 from setup_selenium import Browser, SetupSelenium, set_logger
+from setup_selenium.cache import driver_cache
 from setup_selenium.setup_selenium import logger as original_logger
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from _pytest.logging import LogCaptureFixture
 
 CHROME_VERSION_OLD = "118.0.5993.70"
@@ -288,12 +291,18 @@ def test_default_logger(
 
 
 def test_custom_logger(
-    caplog: LogCaptureFixture, create_logger: logging.Logger
+    caplog: LogCaptureFixture,
+    create_logger: logging.Logger,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
 ) -> None:
     """Test the custom logger."""
 
     # Set the custom logger
     set_logger(create_logger)
+    # make sure selenium manager actually runs, without touching the real cache
+    monkeypatch.setattr(driver_cache, "cache_dir", str(tmp_path / "cache"))
+    SetupSelenium.invalidate_driver_cache()
 
     with caplog.at_level(logging.DEBUG, logger="testsetupsel"):
         SetupSelenium(headless=True)
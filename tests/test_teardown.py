@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+from fakes import FakeDriver, ProcessDriver, ProcessService, StubRemote
+
+from setup_selenium import Browser, SetupSelenium
+from setup_selenium.service import ServiceRegistry, SharedService
+from setup_selenium.teardown import shutdown, shutdown_all
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+needs_proc = pytest.mark.skipif(
+    not os.path.isdir("/proc"), reason="needs /proc (linux)"
+)
+
+
+@pytest.fixture
+def drivers() -> Iterator[list[ProcessDriver]]:
+    created: list[ProcessDriver] = []
+    yield created
+    for driver in created:
+        driver.close()
+
+
+class HangingDriver(FakeDriver):
+    def quit(self) -> None:
+        self.quit_called = True
+        threading.Event().wait()
+
+
+@needs_proc
+def test_leftover_processes_are_killed(drivers: list[ProcessDriver]) -> None:
+    driver = ProcessDriver()
+    drivers.append(driver)
+
+    assert shutdown(driver, timeout=0.5)  # type: ignore[arg-type]
+
+    assert driver.quit_called
+    assert not driver.alive()
+
+
+@needs_proc
+def test_hanging_quit_is_cut_short(drivers: list[ProcessDriver]) -> None:
+    driver = ProcessDriver(hang=True)
+    drivers.append(driver)
+
+    start = time.monotonic()
+    assert not shutdown(driver, timeout=0.2)  # type: ignore[arg-type]
+
+    assert time.monotonic() - start < 2
+    assert not driver.alive()
+
+
+@needs_proc
+def test_shared_services_are_not_killed(drivers: list[ProcessDriver]) -> None:
+    driver = ProcessDriver(hang=True)
+    drivers.append(driver)
+    shared = SharedService(ServiceRegistry(), ProcessService, key="k")  # type: ignore[arg-type]
+    shared._service = driver.service  # type: ignore[assignment]
+    process = driver.service
+    driver.service = shared  # type: ignore[assignment]
+
+    assert not shutdown(driver, timeout=0.1)  # type: ignore[arg-type]
+
+    assert process.process.poll() is None
+
+
+def test_failing_quit() -> None:
+    driver = FakeDriver()
+    driver.quit = lambda: 1 / 0  # type: ignore[method-assign,assignment]
+
+    assert not shutdown(driver, timeout=1)  # type: ignore[arg-type]
+
+
+def test_parallel_shutdown() -> None:
+    drivers = [HangingDriver() for _ in range(8)]
+
+    start = time.monotonic()
+    results = shutdown_all([drivers[0], None, *drivers[1:]], timeout=0.3)  # type: ignore[list-item]
+
+    assert time.monotonic() - start < 1.5
+    assert results == [False, True] + [False] * 7
+    assert all(d.quit_called for d in drivers)
+
+
+def test_context_manager_quits_once() -> None:
+    with StubRemote() as grid:
+        with SetupSelenium(Browser.CHROME, remote=grid.url) as sel:
+            pass
+        assert sel.closed
+        assert sel.close()
+
+    deletes = [path for method, path, _ in grid.requests if method == "DELETE"]
+    assert len(deletes) == 1
+
+
+def test_close_all_mixes_instances_and_drivers() -> None:
+    with StubRemote() as grid:
+        sel = SetupSelenium(Browser.CHROME, remote=grid.url)
+        driver = FakeDriver()
+
+        assert SetupSelenium.close_all([sel, driver]) == [True, True]  # type: ignore[list-item]
+        assert SetupSelenium.close_all([sel]) == [True]
+
+    assert sel.closed
+    assert driver.quit_called
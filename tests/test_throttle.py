@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from fakes import StubRemote
+
+from setup_selenium import Browser, SetupSelenium
+from setup_selenium.throttle import (
+    NETWORK_PROFILES,
+    NetworkProfile,
+    network_profile,
+    run_matrix,
+)
+from setup_selenium.timing import percentile
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from selenium.webdriver.chromium.webdriver import ChromiumDriver
+
+
+@pytest.fixture
+def grid() -> Iterator[StubRemote]:
+    with StubRemote() as server:
+        yield server
+
+
+def commands(grid: StubRemote) -> list[tuple[str, str, dict]]:
+    """Throttling related requests, without the session prefix"""
+    return [
+        (method, path.split("/", 3)[-1], body)
+        for method, path, body in grid.requests
+        if path.endswith(("network_conditions", "cdp/execute", "title"))
+    ]
+
+
+def test_builtin_profiles_keep_their_conditions() -> None:
+    assert NETWORK_PROFILES["3G"].conditions() == {
+        "offline": False,
+        "latency": 100,
+        "download_throughput": 750 / 8 * 1024,
+        "upload_throughput": 250 / 8 * 1024,
+    }
+    assert network_profile("wifi") is NETWORK_PROFILES["WIFI"]
+
+
+def test_unknown_profile() -> None:
+    with pytest.raises(ValueError, match="Unknown network profile"):
+        network_profile("5G")
+
+
+@pytest.mark.parametrize(
+    ("field", "value"), [("latency", -1), ("packet_loss", 101), ("packet_loss", -1)]
+)
+def test_invalid_profile(field: str, value: float) -> None:
+    with pytest.raises(ValueError, match=field):
+        NetworkProfile("bad", **{field: value})  # type: ignore[arg-type]
+
+
+def test_unthrottled_throughput() -> None:
+    conditions = NetworkProfile("slow", latency=400).conditions()
+
+    assert conditions["download_throughput"] == -1
+    assert conditions["upload_throughput"] == -1
+
+
+def test_custom_profile(grid: StubRemote) -> None:
+    driver = SetupSelenium.remote(Browser.CHROME, grid.url)
+    profile = NetworkProfile("satellite", latency=600, download=1000, upload=256)
+    SetupSelenium.set_network_throttle(driver, profile)  # type: ignore[arg-type]
+    driver.quit()
+
+    ((method, path, body),) = commands(grid)
+    assert (method, path) == ("POST", "chromium/network_conditions")
+    assert body["network_conditions"]["latency"] == 600
+
+
+def test_packet_loss_uses_devtools(grid: StubRemote) -> None:
+    driver = SetupSelenium.remote(Browser.CHROME, grid.url)
+    profile = NetworkProfile("lossy", latency=50, packet_loss=5)
+    SetupSelenium.set_network_throttle(driver, profile)  # type: ignore[arg-type]
+    driver.quit()
+
+    ((_, path, body),) = commands(grid)
+    assert path == "goog/cdp/execute"
+    assert body["cmd"] == "Network.emulateNetworkConditions"
+    assert body["params"]["packetLoss"] == 5
+
+
+def test_reset_throttle(grid: StubRemote) -> None:
+    driver = SetupSelenium.remote(Browser.CHROME, grid.url)
+    SetupSelenium.reset_throttle(driver)  # type: ignore[arg-type]
+    driver.quit()
+
+    sent = [(m, p, b.get("cmd")) for m, p, b in commands(grid)]
+    assert sent == [
+        ("DELETE", "chromium/network_conditions", None),
+        ("POST", "goog/cdp/execute", "Network.emulateNetworkConditions"),
+        ("POST", "goog/cdp/execute", "Emulation.setCPUThrottlingRate"),
+    ]
+
+
+def test_matrix_runs_every_cell(grid: StubRemote) -> None:
+    driver = SetupSelenium.remote(Browser.CHROME, grid.url)
+    resets: list[object] = []
+
+    result = run_matrix(
+        driver,  # type: ignore[arg-type]
+        lambda d: d.title,
+        networks=["3G", NetworkProfile("satellite", latency=600)],
+        cpu_rates=[1, 4],
+        repeat=3,
+        reset=resets.append,
+    )
+    driver.quit()
+
+    assert list(result.cells) == [
+        ("3G", 1),
+        ("3G", 4),
+        ("satellite", 1),
+        ("satellite", 4),
+    ]
+    assert all(len(cell.samples) == 3 for cell in result.cells.values())
+    assert len(resets) == 12
+    budgets = result.budgets(pct=50)
+    assert set(budgets) == {"3G", "satellite"}
+    assert set(budgets["3G"]) == {1, 4}
+
+
+def test_matrix_resets_between_runs(grid: StubRemote) -> None:
+    driver = SetupSelenium.remote(Browser.CHROME, grid.url)
+
+    unthrottled = NetworkProfile("NONE").cdp_conditions()
+    run_matrix(driver, lambda d: d.title, networks=["LTE"], cpu_rates=[6])  # type: ignore[arg-type]
+    driver.quit()
+
+    sent = [(m, p, b.get("cmd"), b.get("params")) for m, p, b in commands(grid)]
+    assert sent == [
+        ("POST", "chromium/network_conditions", None, None),
+        ("POST", "goog/cdp/execute", "Emulation.setCPUThrottlingRate", {"rate": 6}),
+        ("GET", "title", None, None),
+        ("DELETE", "chromium/network_conditions", None, None),
+        ("POST", "goog/cdp/execute", "Network.emulateNetworkConditions", unthrottled),
+        ("POST", "goog/cdp/execute", "Emulation.setCPUThrottlingRate", {"rate": 1}),
+    ]
+
+
+def test_matrix_records_failures(grid: StubRemote) -> None:
+    driver = SetupSelenium.remote(Browser.CHROME, grid.url)
+    calls = []
+
+    def flaky(d: ChromiumDriver) -> None:
+        calls.append(d)
+        if len(calls) % 2:
+            msg = "page did not load"
+            raise TimeoutError(msg)
+
+    result = run_matrix(driver, flaky, networks=["OFFLINE"], repeat=4)  # type: ignore[arg-type]
+    driver.quit()
+
+    cell = result.cells["OFFLINE", 1]
+    assert len(cell.samples) == 2
+    assert cell.errors == ["TimeoutError('page did not load')"] * 2
+    assert cell.as_dict()["runs"] == 4
+
+
+def test_matrix_without_successful_runs(grid: StubRemote) -> None:
+    driver = SetupSelenium.remote(Browser.CHROME, grid.url)
+
+    def broken(_: ChromiumDriver) -> None:
+        raise RuntimeError
+
+    result = run_matrix(driver, broken, networks=["2G"])  # type: ignore[arg-type]
+    driver.quit()
+
+    assert result.budgets() == {}
+    assert result.cells["2G", 1].stats() == {}
+
+
+def test_percentile() -> None:
+    samples = [5.0, 1.0, 3.0, 2.0, 4.0]
+
+    assert percentile(samples, 0) == 1.0
+    assert percentile(samples, 50) == 3.0
+    assert percentile(samples, 100) == 5.0
+    with pytest.raises(ValueError, match="no samples"):
+        percentile([], 50)
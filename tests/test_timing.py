@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+from fakes import FakeChrome, FakeService, patch_chrome, patch_drivers
+
+from setup_selenium import (
+    Browser,
+    SetupSelenium,
+    StartupTimings,
+    set_timing_hook,
+    setup_selenium as sel_module,
+)
+from setup_selenium.timing import recording, timed
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from _pytest.logging import LogCaptureFixture
+
+
+@pytest.fixture
+def hooked() -> Iterator[list[StartupTimings]]:
+    received: list[StartupTimings] = []
+    set_timing_hook(received.append)
+    yield received
+    set_timing_hook(None)
+
+
+def test_timed_is_noop_without_recording() -> None:
+    with timed("anything"):
+        pass
+
+
+def test_phases_are_exclusive() -> None:
+    with recording("chrome") as timings:
+        with timed("outer"):
+            time.sleep(0.02)
+            with timed("inner"):
+                time.sleep(0.05)
+        with timed("outer"):
+            time.sleep(0.02)
+
+    assert timings.browser == "chrome"
+    assert 0.04 <= timings.phases["outer"] < 0.05 + 0.03
+    assert timings.phases["inner"] >= 0.05
+    assert timings.total >= timings.phases["outer"] + timings.phases["inner"]
+
+
+def test_hook_receives_outermost_only(hooked: list[StartupTimings]) -> None:
+    with recording(Browser.EDGE) as outer, recording("chrome") as inner:
+        pass
+
+    assert outer is inner
+    assert hooked == [outer]
+    assert outer.as_dict()["browser"] == "edge"
+
+
+def test_failing_hook_is_logged(caplog: LogCaptureFixture) -> None:
+    def boom(_: StartupTimings) -> None:
+        raise ValueError
+
+    set_timing_hook(boom)
+    try:
+        level = logging.WARNING
+        with caplog.at_level(level, logger=sel_module.logger.name), recording(None):
+            pass
+    finally:
+        set_timing_hook(None)
+
+    assert "startup timing hook failed" in caplog.messages
+
+
+def test_set_timing_hook_rejects_non_callable() -> None:
+    with pytest.raises(TypeError):
+        set_timing_hook("nope")  # type: ignore[arg-type]
+
+
+def test_instance_timings(
+    monkeypatch: pytest.MonkeyPatch, hooked: list[StartupTimings]
+) -> None:
+    patch_drivers(monkeypatch)
+    s = SetupSelenium(Browser.FIREFOX)
+
+    assert s.timings.browser == "firefox"
+    assert "install" in s.timings.phases
+    assert hooked == [s.timings]
+
+
+def test_chrome_phases(
+    monkeypatch: pytest.MonkeyPatch, hooked: list[StartupTimings]
+) -> None:
+    patch_chrome(monkeypatch)
+    monkeypatch.setattr(FakeService, "delay", 0.02)
+    monkeypatch.setattr(FakeChrome, "delay", 0.01)
+    SetupSelenium.create_driver(Browser.CHROME, driver_path="/fake/chromedriver")
+
+    (timings,) = hooked
+    assert timings.browser == "chrome"
+    assert set(timings.phases) == {"options", "service", "session", "version_check"}
+    assert timings.phases["service"] >= 0.02
+    assert timings.phases["session"] < timings.phases["service"]
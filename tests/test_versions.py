@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from fakes import FakeDriver
+
+from setup_selenium import Browser, SetupSelenium, versions
+from setup_selenium.cache import driver_cache, resolution_memo
+from setup_selenium.versions import (
+    binary_version,
+    check_compatible,
+    compatible,
+    preflight,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="fake binaries are shell scripts"
+)
+
+
+def fake_binary(path: Path, output: str) -> str:
+    """An executable printing `output` for --version, counting its runs"""
+    path.write_text(f"#!/bin/sh\necho run >> '{path}.runs'\necho '{output}'\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+def runs(path: str) -> int:
+    if not os.path.exists(path + ".runs"):
+        return 0
+    with open(path + ".runs") as f:
+        return len(f.readlines())
+
+
+@pytest.fixture(autouse=True)
+def no_versions(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[None]:
+    monkeypatch.setattr(driver_cache, "cache_dir", str(tmp_path / "cache"))
+    versions.clear()
+    yield
+    versions.clear()
+
+
+def test_binary_version(tmp_path: Path) -> None:
+    driver = fake_binary(
+        tmp_path / "chromedriver",
+        "ChromeDriver 141.0.7390.54 (b95610d5c4a562d9cd834bc0a098d3316e2f533f)",
+    )
+    browser = fake_binary(tmp_path / "chrome", "Google Chrome 141.0.7390.65 ")
+
+    assert binary_version(driver) == "141.0.7390.54"
+    assert binary_version(browser) == "141.0.7390.65"
+    assert binary_version(str(tmp_path / "missing")) is None
+
+
+def test_versions_are_cached_by_mtime(tmp_path: Path) -> None:
+    driver = fake_binary(tmp_path / "chromedriver", "ChromeDriver 140.0.1")
+
+    assert binary_version(driver) == "140.0.1"
+    assert binary_version(driver) == "140.0.1"
+    assert runs(driver) == 1
+
+    # updated in place
+    stat = os.stat(driver)
+    fake_binary(tmp_path / "chromedriver", "ChromeDriver 141.0.2")
+    os.utime(driver, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert binary_version(driver) == "141.0.2"
+
+
+def test_versions_are_kept_on_disk(tmp_path: Path) -> None:
+    driver = fake_binary(tmp_path / "chromedriver", "ChromeDriver 140.0.1")
+    silent = fake_binary(tmp_path / "silent", "")
+
+    binary_version(driver)
+    binary_version(silent)
+    # as in a new process
+    versions.clear()
+
+    assert binary_version(driver) == "140.0.1"
+    assert binary_version(silent) is None
+    assert runs(driver) == 1
+    assert runs(silent) == 2
+
+
+def test_compatible(tmp_path: Path) -> None:
+    driver = fake_binary(tmp_path / "chromedriver", "ChromeDriver 141.0.1")
+    chrome = fake_binary(tmp_path / "chrome", "Google Chrome 141.0.2")
+    old = fake_binary(tmp_path / "old", "Google Chrome 139.0.2")
+    silent = fake_binary(tmp_path / "silent", "")
+
+    assert compatible(Browser.CHROME, driver, chrome) is True
+    assert compatible(Browser.CHROME, driver, old) is False
+    assert compatible(Browser.CHROME, driver, silent) is None
+    # geckodriver supports a range of firefox versions
+    assert compatible(Browser.FIREFOX, driver, old) is None
+    check_compatible(Browser.CHROME, driver, chrome)
+    with pytest.raises(RuntimeError, match=r"\(141.0.1\) does not match chrome"):
+        check_compatible(Browser.CHROME, driver, old)
+
+
+@pytest.fixture
+def binaries(tmp_path: Path) -> dict[str, str]:
+    return {
+        "old_driver": fake_binary(tmp_path / "old_driver", "ChromeDriver 140.0.1"),
+        "driver": fake_binary(tmp_path / "driver", "ChromeDriver 141.0.1"),
+        "chrome": fake_binary(tmp_path / "chrome", "Google Chrome 141.0.2"),
+    }
+
+
+@pytest.fixture
+def sm_calls() -> list[dict]:
+    return []
+
+
+@pytest.fixture
+def resolved(
+    monkeypatch: pytest.MonkeyPatch, binaries: dict[str, str], sm_calls: list[dict]
+) -> Iterator[list[tuple[str, str]]]:
+    """Selenium Manager runs return the pairs in this list, the last one repeated"""
+    results = [(binaries["driver"], binaries["chrome"])]
+
+    def fake_run(**kwargs: str | bool | None) -> tuple[str, str]:
+        sm_calls.append(kwargs)
+        return results[min(len(sm_calls), len(results)) - 1]
+
+    monkeypatch.setattr(driver_cache, "ttl", 60.0)
+    monkeypatch.setattr(SetupSelenium, "_run_selenium_manager", fake_run)
+    resolution_memo.clear()
+    yield results
+    resolution_memo.clear()
+
+
+def cache(driver_path: str, browser_path: str, age: float = 0) -> str:
+    """Cache a chrome resolution as if made `age` seconds ago"""
+    key = driver_cache.make_key(browser="chrome")
+    driver_cache.set(key, driver_path, browser_path)
+    with open(driver_cache.entry_path(key)) as f:
+        entry = json.load(f)
+    entry["created"] -= age
+    with open(driver_cache.entry_path(key), "w") as f:
+        json.dump(entry, f)
+    return key
+
+
+@pytest.mark.usefixtures("resolved")
+def test_outdated_cache_is_resolved_again(
+    binaries: dict[str, str], sm_calls: list[dict]
+) -> None:
+    # cached a minute before chrome updated to 141
+    key = cache(binaries["old_driver"], binaries["chrome"], age=60)
+
+    paths = SetupSelenium.install_driver(Browser.CHROME)
+
+    assert paths == (binaries["driver"], binaries["chrome"])
+    assert len(sm_calls) == 1
+    assert driver_cache.get(key) == paths
+    assert not driver_cache.replaced(key)
+
+
+@pytest.mark.usefixtures("resolved")
+def test_unchanged_cache_is_not_checked(
+    binaries: dict[str, str], sm_calls: list[dict]
+) -> None:
+    cache(binaries["old_driver"], binaries["chrome"])
+
+    for _ in range(3):
+        paths = SetupSelenium.install_driver(Browser.CHROME)
+
+    assert paths == (binaries["old_driver"], binaries["chrome"])
+    assert sm_calls == []
+    assert runs(binaries["old_driver"]) == runs(binaries["chrome"]) == 0
+
+
+def test_mismatch_is_resolved_once(
+    resolved: list[tuple[str, str]], binaries: dict[str, str], sm_calls: list[dict]
+) -> None:
+    resolved[0] = (binaries["old_driver"], binaries["chrome"])
+
+    for _ in range(2):
+        assert SetupSelenium.install_driver(Browser.CHROME) == resolved[0]
+    resolution_memo.clear()
+    SetupSelenium.install_driver(Browser.CHROME)
+
+    assert len(sm_calls) == 1
+
+
+def test_preflight(binaries: dict[str, str]) -> None:
+    mismatch = (binaries["old_driver"], binaries["chrome"])
+
+    preflight(Browser.CHROME, (binaries["driver"], binaries["chrome"]))
+    # pinned on purpose
+    preflight(Browser.CHROME, mismatch, driver_version="140.0.1")
+    with pytest.raises(RuntimeError, match="does not match chrome-headless-shell"):
+        preflight(Browser.CHROME, mismatch, headless_shell=True)
+
+
+def test_mismatch_fails_before_launch(
+    monkeypatch: pytest.MonkeyPatch,
+    resolved: list[tuple[str, str]],
+    binaries: dict[str, str],
+) -> None:
+    resolved[0] = (binaries["old_driver"], binaries["chrome"])
+    launched: list[str | None] = []
+
+    def fake_create(**kwargs: Any) -> FakeDriver:
+        launched.append(kwargs["driver_path"])
+        return FakeDriver()
+
+    monkeypatch.setattr(SetupSelenium, "create_driver", staticmethod(fake_create))
+
+    with pytest.raises(RuntimeError, match="does not match"):
+        SetupSelenium(Browser.CHROME)
+    assert launched == []
+    SetupSelenium(Browser.CHROME, driver_version="140.0.1")
+    SetupSelenium(Browser.CHROME, driver_path=binaries["driver"])
+    assert launched == [binaries["old_driver"], binaries["driver"]]
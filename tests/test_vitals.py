@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from fakes import StubRemote
+
+from setup_selenium import Browser, SetupSelenium, VitalsCollector, set_vitals_hook
+from setup_selenium.vitals import COLLECT_SCRIPT, PageVitals, summarize
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class VitalsDriver:
+    """Answers the collect script with one snapshot per loaded page"""
+
+    def __init__(self, browser: str = "chrome") -> None:
+        self.capabilities = {"browserName": browser}
+        self.url = "about:blank"
+        self.loads = 0
+        self.cdp: list[str] = []
+        self.quit_called = False
+
+    def get(self, url: str) -> None:
+        self.url = url
+        self.loads += 1
+
+    def execute_script(self, script: str) -> dict[str, Any]:
+        assert script == COLLECT_SCRIPT
+        values = {"ttfb": 100.0 * self.loads, "lcp": 900.0, "cls": 0.1, "inp": None}
+        return {"url": self.url, "time_origin": float(self.loads), "values": values}
+
+    def execute_cdp_cmd(self, cmd: str, _params: dict[str, Any]) -> dict[str, Any]:
+        self.cdp.append(cmd)
+        if cmd == "Performance.getMetrics":
+            return {"metrics": [{"name": "JSHeapUsedSize", "value": 1e6}]}
+        return {}
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+@pytest.fixture
+def hooked() -> Iterator[list[PageVitals]]:
+    pages: list[PageVitals] = []
+    set_vitals_hook(pages.append)
+    yield pages
+    set_vitals_hook(None)
+
+
+def test_pages_are_collected_when_left(hooked: list[PageVitals]) -> None:
+    driver = VitalsDriver()
+    collector = VitalsCollector(driver).attach()  # type: ignore[arg-type]
+
+    driver.get("https://example.com/")
+    driver.get("https://example.com/next")
+    assert [p.url for p in hooked] == ["https://example.com/"]
+    driver.quit()
+
+    assert driver.quit_called
+    assert [p.url for p in collector.pages] == [
+        "https://example.com/",
+        "https://example.com/next",
+    ]
+    assert hooked == collector.pages
+    assert driver.vitals is collector  # type: ignore[attr-defined]
+
+
+def test_page_values() -> None:
+    driver = VitalsDriver()
+    collector = VitalsCollector(driver)  # type: ignore[arg-type]
+    driver.get("https://example.com/")
+
+    page = collector.collect()
+
+    assert page is not None
+    assert page.values == {"ttfb": 100.0, "lcp": 900.0, "cls": 0.1}
+    assert page.metrics == {"JSHeapUsedSize": 1e6}
+    assert page.browser == "chrome"
+
+
+def test_collecting_again_updates_the_page() -> None:
+    driver = VitalsDriver()
+    collector = VitalsCollector(driver)  # type: ignore[arg-type]
+    driver.get("https://example.com/")
+
+    collector.collect()
+    collector.collect()
+    collector.stop()
+
+    assert len(collector.pages) == 1
+
+
+def test_blank_pages_are_skipped() -> None:
+    collector = VitalsCollector(VitalsDriver())  # type: ignore[arg-type]
+
+    assert collector.collect() is None
+    collector.stop()
+    assert collector.pages == []
+
+
+def test_chromium_observes_new_documents() -> None:
+    driver = VitalsDriver("msedge")
+    VitalsCollector(driver).start()  # type: ignore[arg-type]
+
+    assert driver.cdp == ["Page.addScriptToEvaluateOnNewDocument", "Performance.enable"]
+
+
+def test_firefox_uses_no_devtools() -> None:
+    driver = VitalsDriver("firefox")
+    collector = VitalsCollector(driver)  # type: ignore[arg-type]
+    driver.get("https://example.com/")
+
+    page = collector.collect()
+
+    assert driver.cdp == []
+    assert page is not None
+    assert page.metrics == {}
+
+
+def test_summary() -> None:
+    pages = [
+        PageVitals("a", values={"lcp": float(v), "cls": 0.0}) for v in range(1, 101)
+    ]
+    pages.append(PageVitals("b", metrics={"Nodes": 42.0}))
+
+    summary = summarize(pages, percentiles=(50, 95))
+
+    assert summary["lcp"] == {"count": 100, "p50": 51.0, "p95": 95.0}
+    assert summary["cls"]["count"] == 100
+    assert summary["Nodes"] == {"count": 1, "p50": 42.0, "p95": 42.0}
+
+
+def test_create_driver_attaches_collector() -> None:
+    with StubRemote() as grid:
+        driver = SetupSelenium.create_driver(
+            Browser.CHROME, remote=grid.url, collect_vitals=True
+        )
+        driver.quit()
+
+    assert isinstance(driver.vitals, VitalsCollector)  # type: ignore[union-attr,attr-defined]
+    cmds = [body.get("cmd") for _, path, body in grid.requests if "cdp" in path]
+    assert cmds == ["Page.addScriptToEvaluateOnNewDocument", "Performance.enable"]
+
+
+HARNESS = """
+const entries = %s;
+class Observer {
+  constructor(callback) { this.callback = callback; }
+  observe(options) { this.type = options.type; }
+  takeRecords() { return entries[this.type] || []; }
+}
+Observer.supportedEntryTypes = %s;
+const performance = {timeOrigin: 1234.5, getEntriesByType: (t) => entries[t] || []};
+const collect = new Function(
+  "window", "location", "performance", "PerformanceObserver", %s
+);
+const location = {href: "https://example.com/"};
+console.log(JSON.stringify(collect({}, location, performance, Observer)));
+"""
+
+ALL_TYPES = ["largest-contentful-paint", "layout-shift", "event", "longtask"]
+
+
+def run_collect_script(
+    entries: dict[str, list[dict[str, Any]]], supported: list[str] = ALL_TYPES
+) -> dict[str, Any]:
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node is not installed")
+    script = HARNESS % (
+        json.dumps(entries),
+        json.dumps(supported),
+        json.dumps(COLLECT_SCRIPT),
+    )
+    out = subprocess.run(  # noqa: S603
+        [node, "-e", script], capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout)
+
+
+def test_collect_script_computes_vitals() -> None:
+    shift = {"hadRecentInput": False}
+    result = run_collect_script(
+        {
+            "navigation": [
+                {
+                    "responseStart": 120,
+                    "domInteractive": 300,
+                    "domContentLoadedEventEnd": 350,
+                    "loadEventEnd": 0,
+                    "domainLookupStart": 10,
+                    "domainLookupEnd": 30,
+                    "connectStart": 30,
+                    "connectEnd": 80,
+                    "transferSize": 2048,
+                }
+            ],
+            "paint": [
+                {"name": "first-paint", "startTime": 200},
+                {"name": "first-contentful-paint", "startTime": 210},
+            ],
+            "largest-contentful-paint": [{"startTime": 400}, {"startTime": 650}],
+            "layout-shift": [
+                {**shift, "startTime": 100, "value": 0.1},
+                {**shift, "startTime": 600, "value": 0.05},
+                {"hadRecentInput": True, "startTime": 700, "value": 0.5},
+                # more than a second later starts a new session window
+                {**shift, "startTime": 2000, "value": 0.12},
+            ],
+            "event": [
+                {"interactionId": 1, "duration": 40},
+                {"interactionId": 1, "duration": 120},
+                {"interactionId": 2, "duration": 80},
+                {"interactionId": 0, "duration": 500},
+            ],
+            "longtask": [{"duration": 120}, {"duration": 60}],
+        }
+    )
+
+    assert result["url"] == "https://example.com/"
+    assert result["time_origin"] == 1234.5
+    assert result["values"] == {
+        "ttfb": 120,
+        "dom_interactive": 300,
+        "dom_content_loaded": 350,
+        "load": None,
+        "dns": 20,
+        "connect": 50,
+        "transfer_size": 2048,
+        "fp": 200,
+        "fcp": 210,
+        "lcp": 650,
+        "cls": pytest.approx(0.15),
+        "long_tasks": 2,
+        "tbt": 80,
+        "inp": 120,
+    }
+
+
+def test_collect_script_leaves_out_unsupported_types() -> None:
+    result = run_collect_script({}, supported=["largest-contentful-paint"])
+
+    assert result["values"] == {"lcp": None}